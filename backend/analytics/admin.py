@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import LeaderboardSnapshot, RTPAggregate
+
+@admin.register(RTPAggregate)
+class RTPAggregateAdmin(admin.ModelAdmin):
+    list_display = ('game', 'key', 'period_start', 'rounds', 'wagered', 'paid')
+    list_filter = ('game', 'key')
+
+
+@admin.register(LeaderboardSnapshot)
+class LeaderboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('board', 'period_start', 'updated_at')
+    list_filter = ('board',)
@@ -0,0 +1,398 @@
+"""
+Incrementally maintained leaderboards.
+
+Boards rank players by biggest single win and by rounds played, per game
+and over all games, for the current day, week and all time, plus one board
+of the largest balances. Every settled round updates the boards in place,
+so a read is a copy of the first K entries and never scans game history.
+
+Each board keeps CAPACITY entries, more than the K it shows, so a player
+just below the cut is still tracked when someone above them drops out.
+Biggest wins are a running maximum and their top CAPACITY is exact. Round
+counts use Space-Saving: a player entering a full board takes over the
+smallest counter, so a count can be overestimated by at most its `error`.
+
+Boards live in each worker. What a worker added since its last flush is
+merged into the LeaderboardSnapshot rows every FLUSH_INTERVAL seconds, and
+the merged rows are then reloaded, which brings in other workers' rounds.
+The balance board is not persisted: it is reloaded from the largest
+profile balances every BALANCE_REFRESH_INTERVAL seconds and moved by the
+balances of players as they settle rounds in between.
+"""
+import heapq
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+DEFAULTS = {
+    'SIZE': 10,
+    'CAPACITY': 100,
+    'FLUSH_INTERVAL': 60,
+    'BALANCE_REFRESH_INTERVAL': 300,
+}
+
+METRICS = ('biggest_win', 'rounds', 'balance')
+GAMES = ('all', 'slots', 'blackjack', 'dice')
+PERIODS = ('daily', 'weekly', 'all_time')
+
+# period_start of the all-time boards.
+ALL_TIME = date(2000, 1, 1)
+
+
+def leaderboard_settings():
+    """Return the ANALYTICS_LEADERBOARDS settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'ANALYTICS_LEADERBOARDS', {})}
+
+
+def period_start(period, today=None):
+    """Return the first day of the current `period`."""
+    today = today or timezone.localdate()
+    if period == 'daily':
+        return today
+    if period == 'weekly':
+        return today - timedelta(days=today.weekday())
+    return ALL_TIME
+
+
+def board_name(metric, game, period):
+    return f"{metric}:{game}:{period}"
+
+
+class TopK:
+    """
+    The `capacity` keys with the largest values. offer() keeps a running
+    maximum per key; set() replaces the value, which may also lower it.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._values = {}
+        # Min-heap of (value, key); entries whose value is no longer current are skipped lazily.
+        self._heap = []
+
+    def offer(self, key, value):
+        current = self._values.get(key)
+        if current is None or value > current:
+            self.set(key, value)
+
+    def set(self, key, value):
+        if key not in self._values and len(self._values) >= self.capacity:
+            self._prune()
+            lowest, lowest_key = self._heap[0]
+            if value <= lowest:
+                return
+            heapq.heappop(self._heap)
+            del self._values[lowest_key]
+        self._values[key] = value
+        heapq.heappush(self._heap, (value, key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(value, key) for key, value in self._values.items()]
+            heapq.heapify(self._heap)
+
+    def _prune(self):
+        while self._values.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def merge(self, other):
+        for key, value in other._values.items():
+            self.offer(key, value)
+
+    def top(self, n=None):
+        """Return [(key, value, error)] by descending value."""
+        ranked = heapq.nlargest(n or self.capacity, self._values.items(), key=lambda item: item[1])
+        return [(key, value, 0) for key, value in ranked]
+
+    def entries(self):
+        return [[key, str(value)] for key, value in self._values.items()]
+
+    def load(self, entries):
+        for key, value in entries:
+            self.offer(key, Decimal(value))
+        return self
+
+    def __bool__(self):
+        return bool(self._values)
+
+
+class SpaceSaving:
+    """
+    Approximate counts of the `capacity` most frequent keys (Metwally et al.).
+    Each kept key has a count and an error; its true count lies between
+    count - error and count.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._counts = {}
+        self._heap = []
+
+    def add(self, key, count=1, error=0):
+        entry = self._counts.get(key)
+        if entry is not None:
+            entry[0] += count
+            entry[1] += error
+        elif len(self._counts) < self.capacity:
+            entry = self._counts[key] = [count, error]
+        else:
+            while self._counts[self._heap[0][1]][0] != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            lowest, lowest_key = heapq.heappop(self._heap)
+            del self._counts[lowest_key]
+            entry = self._counts[key] = [lowest + count, lowest + error]
+        heapq.heappush(self._heap, (entry[0], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, (count, _) in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def merge(self, other):
+        for key, (count, error) in other._counts.items():
+            self.add(key, count, error)
+
+    def top(self, n=None):
+        ranked = heapq.nlargest(n or self.capacity, self._counts.items(), key=lambda item: item[1][0])
+        return [(key, count, error) for key, (count, error) in ranked]
+
+    def entries(self):
+        return [[key, count, error] for key, (count, error) in self._counts.items()]
+
+    def load(self, entries):
+        for key, count, error in entries:
+            self.add(key, count, error)
+        return self
+
+    def __bool__(self):
+        return bool(self._counts)
+
+
+class Board:
+    """One leaderboard: the merged view shown to players and what this worker added since its last flush."""
+
+    def __init__(self, metric, capacity):
+        self.metric = metric
+        self.capacity = capacity
+        self.current = self.empty()
+        self.pending = self.empty()
+
+    def empty(self):
+        return SpaceSaving(self.capacity) if self.metric == 'rounds' else TopK(self.capacity)
+
+    def add(self, user_id, value):
+        for summary in (self.current, self.pending):
+            if self.metric == 'rounds':
+                summary.add(user_id, value)
+            else:
+                summary.offer(user_id, value)
+
+
+class Leaderboards:
+    """Per-process leaderboards, keyed by (metric, game, period, period_start)."""
+
+    def __init__(self, config=None):
+        self.config = config or leaderboard_settings()
+        self._boards = {}
+        self._usernames = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._balances_loaded = None
+
+    def _keys(self, game, today):
+        for period in PERIODS:
+            start = period_start(period, today)
+            for board_game in {game, 'all'} & set(GAMES):
+                yield board_game, period, start
+
+    def record(self, game, user_id, won, balance=None):
+        """Add one settled round by `user_id` with net winnings `won`, and their balance after it."""
+        today = timezone.localdate()
+        created = False
+        with self._lock:
+            for board_game, period, start in self._keys(game, today):
+                for metric, value in (('rounds', 1), ('biggest_win', won)):
+                    if metric == 'biggest_win' and value <= 0:
+                        continue
+                    key = (metric, board_game, period, start)
+                    board = self._boards.get(key)
+                    if board is None:
+                        board = self._boards[key] = Board(metric, self.config['CAPACITY'])
+                        created = True
+                    board.add(user_id, value)
+            balances = self._boards.get(('balance', 'all', 'all_time', ALL_TIME))
+            if balance is not None and balances is not None:
+                balances.current.set(user_id, balance)
+            # A board new to this worker (a new period, or a fresh process) has not loaded its snapshot yet.
+            due = created or time.monotonic() - self._last_flush >= self.config['FLUSH_INTERVAL']
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Merge every board's additions since the last flush into its snapshot row, then reload."""
+        from .models import LeaderboardSnapshot
+
+        with self._lock:
+            self._last_flush = time.monotonic()
+            batch = []
+            for (metric, game, period, start), board in self._boards.items():
+                if metric != 'balance' and board.pending:
+                    batch.append((metric, game, period, start, board.pending))
+                    board.pending = board.empty()
+
+        for metric, game, period, start, pending in batch:
+            try:
+                with transaction.atomic():
+                    snapshot, _ = LeaderboardSnapshot.objects.select_for_update().get_or_create(
+                        board=board_name(metric, game, period), period_start=start
+                    )
+                    merged = Board(metric, self.config['CAPACITY']).empty().load(snapshot.entries)
+                    merged.merge(pending)
+                    snapshot.entries = merged.entries()
+                    snapshot.save(update_fields=['entries', 'updated_at'])
+            except Exception as e:
+                import logging
+                logging.error(f"Error flushing leaderboard {board_name(metric, game, period)}: {str(e)}")
+                with self._lock:
+                    board = self._boards.get((metric, game, period, start))
+                    if board is not None:
+                        board.pending.merge(pending)
+        self.reload()
+        return len(batch)
+
+    def reload(self):
+        """Replace the boards of the current periods with their snapshots plus this worker's unflushed additions."""
+        from user.models import Profile
+        from .models import LeaderboardSnapshot
+
+        today = timezone.localdate()
+        starts = {period: period_start(period, today) for period in PERIODS}
+        snapshots = {
+            (row.board, row.period_start): row.entries
+            for row in LeaderboardSnapshot.objects.filter(period_start__in=set(starts.values()))
+        }
+        capacity = self.config['CAPACITY']
+        boards = {}
+        for metric in ('biggest_win', 'rounds'):
+            for game in GAMES:
+                for period, start in starts.items():
+                    board = boards[(metric, game, period, start)] = Board(metric, capacity)
+                    board.current.load(snapshots.get((board_name(metric, game, period), start), []))
+
+        balance_key = ('balance', 'all', 'all_time', ALL_TIME)
+        balances = None
+        now = time.monotonic()
+        if (self._balances_loaded is None
+                or now - self._balances_loaded >= self.config['BALANCE_REFRESH_INTERVAL']):
+            balances = Board('balance', capacity)
+            for user_id, balance in Profile.objects.order_by('-balance').values_list('user_id', 'balance')[:capacity]:
+                balances.current.set(user_id, balance)
+
+        with self._lock:
+            for key, board in boards.items():
+                previous = self._boards.get(key)
+                if previous is not None:
+                    board.pending = previous.pending
+                    board.current.merge(previous.pending)
+            if balances is None:
+                balances = self._boards.get(balance_key)
+            else:
+                self._balances_loaded = now
+            boards[balance_key] = balances
+            self._boards = boards
+            self._usernames = {}
+
+    def top(self, metric, game='all', period='all_time'):
+        """Return the first SIZE entries of a board as dicts with rank, user, value and error."""
+        key = (metric, game, period, period_start(period))
+        with self._lock:
+            board = self._boards.get(key)
+        if board is None:
+            # Flush rather than only reload, so additions to boards of a period that just ended are kept.
+            self.flush()
+            with self._lock:
+                board = self._boards.get(key)
+        if board is None:
+            return []
+        with self._lock:
+            ranked = board.current.top(self.config['SIZE'])
+        names = self._names([user_id for user_id, _, _ in ranked])
+        return [
+            {'rank': rank, 'user_id': user_id, 'username': names.get(user_id),
+             'value': value if metric == 'rounds' else str(value), 'error': error}
+            for rank, (user_id, value, error) in enumerate(ranked, 1)
+        ]
+
+    def _names(self, user_ids):
+        """Usernames of `user_ids`, looking up only the ones not seen since the last reload."""
+        from user.models import Profile
+
+        with self._lock:
+            missing = [user_id for user_id in user_ids if user_id not in self._usernames]
+        if missing:
+            found = dict(Profile.objects.filter(user_id__in=missing).values_list('user_id', 'username'))
+            with self._lock:
+                self._usernames.update(found)
+        with self._lock:
+            return {user_id: self._usernames.get(user_id) for user_id in user_ids}
+
+
+leaderboards = Leaderboards()
+
+
+def history_sources():
+    """(game, queryset, timestamp field, net winnings expression) for every game's round history."""
+    from django.db.models import F
+    from blackjack.models import GameHistory
+    from dice.models import DiceGameModel
+    from slots.models import Spin
+
+    return [
+        ('slots', Spin.objects.all(), 'timestamp', F('payout') - F('bet_amount')),
+        ('blackjack', GameHistory.objects.all(), 'created_at', F('balance_change')),
+        ('dice', DiceGameModel.objects.all(), 'created_at', F('payout') - F('bet')),
+    ]
+
+
+def rebuild_snapshots(config=None):
+    """
+    Recompute the win and round-count snapshots of the current periods from
+    game history, replacing what workers have flushed. Counts come out exact,
+    with no error. Returns the number of boards written.
+    """
+    from django.db.models import Count, Max
+    from .models import LeaderboardSnapshot
+
+    config = config or leaderboard_settings()
+    capacity = config['CAPACITY']
+    today = timezone.localdate()
+    written = 0
+    for period in PERIODS:
+        start = period_start(period, today)
+        since = timezone.make_aware(datetime.combine(start, datetime.min.time()))
+        wins = {game: {} for game in GAMES}
+        rounds = {game: {} for game in GAMES}
+        for game, queryset, timestamp, net in history_sources():
+            if period != 'all_time':
+                queryset = queryset.filter(**{f'{timestamp}__gte': since})
+            rows = queryset.values('user').annotate(played=Count('pk'), best=Max(net)).order_by()
+            for row in rows.iterator(chunk_size=5000):
+                user_id = row['user']
+                for board_game in (game, 'all'):
+                    rounds[board_game][user_id] = rounds[board_game].get(user_id, 0) + row['played']
+                    if row['best'] > 0 and row['best'] > wins[board_game].get(user_id, 0):
+                        wins[board_game][user_id] = row['best']
+
+        for game in GAMES:
+            top_wins = TopK(capacity)
+            for user_id, won in wins[game].items():
+                top_wins.offer(user_id, won)
+            top_rounds = heapq.nlargest(capacity, rounds[game].items(), key=lambda item: item[1])
+            for metric, entries in (('biggest_win', top_wins.entries()),
+                                    ('rounds', [[user_id, count, 0] for user_id, count in top_rounds])):
+                LeaderboardSnapshot.objects.update_or_create(
+                    board=board_name(metric, game, period), period_start=start, defaults={'entries': entries}
+                )
+                written += 1
+    return written
@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.leaderboards import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = ("Recompute the current day's, week's and all-time leaderboard snapshots from game history. "
+            "Rounds that workers have not flushed yet are added on top at their next flush.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_snapshots()
+        self.stdout.write(f"Rebuilt {written} leaderboards in {time.perf_counter() - started:.1f}s.")
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.rtp import rtp_settings, simulated_slots_rtp
+from slots.machines import machine_registry, snapshot_machine
+from slots.models import Machine, MachineVersion
+
+
+class Command(BaseCommand):
+    help = ("Estimate the base-game RTP of every active slot machine's current version by simulation and "
+            "store it for the RTP monitor. Versions that already have an estimate are skipped.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--spins', type=int, default=rtp_settings()['SLOTS_SIMULATION_SPINS'],
+                            help='Spins simulated per machine.')
+        parser.add_argument('--force', action='store_true', help='Re-estimate versions that have an estimate.')
+
+    def handle(self, *args, **options):
+        for machine in Machine.objects.filter(is_active=True).order_by('slug'):
+            snapshot_machine(machine)
+            version = MachineVersion.objects.get(machine=machine, version=machine.version)
+            if version.simulated_rtp is not None and not options['force']:
+                continue
+            started = time.perf_counter()
+            compiled = machine_registry.get(machine.slug)
+            estimate = simulated_slots_rtp(compiled, options['spins'])
+            MachineVersion.objects.filter(machine=machine, version=compiled.version).update(simulated_rtp=estimate)
+            self.stdout.write(
+                f"{machine.slug} v{compiled.version}: RTP {estimate:.4f} "
+                f"({options['spins']} spins in {time.perf_counter() - started:.1f}s)"
+            )
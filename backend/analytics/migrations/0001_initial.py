@@ -0,0 +1,35 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RTPAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game', models.CharField(max_length=20)),
+                ('key', models.CharField(max_length=50)),
+                ('period_start', models.DateTimeField()),
+                ('rounds', models.BigIntegerField(default=0)),
+                ('hits', models.BigIntegerField(default=0)),
+                ('wagered', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('paid', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('returns', models.FloatField(default=0)),
+                ('returns_sq', models.FloatField(default=0)),
+                ('expected', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('expected_returns', models.FloatField(default=0)),
+                ('expected_rounds', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('game', 'key', 'period_start'), name='analytics_rtp_period_uniq')],
+            },
+        ),
+    ]
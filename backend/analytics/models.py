@@ -0,0 +1,57 @@
+from django.db import models
+
+
+class RTPAggregate(models.Model):
+    """
+    Wager and payout totals of one game stream for one hour.
+
+    Every worker adds its in-process totals to the current hour's row when it
+    flushes, so summing rows gives observed RTP across all workers without
+    reading individual rounds. `returns` and `returns_sq` are the sum and sum
+    of squares of each round's payout per unit bet, for variance; the
+    `expected` columns only cover rounds whose game reported a theoretical
+    payout.
+    """
+    game = models.CharField(max_length=20)
+    key = models.CharField(max_length=50)
+    period_start = models.DateTimeField()
+    rounds = models.BigIntegerField(default=0)
+    hits = models.BigIntegerField(default=0)
+    wagered = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    paid = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    returns = models.FloatField(default=0)
+    returns_sq = models.FloatField(default=0)
+    expected = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    expected_returns = models.FloatField(default=0)
+    expected_rounds = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['game', 'key', 'period_start'], name='analytics_rtp_period_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.game}:{self.key} @ {self.period_start:%Y-%m-%d %H:00}"
+
+
+class LeaderboardSnapshot(models.Model):
+    """
+    The merged entries of one leaderboard for one period, such as
+    `rounds:dice:weekly` for the week starting `period_start`.
+
+    Workers merge what they recorded since their last flush into `entries`
+    under a row lock and reload the result, so the row is the cross-worker
+    board. See analytics.leaderboards for the entry format of each metric.
+    """
+    board = models.CharField(max_length=50)
+    period_start = models.DateField()
+    entries = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'period_start'], name='analytics_leaderboard_period_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.board} @ {self.period_start:%Y-%m-%d}"
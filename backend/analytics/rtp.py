@@ -0,0 +1,256 @@
+"""
+Live observed-RTP monitor.
+
+Every settled round is added to a few rolling time windows per game stream
+(a slot machine, dice, blackjack). A window is a ring of fixed-width buckets,
+so memory is constant no matter how many rounds are played and reading a
+window sums a handful of buckets instead of scanning game history. Totals
+since the last flush are added to the hourly RTPAggregate rows every
+FLUSH_INTERVAL seconds, which gives a cross-worker view in the database.
+
+The theoretical RTP of a slot machine is estimated offline by the
+simulate_slots_rtp command and stored on its machine version; a report
+only reads the stored value.
+"""
+import math
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+DEFAULTS = {
+    'WINDOWS': {'5m': (300, 30), '1h': (3600, 60), '24h': (86400, 96)},
+    'FLUSH_INTERVAL': 60,
+    'THEORETICAL': {},
+    'ALARM_Z_SCORE': 4,
+    'MIN_ROUNDS': 200,
+    'SLOTS_SIMULATION_SPINS': 20000,
+}
+
+FIELDS = ('rounds', 'hits', 'wagered', 'paid', 'returns', 'returns_sq', 'expected', 'expected_returns',
+          'expected_rounds')
+
+
+def rtp_settings():
+    """Return the ANALYTICS_RTP settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'ANALYTICS_RTP', {})}
+
+
+class RingWindow:
+    """Totals of the last `span` seconds kept in `buckets` fixed-width buckets."""
+
+    def __init__(self, span, buckets):
+        self.span = span
+        self.buckets = buckets
+        self.width = span / buckets
+        self._epochs = [-1] * buckets
+        self._totals = [[0.0] * len(FIELDS) for _ in range(buckets)]
+
+    def add(self, now, values):
+        epoch = int(now // self.width)
+        index = epoch % self.buckets
+        if self._epochs[index] != epoch:
+            self._epochs[index] = epoch
+            self._totals[index] = [0.0] * len(FIELDS)
+        row = self._totals[index]
+        for i, value in enumerate(values):
+            row[i] += value
+
+    def totals(self, now):
+        current = int(now // self.width)
+        summed = [0.0] * len(FIELDS)
+        for epoch, row in zip(self._epochs, self._totals):
+            if current - epoch < self.buckets:
+                for i, value in enumerate(row):
+                    summed[i] += value
+        return dict(zip(FIELDS, summed))
+
+
+class GameStream:
+    """Rolling windows and unflushed totals for one (game, key) stream."""
+
+    def __init__(self, windows):
+        self.windows = {label: RingWindow(span, buckets) for label, (span, buckets) in windows.items()}
+        self.pending = dict.fromkeys(FIELDS, 0)
+
+    def add(self, now, values):
+        # Windows hold floats; pending totals keep money exact for the flush.
+        floats = [float(value) for value in values]
+        for window in self.windows.values():
+            window.add(now, floats)
+        for field, value in zip(FIELDS, values):
+            self.pending[field] += value
+
+
+def summarize(totals):
+    """Derive RTP, hit rate and the variance of the per-unit return from window totals."""
+    rounds = totals['rounds']
+    wagered = totals['wagered']
+    summary = {
+        'rounds': int(rounds),
+        'wagered': round(float(wagered), 2),
+        'paid': round(float(totals['paid']), 2),
+        'observed_rtp': float(totals['paid']) / float(wagered) if wagered else None,
+        'hit_rate': totals['hits'] / rounds if rounds else None,
+        'return_variance': None,
+    }
+    if rounds:
+        mean = totals['returns'] / rounds
+        summary['return_variance'] = max(totals['returns_sq'] / rounds - mean * mean, 0.0)
+    return summary
+
+
+class RTPMonitor:
+    """Per-process aggregator of settled rounds, keyed by (game, key)."""
+
+    def __init__(self, config=None):
+        self.config = config or rtp_settings()
+        self._streams = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, game, key, wagered, paid, expected=None):
+        """Add one settled round; `expected` is its theoretical payout, if the game knows it."""
+        wagered = Decimal(wagered)
+        paid = Decimal(paid)
+        unit_return = float(paid / wagered) if wagered else 0.0
+        values = [
+            1,
+            1 if paid > 0 else 0,
+            wagered,
+            paid,
+            unit_return,
+            unit_return * unit_return,
+            Decimal(expected) if expected is not None else Decimal('0'),
+            float(Decimal(expected) / wagered) if expected is not None and wagered else 0.0,
+            1 if expected is not None else 0,
+        ]
+        now = time.time()
+        with self._lock:
+            stream = self._streams.get((game, key))
+            if stream is None:
+                stream = self._streams[(game, key)] = GameStream(self.config['WINDOWS'])
+            stream.add(now, values)
+            due = time.monotonic() - self._last_flush >= self.config['FLUSH_INTERVAL']
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Add the totals gathered since the last flush to this hour's aggregate rows."""
+        from .models import RTPAggregate
+
+        with self._lock:
+            self._last_flush = time.monotonic()
+            batch = []
+            for (game, key), stream in self._streams.items():
+                if stream.pending['rounds']:
+                    batch.append((game, key, stream.pending))
+                    stream.pending = dict.fromkeys(FIELDS, 0)
+        if not batch:
+            return 0
+
+        period_start = timezone.now().replace(minute=0, second=0, microsecond=0)
+        flushed = 0
+        for game, key, pending in batch:
+            try:
+                row, _ = RTPAggregate.objects.get_or_create(game=game, key=key, period_start=period_start)
+                RTPAggregate.objects.filter(pk=row.pk).update(
+                    **{field: F(field) + value for field, value in pending.items()}
+                )
+                flushed += 1
+            except Exception as e:
+                import logging
+                logging.error(f"Error flushing RTP totals for {game}:{key}: {str(e)}")
+                with self._lock:
+                    stream = self._streams[(game, key)]
+                    for field, value in pending.items():
+                        stream.pending[field] += value
+        return flushed
+
+    def streams(self):
+        """Return [(game, key, {window label: totals})] for every stream seen by this worker."""
+        now = time.time()
+        with self._lock:
+            return [
+                (game, key, {label: window.totals(now) for label, window in stream.windows.items()})
+                for (game, key), stream in sorted(self._streams.items())
+            ]
+
+    def report(self):
+        """Compare observed RTP in every window against theoretical RTP and flag deviations."""
+        report = []
+        for game, key, windows in self.streams():
+            configured = theoretical_rtp(game, key, self.config)
+            entry = {'game': game, 'key': key, 'windows': {}}
+            for label, totals in windows.items():
+                summary = summarize(totals)
+                theoretical_mean = configured
+                if totals['rounds'] and totals['expected_rounds'] == totals['rounds']:
+                    summary['theoretical_rtp'] = float(totals['expected']) / totals['wagered']
+                    theoretical_mean = totals['expected_returns'] / totals['rounds']
+                else:
+                    summary['theoretical_rtp'] = configured
+                summary.update(self._deviation(totals, summary['return_variance'], theoretical_mean))
+                entry['windows'][label] = summary
+            report.append(entry)
+        return report
+
+    def _deviation(self, totals, variance, theoretical_mean):
+        """z-score of the mean per-unit return against theory, and whether it trips the alarm."""
+        rounds = totals['rounds']
+        if theoretical_mean is None or not rounds or not variance:
+            return {'z_score': None, 'alarm': False}
+        z_score = (totals['returns'] / rounds - theoretical_mean) / math.sqrt(variance / rounds)
+        alarm = rounds >= self.config['MIN_ROUNDS'] and abs(z_score) >= self.config['ALARM_Z_SCORE']
+        return {'z_score': round(z_score, 2), 'alarm': alarm}
+
+
+def persisted_report(hours=24):
+    """Observed RTP per stream over the last `hours` of flushed aggregates, across all workers."""
+    from .models import RTPAggregate
+
+    since = timezone.now() - timedelta(hours=hours)
+    rows = (
+        RTPAggregate.objects.filter(period_start__gte=since)
+        .values('game', 'key')
+        .annotate(**{field: Sum(field) for field in FIELDS})
+        .order_by('game', 'key')
+    )
+    return [{'game': row['game'], 'key': row['key'], **summarize(row)} for row in rows]
+
+
+def theoretical_rtp(game, key, config=None):
+    """
+    Return the theoretical RTP of a stream from settings, or for slot machines
+    the simulated RTP stored for the current machine version, if it has one.
+    """
+    config = config or rtp_settings()
+    configured = config['THEORETICAL'].get(f"{game}:{key}", config['THEORETICAL'].get(game))
+    if configured is not None:
+        return float(configured)
+    if game == 'slots':
+        from slots.models import MachineVersion
+
+        return (
+            MachineVersion.objects.filter(machine__slug=key, version=F('machine__version'))
+            .values_list('simulated_rtp', flat=True).first()
+        )
+    return None
+
+
+def simulated_slots_rtp(compiled, spins):
+    """Estimate a compiled slot machine's base-game RTP by spinning its reels offline."""
+    reel_service = compiled.reel_service
+    paid = Decimal('0')
+    for _ in range(spins):
+        win_data = reel_service.check_wins(reel_service.generate_spin())
+        if win_data:
+            paid += reel_service.calculate_payout(win_data, Decimal('1'))
+    return float(paid / spins)
+
+
+rtp_monitor = RTPMonitor()
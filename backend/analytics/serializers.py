@@ -0,0 +1,15 @@
+from rest_framework import serializers
+
+from .leaderboards import GAMES, METRICS, PERIODS
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    """Which leaderboard to show. Balances are ranked over all games and all time only."""
+    metric = serializers.ChoiceField(choices=METRICS, default='biggest_win')
+    game = serializers.ChoiceField(choices=GAMES, default='all')
+    period = serializers.ChoiceField(choices=PERIODS, default='all_time')
+
+    def validate(self, attrs):
+        if attrs['metric'] == 'balance':
+            attrs.update(game='all', period='all_time')
+        return attrs
@@ -0,0 +1,42 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.dispatch import Signal, receiver
+
+from user.balance_cache import balance_cache
+from .leaderboards import leaderboards
+from .rtp import rtp_monitor
+
+# Sent once per settled round with game, key, wagered, paid and, when the game
+# can compute it, the round's expected (theoretical) payout. user_id is the
+# player, and jackpot a progressive jackpot won on top of `paid`.
+round_settled = Signal()
+
+
+def send_round_settled(sender, game, key, wagered, paid, expected=None, user_id=None, jackpot=Decimal('0')):
+    """Announce a settled round once the transaction that settled it commits."""
+    transaction.on_commit(lambda: round_settled.send(
+        sender=sender, game=game, key=key, wagered=wagered, paid=paid, expected=expected,
+        user_id=user_id, jackpot=jackpot,
+    ))
+
+
+@receiver(round_settled)
+def record_round_rtp(sender, game, key, wagered, paid, expected=None, **kwargs):
+    try:
+        rtp_monitor.record(game, key, wagered, paid, expected)
+    except Exception as e:
+        import logging
+        logging.error(f"Error recording round for RTP monitor: {str(e)}")
+
+
+@receiver(round_settled)
+def record_round_leaderboards(sender, game, key, wagered, paid, user_id=None, jackpot=Decimal('0'), **kwargs):
+    if user_id is None:
+        return
+    try:
+        # The wallet caches the new balance on commit, before this round is announced.
+        leaderboards.record(game, user_id, paid + jackpot - wagered, balance_cache.get(user_id))
+    except Exception as e:
+        import logging
+        logging.error(f"Error recording round for leaderboards: {str(e)}")
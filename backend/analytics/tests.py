@@ -0,0 +1,201 @@
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from dice.game_logic import DiceGameLogic
+from dice.models import DiceGameModel
+from slots.services import SlotMachineService
+from .leaderboards import DEFAULTS as LEADERBOARD_DEFAULTS, Leaderboards, SpaceSaving, TopK, rebuild_snapshots
+from .models import LeaderboardSnapshot, RTPAggregate
+from .rtp import DEFAULTS, RingWindow, RTPMonitor, persisted_report, theoretical_rtp
+
+User = get_user_model()
+
+
+class RingWindowTestCase(TestCase):
+    def test_old_buckets_expire(self):
+        """Test that a window only sums buckets inside its span."""
+        window = RingWindow(60, 6)
+        window.add(1000, [1, 0, 10, 5, 0, 0, 0, 0, 0])
+        window.add(1035, [1, 1, 10, 20, 0, 0, 0, 0, 0])
+        self.assertEqual(window.totals(1040)['wagered'], 20)
+        self.assertEqual(window.totals(1075)['wagered'], 10)
+        self.assertEqual(window.totals(2000)['rounds'], 0)
+
+
+class RTPMonitorTestCase(TestCase):
+    def setUp(self):
+        self.monitor = RTPMonitor({**DEFAULTS, 'WINDOWS': {'5m': (300, 30)}, 'MIN_ROUNDS': 100})
+
+    def _play(self, game, payouts, expected):
+        for paid in payouts:
+            self.monitor.record(game, 'test', Decimal('1.00'), Decimal(paid), expected=expected)
+
+    def test_report_compares_against_expected_payouts(self):
+        """Test that observed RTP, variance and the alarm are derived from the rolling totals."""
+        self._play('fair', ['0', '2'] * 150, Decimal('1'))
+        self._play('loose', ['0', '4'] * 150, Decimal('1'))
+        report = {entry['game']: entry['windows']['5m'] for entry in self.monitor.report()}
+
+        self.assertEqual(report['fair']['rounds'], 300)
+        self.assertAlmostEqual(report['fair']['observed_rtp'], 1.0)
+        self.assertAlmostEqual(report['fair']['theoretical_rtp'], 1.0)
+        self.assertAlmostEqual(report['fair']['return_variance'], 1.0)
+        self.assertFalse(report['fair']['alarm'])
+
+        self.assertAlmostEqual(report['loose']['observed_rtp'], 2.0)
+        self.assertAlmostEqual(report['loose']['hit_rate'], 0.5)
+        self.assertTrue(report['loose']['alarm'])
+
+    def test_flush_accumulates_into_hourly_rows(self):
+        """Test that flushing adds pending totals to the aggregate row and resets them."""
+        self._play('dice', ['0', '3'], None)
+        self.assertEqual(self.monitor.flush(), 1)
+        self._play('dice', ['1.50'], None)
+        self.monitor.flush()
+        self.assertEqual(self.monitor.flush(), 0)
+
+        row = RTPAggregate.objects.get(game='dice', key='test')
+        self.assertEqual((row.rounds, row.hits, row.wagered, row.paid), (3, 2, Decimal('3.00'), Decimal('4.50')))
+        self.assertAlmostEqual(persisted_report()[0]['observed_rtp'], 1.5)
+
+    def test_dice_expected_payout(self):
+        """Test that the dice theoretical payout averages every pair of rolls."""
+        self.assertEqual(DiceGameLogic.expected_payout((6, 6), Decimal('10'), 7), Decimal('7'))
+
+    @patch('slots.services.ReelService.generate_spin')
+    def test_settled_spin_is_recorded_on_commit(self, mock_generate_spin):
+        """Test that a slots spin reaches the monitor once its transaction commits."""
+        user = User.objects.create_user(email='rtp@example.com', password='testpass123')
+        user.profile.balance = Decimal('100.00')
+        user.profile.save()
+        mock_generate_spin.return_value = {reel: [0, 1, 2] for reel in range(5)}
+
+        with patch('analytics.signals.rtp_monitor', self.monitor):
+            with self.captureOnCommitCallbacks(execute=True):
+                SlotMachineService().play_spin(user, Decimal('5.00'))
+
+        [(game, key, windows)] = self.monitor.streams()
+        self.assertEqual((game, key), ('slots', 'legacy'))
+        self.assertEqual(windows['5m']['wagered'], 5.0)
+
+    def test_slots_rtp_is_read_from_stored_simulation(self):
+        """Test that a slot machine's theoretical RTP is read from the estimate the command stores."""
+        self.assertIsNone(theoretical_rtp('slots', 'classic', self.monitor.config))
+        call_command('simulate_slots_rtp', '--spins', '500', stdout=StringIO())
+
+        rtp = theoretical_rtp('slots', 'classic', self.monitor.config)
+        self.assertGreater(rtp, 0)
+        with patch('analytics.rtp.simulated_slots_rtp') as simulate:
+            self.assertEqual(theoretical_rtp('slots', 'classic', self.monitor.config), rtp)
+        simulate.assert_not_called()
+
+    def test_endpoint_is_admin_only(self):
+        """Test that the RTP report is only served to staff users."""
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email='player@example.com', password='testpass123'))
+        self.assertEqual(client.get('/api/analytics/rtp/').status_code, 403)
+
+        client.force_authenticate(User.objects.create_superuser(email='ops@example.com', password='testpass123'))
+        response = client.get('/api/analytics/rtp/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('persisted', response.data)
+
+
+class LeaderboardStructuresTestCase(TestCase):
+    def test_top_k_keeps_largest_maximum_per_key(self):
+        """Test that a bounded top-K keeps each key's best value and evicts the smallest."""
+        top = TopK(3)
+        for key, value in [(1, 5), (2, 7), (1, 9), (3, 1), (4, 6), (3, 8)]:
+            top.offer(key, value)
+        self.assertEqual([(key, value) for key, value, _ in top.top()], [(1, 9), (3, 8), (2, 7)])
+
+        top.set(1, 2)
+        self.assertEqual([key for key, _, _ in top.top(2)], [3, 2])
+
+    def test_space_saving_counts_bound_true_counts(self):
+        """Test that every kept count is within its error above the true count."""
+        counts = SpaceSaving(5)
+        true = {}
+        for i in range(500):
+            key = i % 3 if i % 2 else i % 17
+            counts.add(key)
+            true[key] = true.get(key, 0) + 1
+        for key, count, error in counts.top():
+            self.assertLessEqual(count - error, true[key])
+            self.assertGreaterEqual(count, true[key])
+
+
+class LeaderboardsTestCase(TestCase):
+    def setUp(self):
+        self.players = [
+            User.objects.create_user(email=f'board{i}@example.com', password='testpass123') for i in range(3)
+        ]
+        self.ids = [player.pk for player in self.players]
+
+    def _boards(self):
+        return Leaderboards({**LEADERBOARD_DEFAULTS, 'SIZE': 2, 'FLUSH_INTERVAL': 3600})
+
+    def test_workers_merge_through_snapshots(self):
+        """Test that rounds recorded by two workers add up once both have flushed."""
+        first, second = self._boards(), self._boards()
+        first.record('dice', self.ids[0], Decimal('-1'))
+        first.record('dice', self.ids[0], Decimal('40'))
+        second.record('slots', self.ids[1], Decimal('25'))
+        second.record('slots', self.ids[1], Decimal('-5'))
+        second.record('slots', self.ids[1], Decimal('-5'))
+        first.flush()
+        second.flush()
+        first.reload()
+
+        rounds = first.top('rounds', 'all', 'daily')
+        self.assertEqual([(entry['user_id'], entry['value']) for entry in rounds], [(self.ids[1], 3), (self.ids[0], 2)])
+        self.assertEqual(rounds[0]['username'], self.players[1].profile.username)
+        wins = first.top('biggest_win', 'all', 'weekly')
+        self.assertEqual([(entry['user_id'], entry['value']) for entry in wins],
+                         [(self.ids[0], '40'), (self.ids[1], '25')])
+        self.assertEqual(first.top('biggest_win', 'slots', 'all_time')[0]['user_id'], self.ids[1])
+        self.assertEqual(LeaderboardSnapshot.objects.get(board='rounds:dice:all_time').entries,
+                         [[self.ids[0], 2, 0]])
+
+    def test_balance_board_follows_settled_rounds(self):
+        """Test that the balance board is loaded from profiles and moved by players' new balances."""
+        for player, balance in zip(self.players, ['30.00', '20.00', '10.00']):
+            player.profile.balance = Decimal(balance)
+            player.profile.save()
+        boards = self._boards()
+        self.assertEqual([entry['value'] for entry in boards.top('balance')], ['30.00', '20.00'])
+
+        boards.record('dice', self.ids[2], Decimal('90'), Decimal('100.00'))
+        self.assertEqual([entry['user_id'] for entry in boards.top('balance')], [self.ids[2], self.ids[0]])
+
+    def test_rebuild_from_history(self):
+        """Test that rebuilding recomputes snapshots from stored rounds."""
+        for bet, payout in [('5', '0'), ('5', '20'), ('5', '10')]:
+            DiceGameModel.objects.create(user=self.players[0], bet=Decimal(bet), choice1=1, choice2=2, roll1=1,
+                                         roll2=2, total=3, guessed_number=3, payout=Decimal(payout))
+        self.assertEqual(rebuild_snapshots(LEADERBOARD_DEFAULTS), 24)
+
+        boards = self._boards()
+        self.assertEqual(boards.top('rounds', 'dice')[0]['value'], 3)
+        self.assertEqual(boards.top('biggest_win', 'all')[0]['value'], '15.00')
+        self.assertEqual(boards.top('rounds', 'dice', 'daily')[0]['value'], 3)
+
+    def test_endpoint_serves_board(self):
+        """Test that the endpoint validates the board and returns its entries."""
+        boards = self._boards()
+        boards.record('blackjack', self.ids[0], Decimal('10'))
+        client = APIClient()
+        client.force_authenticate(self.players[0])
+        with patch('analytics.views.leaderboards', boards):
+            response = client.get('/api/analytics/leaderboards/', {'metric': 'rounds', 'game': 'blackjack'})
+            self.assertEqual(client.get('/api/analytics/leaderboards/', {'period': 'monthly'}).status_code, 400)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['period'], 'all_time')
+        self.assertEqual(response.data['entries'][0]['user_id'], self.ids[0])
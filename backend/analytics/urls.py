@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import LeaderboardView, RTPMonitorView
+
+urlpatterns = [
+    path('rtp/', RTPMonitorView.as_view(), name='rtp-monitor'),
+    path('leaderboards/', LeaderboardView.as_view(), name='leaderboards'),
+]
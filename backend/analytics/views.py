@@ -0,0 +1,48 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from drf_spectacular.utils import extend_schema
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from user.authentication import CachedJWTAuthentication
+from .leaderboards import leaderboards, period_start
+from .rtp import persisted_report, rtp_monitor
+from .serializers import LeaderboardQuerySerializer
+
+
+class RTPMonitorView(APIView):
+    permission_classes = [IsAdminUser]
+    authentication_classes = [JWTAuthentication]
+
+    @extend_schema(
+        description="Observed vs theoretical RTP per game over this worker's rolling windows, "
+                    "plus the last 24 hours of flushed totals from all workers",
+        responses={200: dict}
+    )
+    def get(self, request):
+        report = rtp_monitor.report()
+        return Response({
+            'alarm': any(window['alarm'] for entry in report for window in entry['windows'].values()),
+            'live': report,
+            'persisted': persisted_report(),
+        })
+
+
+class LeaderboardView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedJWTAuthentication]
+
+    @extend_schema(
+        description="Top players by biggest single win, rounds played or balance, per game and "
+                    "for the current day, week or all time. Round counts may be overestimated by `error`",
+        parameters=[LeaderboardQuerySerializer],
+        responses={200: dict}
+    )
+    def get(self, request):
+        query = LeaderboardQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        return Response({
+            **params,
+            'period_start': period_start(params['period']),
+            'entries': leaderboards.top(params['metric'], params['game'], params['period']),
+        })
@@ -2,7 +2,12 @@ from .game_logic import BlackjackGame, Card
 from .serializers import GameStateSerializer, BetSerializer, CardSerializer
 from .models import GameHistory
 from rest_framework.exceptions import ValidationError
-from user.models import User, Transaction
+from user.models import Profile, User, Transaction
+from analytics.signals import send_round_settled
+from user.ledger import ledger_reference, new_round_id
+from user.stats import record_rounds
+from user.wallet import InsufficientFunds
+from django.db import transaction
 import json
 
 
@@ -39,16 +44,16 @@ class BlackjackGameFacade:
 
     def __init__(self, user):
         self.user = user
-        self.user.refresh_from_db()
 
         if not hasattr(self.user, 'profile'):
             raise ValidationError("User profile not found. Please create a profile first.")
 
     def get_current_balance(self):
         """
-        Returns the current balance of the user's profile.
+        Returns the user's balance for display. It comes from the balance cache
+        and can lag changes settled by other workers, so settlement records the
+        balance the wallet returns instead.
         """
-        self.user.refresh_from_db()
         return self.user.profile.balance
 
     def get_game_state(self, session):
@@ -113,26 +118,27 @@ class BlackjackGameFacade:
 
         amount = bet_serializer.validated_data['amount']
 
-        # Check if user has enough balance
-        if self.get_current_balance() < amount:
+        if  amount == 0:
             return {
-                'message': "Insufficient balance for this bet."
+                'message': "Bet cannot equal zero."
             }
 
-        if  amount == 0:
+        # Take the bet first; the wallet refuses it if the stored balance does not cover it.
+        from decimal import Decimal
+        amount_decimal = Decimal(str(amount))
+        round_id = new_round_id()
+        try:
+            self._update_balance(-amount_decimal, round_id)
+        except InsufficientFunds:
             return {
-                'message': "Bet cannot equal zero."
+                'message': "Insufficient balance for this bet."
             }
 
         # Create a new game
         self._initialize_new_game(session)
 
-        # Update bet and balance
-        from decimal import Decimal
-        amount_decimal = Decimal(str(amount))
-
         session['bet'] = amount
-        self._update_balance(-amount_decimal)
+        session['round_id'] = round_id
 
         # Deal cards
         game = self._restore_game_from_session(session)
@@ -265,7 +271,7 @@ class BlackjackGameFacade:
         if result and "Bust" in result:
             game.game_over = True
             self._save_game_to_session(session, game)
-            self._save_game_history(session, game, GameHistory.OUTCOME_LOSS)
+            self._settle_game(session, game, GameHistory.OUTCOME_LOSS)
         else:
             self._save_game_to_session(session, game)
 
@@ -310,22 +316,14 @@ class BlackjackGameFacade:
         else:
             outcome = GameHistory.OUTCOME_LOSS
 
-        self._save_game_history(session, game, outcome)
+        self._settle_game(session, game, outcome)
 
         return self._process_stay_result(session, result, outcome)
 
     def _process_stay_result(self, session, result, outcome):
         """
-        Processes the result after a player stays, updating balance based on outcome.
+        Builds the response after a player stays and the game was settled.
         """
-        bet = session.get('bet', 0)
-
-        if bet > 0:
-            if outcome == GameHistory.OUTCOME_WIN:
-                self._update_balance(bet * 2)
-            elif outcome == GameHistory.OUTCOME_TIE:
-                self._update_balance(bet)
-
         session['bet'] = 0
 
         return GameResult(
@@ -335,9 +333,10 @@ class BlackjackGameFacade:
             result
         ).to_dict()
 
-    def _save_game_history(self, session, game, outcome):
+    def _settle_game(self, session, game, outcome):
         """
-        Save the game result to the GameHistory model.
+        Pay out the game's winnings and save the result to the GameHistory model,
+        with the balances the wallet reports rather than the cached one.
         """
         bet = session.get('bet', 0)
         if bet == 0:
@@ -345,7 +344,6 @@ class BlackjackGameFacade:
 
         from decimal import Decimal
 
-        balance_before = self.get_current_balance()
         bet_decimal = Decimal(str(bet))
 
         if outcome == GameHistory.OUTCOME_WIN:
@@ -355,49 +353,64 @@ class BlackjackGameFacade:
         else:
             balance_change = Decimal('0')
 
-        if outcome == GameHistory.OUTCOME_WIN:
-            balance_after = balance_before + (bet_decimal * Decimal('2'))
-        elif outcome == GameHistory.OUTCOME_TIE:
-            balance_after = balance_before + bet_decimal
-        else:
-            balance_after = balance_before
-
         player_hand_str = json.dumps([{'rank': card.rank, 'suit': card.suit} for card in game.player_hand])
         dealer_hand_str = json.dumps([{'rank': card.rank, 'suit': card.suit} for card in game.dealer_hand])
 
         player_score = game.get_hand_score(game.player_hand)
         dealer_score = game.get_hand_score(game.dealer_hand)
 
-        GameHistory.objects.create(
-            user=self.user,
-            bet_amount=bet,
-            outcome=outcome,
-            player_score=player_score,
-            dealer_score=dealer_score,
-            player_hand=player_hand_str,
-            dealer_hand=dealer_hand_str,
-            balance_change=balance_change,
-            balance_before=balance_before,
-            balance_after=balance_after
-        )
-
-    def _update_balance(self, amount):
+        returned = {GameHistory.OUTCOME_WIN: Decimal('2'), GameHistory.OUTCOME_TIE: Decimal('1')}
+        payout = bet_decimal * returned.get(outcome, Decimal('0'))
+
+        # The bet was taken when the hand started, in an earlier request; the
+        # payout, the history row and the counters commit together.
+        with transaction.atomic():
+            if payout:
+                balance_after = self._update_balance(payout, session.get('round_id'))
+            else:
+                # A loss pays nothing but still locks the profile, like every
+                # settlement, so it cannot commit during a counters backfill.
+                balance_after = self.user.profile.balance = Profile.objects.select_for_update().values_list(
+                    'balance', flat=True
+                ).get(pk=self.user.profile.pk)
+            balance_before = balance_after - payout
+
+            GameHistory.objects.create(
+                user=self.user,
+                bet_amount=bet,
+                outcome=outcome,
+                player_score=player_score,
+                dealer_score=dealer_score,
+                player_hand=player_hand_str,
+                dealer_hand=dealer_hand_str,
+                balance_change=balance_change,
+                balance_before=balance_before,
+                balance_after=balance_after
+            )
+            record_rounds(self.user.profile.pk, 'blackjack', bet_decimal, payout, balance_change)
+
+        send_round_settled(GameHistory, 'blackjack', 'blackjack', bet_decimal, payout, user_id=self.user.pk)
+
+    def _update_balance(self, amount, round_id=None):
         """
-        Updates the user's profile balance using the transaction system.
-        Uses withdrawal for negative amounts and deposit for positive amounts.
+        Updates the user's profile balance, recorded in the ledger under the round's id,
+        and returns the new balance. Uses a bet entry for negative amounts and a
+        payout entry for positive amounts.
         """
         if amount == 0:
-            return
+            return self.user.profile.balance
 
         from decimal import Decimal
         amount = Decimal(str(amount))
 
-        if amount > 0:
-
-            self.user.profile.add_balance(
-                amount=amount
-            )
-        else:
-            self.user.profile.deduct_balance(
-                amount=abs(amount)
-            )
\ No newline at end of file
+        with ledger_reference('blackjack', round_id):
+            if amount > 0:
+
+                self.user.profile.add_balance(
+                    amount=amount
+                )
+            else:
+                self.user.profile.deduct_balance(
+                    amount=abs(amount)
+                )
+        return self.user.profile.balance
\ No newline at end of file
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-19 17:17
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. Building the
+    # index concurrently keeps the game history table writable while it is populated.
+    atomic = False
+
+    dependencies = [
+        ('blackjack', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='gamehistory',
+            index=models.Index(fields=['user', '-created_at'], name='blackjack_user_created_idx'),
+        ),
+    ]
@@ -56,6 +56,9 @@ class GameHistory(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Game History'
         verbose_name_plural = 'Game Histories'
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='blackjack_user_created_idx'),
+        ]
 
     def __str__(self):
         """String representation of the game history record."""
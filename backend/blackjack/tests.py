@@ -2,9 +2,15 @@ import unittest
 from unittest.mock import MagicMock, patch
 from decimal import Decimal
 
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from .game_logic import BlackjackGame, Card
 from .facade import BlackjackGameFacade, GameResult
+from user.models import GameStats, Profile
+from user.wallet import InsufficientFunds
 
 
 class TestBlackjackGame(unittest.TestCase):
@@ -184,6 +190,18 @@ class TestBlackjackGameFacade(unittest.TestCase):
         self.assertEqual(self.user_mock.profile.deduct_balance.call_count, 1)
         self.assertEqual(self.session['bet'], 100)
 
+    @patch('blackjack.facade.BetSerializer')
+    def test_refused_bet_starts_no_game(self, mock_bet_serializer):
+        """Test that a bet the wallet refuses leaves no game or bet in the session."""
+        mock_bet_serializer().is_valid.return_value = True
+        mock_bet_serializer().validated_data = {'amount': 100}
+        self.user_mock.profile.deduct_balance.side_effect = InsufficientFunds()
+
+        result = self.facade.start_new_game_with_bet(self.session, 100)
+
+        self.assertEqual(result, {'message': "Insufficient balance for this bet."})
+        self.assertEqual(self.session, {})
+
     @patch('blackjack.facade.GameStateSerializer')
     def test_player_hit_during_game(self, mock_serializer):
         """Test player hitting during an active game."""
@@ -204,8 +222,10 @@ class TestBlackjackGameFacade(unittest.TestCase):
 
 
     @patch('blackjack.facade.GameHistory.objects.create')
-    def test_save_game_history(self, mock_create):
-        """Test saving game history after game completion."""
+    @patch('blackjack.facade.record_rounds')
+    @patch('blackjack.facade.send_round_settled')
+    def test_settle_game(self, mock_send_round_settled, mock_record_rounds, mock_create):
+        """Test paying out and saving game history after game completion."""
         from .facade import GameHistory
 
 
@@ -217,14 +237,50 @@ class TestBlackjackGameFacade(unittest.TestCase):
         game_mock.get_hand_score.side_effect = [20, 17]
 
 
-        self.facade._save_game_history(self.session, game_mock, GameHistory.OUTCOME_WIN)
+        self.user_mock.profile.add_balance.side_effect = lambda amount: setattr(
+            self.user_mock.profile, 'balance', Decimal('1200.00')
+        )
+        self.facade._settle_game(self.session, game_mock, GameHistory.OUTCOME_WIN)
 
 
         mock_create.assert_called_once()
+        mock_record_rounds.assert_called_once()
+        mock_send_round_settled.assert_called_once()
         call_kwargs = mock_create.call_args[1]
         self.assertEqual(call_kwargs['user'], self.user_mock)
         self.assertEqual(call_kwargs['bet_amount'], 100)
         self.assertEqual(call_kwargs['outcome'], GameHistory.OUTCOME_WIN)
+        self.assertEqual((call_kwargs['balance_before'], call_kwargs['balance_after']),
+                         (Decimal('1000.00'), Decimal('1200.00')))
+
+
+class TestBlackjackSettlement(TestCase):
+    """Tests for settling hands against the database."""
+
+    def setUp(self):
+        """Set up a user with a balance and a finished, lost hand."""
+        self.user = get_user_model().objects.create_user('settle@example.com', 'testpassword123')
+        Profile.objects.filter(user=self.user).update(balance=Decimal('90.00'))
+        self.facade = BlackjackGameFacade(self.user)
+        self.game = MagicMock()
+        self.game.player_hand = [Card('10', '♠'), Card('8', '♥')]
+        self.game.dealer_hand = [Card('10', '♦'), Card('9', '♣')]
+        self.game.get_hand_score.side_effect = [18, 19]
+
+    def test_lost_hand_locks_profile(self):
+        """Test that settling a lost hand locks the profile, as the counters backfill relies on."""
+        from .models import GameHistory
+
+        with CaptureQueriesContext(connection) as queries:
+            self.facade._settle_game({'bet': 10, 'round_id': 'lost-hand'}, self.game, GameHistory.OUTCOME_LOSS)
+
+        self.assertTrue([
+            query for query in queries
+            if Profile._meta.db_table in query['sql'] and 'FOR UPDATE' in query['sql']
+        ])
+        history = GameHistory.objects.get(user=self.user)
+        self.assertEqual((history.balance_before, history.balance_after), (Decimal('90.00'), Decimal('90.00')))
+        self.assertEqual(GameStats.objects.get(profile=self.user.profile, game='blackjack').rounds, 1)
 
 
 if __name__ == '__main__':
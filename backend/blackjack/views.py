@@ -4,15 +4,16 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from .facade import BlackjackGameFacade
 from .serializers import BetSerializer
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from core.async_views import AsyncViewMixin
+from user.authentication import CachedJWTAuthentication
 
 """Views for the Blackjack game app."""
 
 
-class GameStateView(APIView):
+class GameStateView(AsyncViewMixin, APIView):
     """View to get the current game state"""
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def get(self, request):
         """Get current game state"""
@@ -21,10 +22,10 @@ class GameStateView(APIView):
         return Response(result)
 
 
-class HitView(APIView):
+class HitView(AsyncViewMixin, APIView):
     """View to hit (take another card)"""
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def post(self, request):
         """Player takes another card"""
@@ -33,10 +34,10 @@ class HitView(APIView):
         return Response(result)
 
 
-class StayView(APIView):
+class StayView(AsyncViewMixin, APIView):
     """View to stay (end turn)"""
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def post(self, request):
         """Player stands with current cards"""
@@ -45,11 +46,11 @@ class StayView(APIView):
         return Response(result)
 
 
-class BetView(APIView):
+class BetView(AsyncViewMixin, APIView):
     """View to place a bet, start a new game and deal cards"""
     serializer_class = BetSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def post(self, request):
         serializer = BetSerializer(data=request.data)
@@ -0,0 +1,81 @@
+"""
+Async entry points for the DRF game views.
+
+DRF views, the wallet and the game services are synchronous. Under ASGI a
+view wrapped here is an async Django view: the server reads the request and
+writes the response on the event loop, and only the view itself runs in a
+bounded pool of ASYNC_VIEWS['THREADS'] threads. A slow client or a request
+waiting for a free thread therefore holds a coroutine, not a thread, and at
+most THREADS database connections are open for these views however many
+connections the server accepts.
+
+Under WSGI (runserver, the test client) the request already owns a worker
+thread, so the view runs in it as before.
+"""
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+
+DEFAULTS = {
+    'THREADS': 16,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def async_views_settings():
+    """Return the ASYNC_VIEWS settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'ASYNC_VIEWS', {})}
+
+
+def view_executor():
+    """Return the shared thread pool async views run their synchronous part in."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=async_views_settings()['THREADS'], thread_name_prefix='async-view'
+            )
+        return _executor
+
+
+def _run_in_pool(view, request, *args, **kwargs):
+    """Call a view in a pool thread, opening and releasing its connection like a request would."""
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            # DRF responses render lazily; render here so the event loop never touches the database.
+            response = response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def offload(view):
+    """Turn a synchronous view callable into an async view that runs it in view_executor()."""
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            return await sync_to_async(view)(request, *args, **kwargs)
+        run = sync_to_async(_run_in_pool, thread_sensitive=False, executor=view_executor())
+        return await run(view, request, *args, **kwargs)
+
+    return async_view
+
+
+class AsyncViewMixin:
+    """
+    Serve an APIView or ViewSet as an async view through offload(). Put it
+    first in the bases so its as_view() wraps the one DRF builds.
+    """
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        return offload(super().as_view(*args, **kwargs))
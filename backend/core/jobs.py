@@ -0,0 +1,194 @@
+"""
+Helpers for batch jobs that walk large tables.
+
+A job splits a table into primary-key ranges of a fixed number of rows,
+processes the ranges independently (in a pool of forked worker processes
+when asked to), and checkpoints the upper key of the last finished range so
+an interrupted run resumes there instead of starting over.
+RangeJobCommand wires these into a management command.
+"""
+import collections
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def keyset_ranges(queryset, size, after=None):
+    """
+    Return [(lower, upper)] primary-key bounds covering `queryset` in chunks
+    of `size` rows; `lower` is exclusive (None for the first chunk) and
+    `upper` inclusive.
+
+    Each bound is the size-th key after the previous one, read as OFFSET
+    size - 1 on the primary-key index, so planning walks the index once from
+    end to end but never reads the rows themselves. Rows added after planning
+    are not covered.
+    """
+    keys = queryset.order_by('pk').values_list('pk', flat=True)
+    ranges = []
+    lower = after
+    while True:
+        remaining = keys if lower is None else keys.filter(pk__gt=lower)
+        upper = list(remaining[size - 1:size])
+        if not upper:
+            upper = list(remaining.reverse()[:1])
+            if upper:
+                ranges.append((lower, upper[0]))
+            return ranges
+        ranges.append((lower, upper[0]))
+        lower = upper[0]
+
+
+def in_range(queryset, lower, upper):
+    """Restrict `queryset` to one range returned by keyset_ranges()."""
+    if lower is not None:
+        queryset = queryset.filter(pk__gt=lower)
+    return queryset.filter(pk__lte=upper)
+
+
+class Checkpoint:
+    """Job progress persisted to a JSON file, rewritten atomically on every save."""
+
+    def __init__(self, path, restart=False):
+        self.path = path
+        self.state = {}
+        if path and not restart and os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+
+    def get(self, key, default=None):
+        return self.state.get(key, default)
+
+    def save(self, **state):
+        self.state.update(state)
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, default=str)
+        os.replace(tmp_path, self.path)
+
+
+def run_ranges(func, ranges, workers=1):
+    """
+    Call `func(lower, upper)` for every range and yield (lower, upper, result)
+    in range order, so a caller that checkpoints `upper` after each result
+    never skips a range on resume.
+
+    With more than one worker the ranges run in forked processes, at most two
+    per worker in flight, and results that finish early wait for the ranges
+    before them. Database connections are closed before forking so no child
+    inherits a live one.
+    """
+    if workers <= 1:
+        for lower, upper in ranges:
+            yield lower, upper, func(lower, upper)
+        return
+
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        in_flight = collections.deque()
+        queued = iter(ranges)
+        while True:
+            for lower, upper in queued:
+                in_flight.append((lower, upper, pool.submit(func, lower, upper)))
+                if len(in_flight) >= workers * 2:
+                    break
+            if not in_flight:
+                return
+            lower, upper, future = in_flight.popleft()
+            yield lower, upper, future.result()
+
+
+class RangeJobCommand(BaseCommand):
+    """
+    Management command that runs the function from get_range_function() on
+    key ranges of get_queryset() with a checkpoint, optionally appending items
+    of each result to a JSON Lines report. The function is called as
+    func(lower, upper), in forked workers when there are several.
+
+    Every result is a dict with the number of rows it `checked`; the values
+    of `counters` are added up across ranges, where a list counts its items.
+    The items of `report_key`, if set, are written to the report. Subclasses
+    name their rows (`row`, singular), the job (`job`, as in "the last audit
+    finished", and `action`, as in "Auditing N ranges") and describe their
+    totals in summary().
+    """
+    row = 'row'
+    job = 'job'
+    action = 'Running'
+    chunk_size = 5000
+    counters = ()
+    report_key = None
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_range_function(self):
+        raise NotImplementedError
+
+    def summary(self, totals):
+        """Describe the job's totals (`checked` and every counter) for the final message."""
+        raise NotImplementedError
+
+    def add_arguments(self, parser):
+        name = self.__module__.rsplit('.', 1)[-1]
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes; 1 runs every range in this process.')
+        parser.add_argument('--chunk-size', type=int, default=self.chunk_size,
+                            help=f'{self.row.capitalize()}s per key range.')
+        parser.add_argument('--checkpoint', default=f'{name}.checkpoint.json',
+                            help='Progress file an interrupted run resumes from.')
+        if self.report_key:
+            parser.add_argument('--report', default=f'{name}.{self.report_key}.jsonl',
+                                help=f'File {self.report_key} are appended to, one JSON object per line.')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start over.')
+
+    def handle(self, *args, **options):
+        checkpoint = Checkpoint(options['checkpoint'], restart=options['restart'])
+        if options['restart'] or not checkpoint.get('after'):
+            if self.report_key:
+                open(options['report'], 'w').close()
+            checkpoint.save(after=None, checked=0, **{counter: 0 for counter in self.counters})
+        elif checkpoint.get('finished'):
+            self.stdout.write(f"The last {self.job} finished; use --restart to run it again.")
+            return
+        else:
+            self.stdout.write(f"Resuming after {self.row} {checkpoint.get('after')}.")
+
+        ranges = keyset_ranges(self.get_queryset(), options['chunk_size'], after=checkpoint.get('after'))
+        self.stdout.write(f"{self.action} {len(ranges)} ranges with {options['workers']} workers.")
+
+        started = time.perf_counter()
+        totals = {key: checkpoint.get(key, 0) for key in ('checked', *self.counters)}
+        this_run = 0
+        report = open(options['report'], 'a') if self.report_key else None
+        try:
+            for lower, upper, result in run_ranges(self.get_range_function(), ranges, options['workers']):
+                if report is not None:
+                    for item in result[self.report_key]:
+                        report.write(json.dumps(item, default=str) + '\n')
+                    report.flush()
+                this_run += result['checked']
+                for key in totals:
+                    value = result[key]
+                    totals[key] += len(value) if isinstance(value, list) else value
+                checkpoint.save(after=upper, **totals)
+        finally:
+            if report is not None:
+                report.close()
+
+        elapsed = time.perf_counter() - started
+        checkpoint.save(finished=True)
+        rate = this_run / elapsed if elapsed else 0
+        message = (f"{self.summary(totals)} "
+                   f"({this_run} this run in {elapsed:.1f}s, {rate:.0f} {self.row}s/s).")
+        if report is not None:
+            message += f" Report: {options['report']}"
+        self.stdout.write(message)
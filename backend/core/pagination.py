@@ -0,0 +1,99 @@
+"""
+Keyset (cursor) pagination for newest-first lists.
+
+Pages are ordered by a timestamp field and the primary key, both descending,
+and the cursor is the (timestamp, pk) of the last row served. The next page
+starts with an index seek to that key instead of skipping rows with OFFSET,
+so every page costs the same however deep into the history it is.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+def encode_cursor(*values):
+    """Encode key values as an opaque, URL-safe cursor."""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the list of values in a cursor from encode_cursor(); datetimes come back as ISO strings."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValidationError({'cursor': "Invalid cursor."})
+    if not isinstance(values, list):
+        raise ValidationError({'cursor': "Invalid cursor."})
+    return values
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first pages of `limit` rows keyed on (ordering_field, pk).
+
+    The queryset may yield model instances or dicts from values(); dicts must
+    include the ordering field and 'id'. Responses are {"results", "next"},
+    where next is the cursor of the following page or null.
+    """
+    ordering_field = 'date'
+    page_size = 20
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self._limit(request)
+        field = self.ordering_field
+        queryset = queryset.order_by(f'-{field}', '-pk')
+
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            timestamp, pk = self._position(cursor)
+            queryset = queryset.filter(
+                Q(**{f'{field}__lt': timestamp}) | Q(**{field: timestamp, 'pk__lt': pk}),
+                **{f'{field}__lte': timestamp},
+            )
+
+        rows = list(queryset[:self.limit + 1])
+        self.next_cursor = None
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            self.next_cursor = encode_cursor(*self._key(rows[-1]))
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({'results': data, 'next': self.next_cursor})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'results': schema,
+                'next': {'type': 'string', 'nullable': True},
+            },
+        }
+
+    def _limit(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.page_size))
+        except ValueError:
+            raise ValidationError({'limit': "Must be an integer."})
+        return max(1, min(limit, self.max_page_size))
+
+    def _position(self, cursor):
+        values = decode_cursor(cursor)
+        try:
+            timestamp, pk = values
+            return datetime.fromisoformat(timestamp), int(pk)
+        except (ValueError, TypeError):
+            raise ValidationError({'cursor': "Invalid cursor."})
+
+    def _key(self, row):
+        if isinstance(row, dict):
+            return row[self.ordering_field], row['id']
+        return getattr(row, self.ordering_field), row.pk
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
     'blackjack.apps.BlackjackConfig',
     'dice.apps.DiceConfig',
     'slots.apps.SlotsConfig',
+    'analytics.apps.AnalyticsConfig',
 ]
 
 MIDDLEWARE = [
@@ -126,6 +127,95 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_LIFETIME': timedelta(days=30),
     'SLIDING_TOKEN_REFRESH_LIFETIME_LATE_USER': timedelta(days=1),
     'SLIDING_TOKEN_LIFETIME_LATE_USER': timedelta(days=30),
+    'TOKEN_REFRESH_SERIALIZER': 'user.token_blacklist.FilteredTokenRefreshSerializer',
+}
+
+# Refresh tokens are checked against a per-worker Bloom filter of the
+# blacklist before the database (see user.token_blacklist).
+
+TOKEN_BLACKLIST_FILTER = {
+    'ERROR_RATE': 0.001,
+    'SYNC_INTERVAL': 5,
+    'REBUILD_INTERVAL': 3600,
+}
+
+# Game views authenticate JWTs from a per-process cache of each user's flags
+# and profile id, kept for TTL seconds (see user.authentication).
+
+AUTH_IDENTITY_CACHE = {
+    'TTL': 30,
+    'MAX_ENTRIES': 10000,
+}
+
+# Progressive slots jackpot: a share of every bet is added to the pool, and a
+# full line of TRIGGER_SYMBOL wins it.
+
+SLOTS_JACKPOT = {
+    'ENABLED': True,
+    'CONTRIBUTION_RATE': '0.01',
+    'SHARDS': 16,
+    'CACHE_TTL': 5,
+    'TRIGGER_SYMBOL': 'star',
+}
+
+# Seconds a worker serves a compiled slot machine before checking whether its
+# configuration version changed.
+
+SLOTS_MACHINE_CHECK_INTERVAL = 5
+
+# Optional per-worker queue of pre-generated spin outcomes per machine version.
+
+SLOTS_OUTCOME_QUEUE = {
+    'ENABLED': os.getenv('SLOTS_OUTCOME_QUEUE_ENABLED', 'false').lower() == 'true',
+    'DEPTH': 1000,
+    'BATCH': 100,
+    'IDLE_INTERVAL': 0.05,
+}
+
+# Live observed-RTP monitor: rolling (span seconds, buckets) windows kept per
+# worker and flushed to the hourly aggregate table every FLUSH_INTERVAL
+# seconds. THEORETICAL covers games that do not report an expected payout
+# per round; slot machines without an entry use the RTP simulated for their
+# current version by `manage.py simulate_slots_rtp`.
+
+ANALYTICS_RTP = {
+    'WINDOWS': {'5m': (300, 30), '1h': (3600, 60), '24h': (86400, 96)},
+    'FLUSH_INTERVAL': 60,
+    'THEORETICAL': {
+        # Even-money blackjack, no 3:2 bonus, played close to basic strategy.
+        'blackjack': '0.97',
+    },
+    'ALARM_Z_SCORE': 4,
+    'MIN_ROUNDS': 200,
+}
+
+# Leaderboards are updated in memory as rounds settle and show SIZE entries
+# of the CAPACITY each board tracks. Workers merge their additions into the
+# snapshot table every FLUSH_INTERVAL seconds (see analytics.leaderboards).
+
+ANALYTICS_LEADERBOARDS = {
+    'SIZE': 10,
+    'CAPACITY': 100,
+    'FLUSH_INTERVAL': 60,
+    'BALANCE_REFRESH_INTERVAL': 300,
+}
+
+# Game views run as async views under ASGI; their synchronous DRF handlers
+# share a pool of THREADS threads (see core.async_views).
+
+ASYNC_VIEWS = {
+    'THREADS': 16,
+}
+
+# Wallet balance cache: a per-worker L1 kept for L1_TTL seconds in front of
+# the Django cache (L2), which holds each balance for L2_TTL seconds. L2 is
+# only shared between workers with a shared cache backend; with the default
+# per-process LocMemCache, L2_TTL is capped at L1_TTL (see user.balance_cache).
+
+WALLET_BALANCE_CACHE = {
+    'L1_TTL': 2,
+    'L1_MAX_ENTRIES': 10000,
+    'L2_TTL': 300,
 }
 
 SPECTACULAR_SETTINGS = {
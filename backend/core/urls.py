@@ -17,4 +17,5 @@ urlpatterns = [
     path('api/blackjack/', include('blackjack.urls')),
     path('api/dice/', include('dice.urls')),
     path('api/slots/', include('slots.urls')),
+    path('api/analytics/', include('analytics.urls')),
 ]
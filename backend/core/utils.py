@@ -0,0 +1,25 @@
+import os
+import time
+import uuid
+
+
+def uuid7():
+    """
+    Return a time-ordered UUID (RFC 9562 version 7).
+
+    The first 48 bits hold the Unix time in milliseconds and the next 12 bits
+    the sub-millisecond fraction, so values generated later sort later and new
+    rows are appended to the right-hand edge of a B-tree index instead of
+    landing on a random page.
+    """
+    nanoseconds = time.time_ns()
+    milliseconds, remainder = divmod(nanoseconds, 1_000_000)
+    sub_millisecond = remainder * 4096 // 1_000_000
+    random_bits = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+
+    value = (milliseconds & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76
+    value |= sub_millisecond << 64
+    value |= 0b10 << 62
+    value |= random_bits
+    return uuid.UUID(int=value)
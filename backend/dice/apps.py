@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class DiceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dice'
+
+    def ready(self):
+        from .odds import dice_odds
+        dice_odds.build()
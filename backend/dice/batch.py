@@ -0,0 +1,42 @@
+"""
+Batch dice play.
+
+Rounds are grouped by their parameters. Each group throws all of its dice
+with one draw per die through the dice engine and scores every total with
+one lookup into the group's payout vector, so the per-round cost is a
+couple of list indexings instead of a game context per round.
+"""
+import random
+from decimal import Decimal
+
+from .engine import dice_engine
+from .game_logic import DiceGameLogic
+
+
+def play_rounds(rounds, rng=random):
+    """
+    Roll and score rounds of dice.
+
+    `rounds` is a list of dicts with choice1, choice2, bet and guessed_number.
+    Returns one dict per round, in order, with rolls, total, payout and the
+    round's expected payout.
+    """
+    groups = {}
+    for index, data in enumerate(rounds):
+        key = ((int(data['choice1']), int(data['choice2'])), Decimal(str(data['bet'])), data['guessed_number'])
+        groups.setdefault(key, []).append(index)
+
+    results = [None] * len(rounds)
+    for (faces, bet, guessed_number), indices in groups.items():
+        throws = dice_engine.roll(faces, count=len(indices), rng=rng)
+        payouts = DiceGameLogic.payout_vector(faces, bet, guessed_number)
+        expected = DiceGameLogic.expected_payout(faces, bet, guessed_number)
+        for index, rolls in zip(indices, throws):
+            total = sum(rolls)
+            results[index] = {
+                'rolls': rolls,
+                'total': total,
+                'payout': payouts[total],
+                'expected': expected,
+            }
+    return results
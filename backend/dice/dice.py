@@ -1,42 +1,75 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import cache
 import random
 
+MIN_FACES = 4
+MAX_FACES = 100
 
-class Figure(ABC):
-    def __init__(self, name, faces):
-        self.name = name
-        self.faces = faces
 
-    @abstractmethod
-    def roll(self):
-        pass
+@dataclass(frozen=True)
+class Figure:
+    """
+    An immutable die. Figures are flyweights: get_figure() hands out one
+    shared instance per face count, so rolling never allocates a die.
+    """
+    name: str
+    faces: int
 
+    @property
+    def values(self):
+        return range(1, self.faces + 1)
 
-class Cube(Figure):
-    def __init__(self, name="Cube", faces=6):
-        super().__init__(name, faces)
+    def roll(self, rng=random):
+        """ Simulates rolling the figure. """
+        return rng.randint(1, self.faces)
 
-    def roll(self):
-        """ Simulates rolling the cube. """
-        return random.randint(1, self.faces)
 
+@dataclass(frozen=True)
+class Tetrahedron(Figure):
+    name: str = "Tetrahedron"
+    faces: int = 4
 
-class Octahedron(Figure):
-    def __init__(self, name="Octahedron", faces=8):
-        super().__init__(name, faces)
 
-    def roll(self):
-        """ Simulates rolling the octahedron. """
-        return random.randint(1, self.faces)
+@dataclass(frozen=True)
+class Cube(Figure):
+    name: str = "Cube"
+    faces: int = 6
+
+
+@dataclass(frozen=True)
+class Octahedron(Figure):
+    name: str = "Octahedron"
+    faces: int = 8
 
 
+@dataclass(frozen=True)
 class Dodecahedron(Figure):
-    def __init__(self, name="Dodecahedron", faces=12):
-        super().__init__(name, faces)
+    name: str = "Dodecahedron"
+    faces: int = 12
+
+
+@dataclass(frozen=True)
+class Icosahedron(Figure):
+    name: str = "Icosahedron"
+    faces: int = 20
+
+
+NAMED_FIGURES = {figure.faces: figure for figure in (Tetrahedron, Cube, Octahedron, Dodecahedron, Icosahedron)}
+
+
+def get_figure(faces):
+    """ Returns the shared figure with the given number of faces (d4 to d100). """
+    faces = int(faces)
+    if not MIN_FACES <= faces <= MAX_FACES:
+        raise ValueError(f"Dice must have between {MIN_FACES} and {MAX_FACES} faces.")
+    return _shared_figure(faces)
+
 
-    def roll(self):
-        """ Simulates rolling the dodecahedron. """
-        return random.randint(1, self.faces)
+@cache
+def _shared_figure(faces):
+    figure_class = NAMED_FIGURES.get(faces)
+    return figure_class() if figure_class else Figure(name=f"d{faces}", faces=faces)
 
 
 class FigureFactory(ABC):
@@ -47,20 +80,20 @@ class FigureFactory(ABC):
 
 class CubeFactory(FigureFactory):
     def create_figure(self):
-        """ Creates a Cube instance. """
-        return Cube()
+        """ Returns the shared Cube. """
+        return get_figure(6)
 
 
 class OctahedronFactory(FigureFactory):
     def create_figure(self):
-        """ Creates an Octahedron instance. """
-        return Octahedron()
+        """ Returns the shared Octahedron. """
+        return get_figure(8)
 
 
 class DodecahedronFactory(FigureFactory):
     def create_figure(self):
-        """ Creates a Dodecahedron instance. """
-        return Dodecahedron()
+        """ Returns the shared Dodecahedron. """
+        return get_figure(12)
 
 
 def get_figure_factories():
@@ -0,0 +1,98 @@
+"""
+Dice engine for any number of dice with 4 to 100 faces.
+
+Dice are the shared figures from get_figure(), so rolling never builds die
+objects. The distribution of the total of a set of dice depends only on the
+multiset of face counts, so it is cached in an LRU keyed by the sorted face
+counts: every ordering of the same dice shares an entry, and a larger set is
+built from the cached set without its largest die by one sliding-window pass.
+Batches are drawn per die with random.choices, and when only the totals are
+needed they are drawn straight from the cached cumulative distribution, at
+the same cost however many dice are thrown.
+"""
+import random
+from functools import lru_cache
+from itertools import accumulate
+
+from .dice import get_figure
+
+DISTRIBUTION_CACHE_SIZE = 512
+MAX_DICE = 100
+
+
+def add_die(ways, faces):
+    """Return ways[total] after adding one die with `faces` faces to the distribution `ways`."""
+    result = [0] * (len(ways) + faces)
+    window = 0
+    for total in range(1, len(result)):
+        if total <= len(ways):
+            window += ways[total - 1]
+        if total > faces:
+            window -= ways[total - faces - 1]
+        result[total] = window
+    return result
+
+
+class DiceEngine:
+    """Rolls and distributions for arbitrary sets of dice; one instance is shared per process."""
+
+    def __init__(self, cache_size=DISTRIBUTION_CACHE_SIZE):
+        self._distribution = lru_cache(maxsize=cache_size)(self._build_distribution)
+        self._cumulative = lru_cache(maxsize=cache_size)(self._build_cumulative)
+
+    @staticmethod
+    def key(faces):
+        """The multiset of face counts of a set of dice, validated and in canonical order."""
+        faces = tuple(sorted(get_figure(f).faces for f in faces))
+        if not 1 <= len(faces) <= MAX_DICE:
+            raise ValueError(f"Between 1 and {MAX_DICE} dice can be thrown at once.")
+        return faces
+
+    @staticmethod
+    def figures(faces):
+        return tuple(get_figure(f) for f in faces)
+
+    def distribution(self, faces):
+        """Return ways[total] for one throw of the dice; totals below the number of dice are 0."""
+        return self._distribution(self.key(faces))
+
+    def outcomes(self, faces):
+        """Number of equally likely throws of the dice."""
+        outcomes = 1
+        for f in faces:
+            outcomes *= int(f)
+        return outcomes
+
+    def guess(self, faces, guessed_number):
+        """Return (exact ways, near ways, outcomes) for a guess of the total."""
+        ways = self.distribution(faces)
+        exact = ways[guessed_number] if 0 <= guessed_number < len(ways) else 0
+        near = sum(ways[total] for total in (guessed_number - 1, guessed_number + 1) if 0 <= total < len(ways))
+        return exact, near, self.outcomes(faces)
+
+    def roll(self, faces, count=1, rng=random):
+        """Return `count` throws of the dice, each a tuple of rolls in the order the dice were given."""
+        columns = [rng.choices(figure.values, k=count) for figure in self.figures(faces)]
+        return list(zip(*columns))
+
+    def roll_totals(self, faces, count=1, rng=random):
+        """Return the totals of `count` throws, drawn from the cached distribution."""
+        totals, cum_weights = self._cumulative(self.key(faces))
+        return rng.choices(totals, cum_weights=cum_weights, k=count)
+
+    def _build_distribution(self, key):
+        if len(key) == 1:
+            return tuple(add_die([1], key[0]))
+        return tuple(add_die(self._distribution(key[:-1]), key[-1]))
+
+    def _build_cumulative(self, key):
+        ways = self._distribution(key)
+        outcomes = self.outcomes(key)
+        # Dividing the exact integer sums keeps the weights correctly rounded even for 100d100.
+        return range(len(ways)), [running / outcomes for running in accumulate(ways)]
+
+    def cache_info(self):
+        return self._distribution.cache_info()
+
+
+dice_engine = DiceEngine()
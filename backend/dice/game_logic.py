@@ -38,8 +38,22 @@ class DiceGameLogic:
             "payout": payout,
         }
 
+    def play_wagers(self, choice1, choice2, wagers):
+        """Rolls the dice once and settles every (guessed_number, bet) wager against that roll."""
+        fig1, fig2 = self._create_figures(choice1, choice2)
+        roll1, roll2 = self._roll_dice(fig1, fig2)
+        total = roll1 + roll2
+        payouts = self.wager_table((fig1.faces, fig2.faces), wagers)[total]
+
+        return {
+            "rolls": (roll1, roll2),
+            "total": total,
+            "payout": sum(payouts, Decimal('0.00')),
+            "payouts": payouts,
+        }
+
     def _create_figures(self, choice1, choice2):
-        """Creates two dice based on the user's selection."""
+        """Returns the shared dice for the user's selection."""
         fig1 = self.figure_factories[choice1].create_figure()
         fig2 = self.figure_factories[choice2].create_figure()
         return fig1, fig2
@@ -49,17 +63,66 @@ class DiceGameLogic:
         """Rolls two dice."""
         return fig1.roll(), fig2.roll()
 
+    @classmethod
+    def payout_amounts(cls, faces, bet):
+        """Return (exact guess payout, off-by-one payout) for a bet on a set of dice given by their face counts."""
+        bet = Decimal(bet)
+        multiplier = Decimal(sum(int(f) for f in faces)) / cls.PAYOUT_SCALE_FACTOR
+        return (bet * (multiplier + 1)).quantize(Decimal('0.01')), (bet * multiplier).quantize(Decimal('0.01'))
+
+    @classmethod
+    def payout_vector(cls, faces, bet, guessed_number):
+        """Return payouts indexed by total for one bet, so scoring a roll is a single lookup."""
+        exact, near = cls.payout_amounts(faces, bet)
+        vector = [Decimal('0.00')] * (sum(int(f) for f in faces) + 2)
+        vector[guessed_number] = exact
+        vector[guessed_number - 1] = near
+        vector[guessed_number + 1] = near
+        return vector
+
+    @classmethod
+    def wager_table(cls, faces, wagers):
+        """
+        Return, for every total, the payout of each (guessed_number, bet) wager,
+        filled in one pass over the wagers so settling a roll is one lookup.
+        """
+        table = [[Decimal('0.00')] * len(wagers) for _ in range(sum(int(f) for f in faces) + 2)]
+        for index, (guessed_number, bet) in enumerate(wagers):
+            exact, near = cls.payout_amounts(faces, bet)
+            table[guessed_number][index] = exact
+            table[guessed_number - 1][index] = near
+            table[guessed_number + 1][index] = near
+        return table
+
+    @classmethod
+    def expected_wagers_payout(cls, faces, wagers):
+        """Theoretical total payout of a set of wagers settled against one throw."""
+        from .engine import dice_engine
+
+        ways = dice_engine.distribution(faces)
+        table = cls.wager_table(faces, wagers)
+        return sum(
+            (sum(table[total]) * count for total, count in enumerate(ways) if count), Decimal('0')
+        ) / dice_engine.outcomes(faces)
+
+    @classmethod
+    def expected_payout(cls, faces, bet, guessed_number):
+        """Theoretical payout of a bet, averaged over every equally likely throw of the dice."""
+        from .engine import dice_engine
+
+        exact_amount, near_amount = cls.payout_amounts(faces, bet)
+        exact, near, outcomes = dice_engine.guess(faces, guessed_number)
+        return (exact_amount * exact + near_amount * near) / outcomes
+
     @classmethod
     def _calculate_payout(cls, ctx: GameContext):
         """Calculates payout based on game context."""
-        min_faces = Decimal(ctx.fig1.faces)
-        max_faces = Decimal(ctx.fig2.faces)
-        multiplier = (min_faces + max_faces) / cls.PAYOUT_SCALE_FACTOR
+        exact, near = cls.payout_amounts((ctx.fig1.faces, ctx.fig2.faces), ctx.bet)
         match ctx.total:
             case _ if ctx.total == ctx.guessed_number:
-                return (ctx.bet * (multiplier + 1)).quantize(Decimal('0.01'))
+                return exact
             case _ if abs(ctx.total - ctx.guessed_number) == 1:
-                return (ctx.bet * multiplier).quantize(Decimal('0.01'))
+                return near
             case _:
                 return Decimal('0.00')
 
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.async_views import async_views_settings
+
+URL = '/api/dice/start/'
+DATA = {'choice1': 6, 'choice2': 6, 'bet': '1.00', 'guessed_number': 7}
+
+
+class Command(BaseCommand):
+    help = (
+        "Play dice rounds from many concurrent slow clients through the WSGI handler with one thread per "
+        "connection and through the ASGI handler with the async view pool, and compare throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=64, help='Concurrent client connections.')
+        parser.add_argument('--requests', type=int, default=5, help='Rounds each client plays.')
+        parser.add_argument('--client-delay', type=float, default=0.2,
+                            help='Seconds each client takes to send a request.')
+
+    def handle(self, *args, **options):
+        threads = async_views_settings()['THREADS']
+        user = get_user_model().objects.create_user(email='bench-async-views@example.com', password='x')
+        try:
+            user.profile.balance = Decimal('1000000.00')
+            user.profile.save()
+            headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+            total = options['clients'] * options['requests']
+            elapsed = self._wsgi(headers, threads, options)
+            self.stdout.write(
+                f"WSGI, {threads} threads: {total} rounds in {elapsed:.2f}s ({total / elapsed:.0f} rounds/s)"
+            )
+            elapsed = asyncio.run(self._asgi(headers, options))
+            self.stdout.write(
+                f"ASGI, {threads} pool threads: {total} rounds in {elapsed:.2f}s ({total / elapsed:.0f} rounds/s)"
+            )
+        finally:
+            user.delete()
+
+    def _wsgi(self, headers, threads, options):
+        """A threaded WSGI server: a thread is held while its client sends the request."""
+        local = threading.local()
+
+        def play():
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            time.sleep(options['client_delay'])
+            response = local.client.post(URL, DATA, content_type='application/json', headers=headers)
+            assert response.status_code == 200, response.content
+            connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            for future in [pool.submit(play) for _ in range(options['clients'] * options['requests'])]:
+                future.result()
+        return time.perf_counter() - started
+
+    async def _asgi(self, headers, options):
+        """An ASGI server: clients wait on the event loop and only the views take pool threads."""
+        client = AsyncClient()
+
+        async def connection():
+            for _ in range(options['requests']):
+                await asyncio.sleep(options['client_delay'])
+                response = await client.post(URL, DATA, content_type='application/json', headers=headers)
+                assert response.status_code == 200, response.content
+
+        started = time.perf_counter()
+        await asyncio.gather(*(connection() for _ in range(options['clients'])))
+        return time.perf_counter() - started
@@ -0,0 +1,40 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from dice.services import DiceGameService
+
+
+class Command(BaseCommand):
+    help = "Compare N single dice rounds with one batch of N rounds (rolled back afterwards)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=500, help='Rounds played per variant.')
+
+    def handle(self, *args, **options):
+        data = {'choice1': 6, 'choice2': 8, 'bet': Decimal('1.00'), 'guessed_number': 8}
+        rounds = [data] * options['rounds']
+
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(email='bench-dice-batch@example.com', password='x')
+            user.profile.balance = Decimal('1000000.00')
+            user.profile.save()
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for round_data in rounds:
+                    DiceGameService.execute_game_flow(user, round_data)
+                single = time.perf_counter() - started
+            self.stdout.write(f"single rounds: {single * 1000:.1f} ms, {len(queries)} queries")
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                DiceGameService.execute_batch(user, rounds)
+                batch = time.perf_counter() - started
+            self.stdout.write(f"one batch: {batch * 1000:.1f} ms, {len(queries)} queries")
+
+            transaction.set_rollback(True)
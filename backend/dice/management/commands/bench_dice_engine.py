@@ -0,0 +1,40 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from dice.dice import Figure
+from dice.engine import DiceEngine
+
+
+class Command(BaseCommand):
+    help = "Compare rolling fresh figure objects with the dice engine for growing numbers of dice."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--throws', type=int, default=10000, help='Throws per number of dice.')
+        parser.add_argument('--faces', type=int, default=6, help='Faces of every die.')
+
+    def handle(self, *args, **options):
+        throws = options['throws']
+        faces = options['faces']
+        engine = DiceEngine()
+
+        for dice in (2, 10, 50, 100):
+            started = time.perf_counter()
+            for _ in range(throws):
+                sum(Figure(name='die', faces=faces).roll() for _ in range(dice))
+            objects = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for rolls in engine.roll((faces,) * dice, count=throws):
+                sum(rolls)
+            rolled = time.perf_counter() - started
+
+            started = time.perf_counter()
+            engine.roll_totals((faces,) * dice, count=throws, rng=random)
+            totals = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{dice:>3}d{faces}: figure objects {objects * 1000:8.1f} ms, "
+                f"engine rolls {rolled * 1000:7.1f} ms, engine totals {totals * 1000:5.1f} ms"
+            )
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dice', '0002_alter_dicegamemodel_bet_alter_dicegamemodel_payout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dicegamemodel',
+            name='wagers',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='dicegamemodel',
+            name='guessed_number',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.15 on 2026-10-19 17:17
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. Building the
+    # index concurrently keeps the dice table writable while it is populated.
+    atomic = False
+
+    dependencies = [
+        ('dice', '0003_dicegamemodel_wagers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Rolls made before this migration have no recorded time and keep NULL
+        # rather than all being stamped with the time the migration ran.
+        migrations.AddField(
+            model_name='dicegamemodel',
+            name='created_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='dicegamemodel',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        AddIndexConcurrently(
+            model_name='dicegamemodel',
+            index=models.Index(fields=['user', '-created_at'], name='dice_game_user_created_idx'),
+        ),
+    ]
@@ -6,13 +6,21 @@ from user.models import User
 class DiceGameModel(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     bet = models.DecimalField(max_digits=10, decimal_places=2)
-    guessed_number = models.IntegerField()
+    guessed_number = models.IntegerField(null=True, blank=True)
     choice1 = models.CharField(max_length=2)
     choice2 = models.CharField(max_length=2)
     roll1 = models.IntegerField()
     roll2 = models.IntegerField()
     total = models.IntegerField()
     payout = models.DecimalField(max_digits=10, decimal_places=2)
+    wagers = models.JSONField(default=list, blank=True)
+    # Null for rolls made before the time was recorded.
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='dice_game_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email}'s game with bet {self.bet}"
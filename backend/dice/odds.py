@@ -0,0 +1,91 @@
+"""
+Exact odds and expected value of every dice bet.
+
+The distribution of the sum of two dice comes from the dice engine, counted
+in ways out of faces1 * faces2 so every probability is exact. The table
+covers every pair of dice from get_figure_factories() and every guess the
+game accepts, is built once per process at startup and is served as
+pre-rendered JSON with an ETag.
+"""
+import hashlib
+import json
+from fractions import Fraction
+
+from .dice import get_figure_factories
+from .engine import dice_engine
+from .game_logic import DiceGameLogic
+
+
+def sum_distribution(faces1, faces2):
+    """Return ways[total] for every total of one roll of each die; index 0 and 1 are always 0."""
+    return list(dice_engine.distribution((faces1, faces2)))
+
+
+class DiceOdds:
+    """The per-process odds table; build() it once, then read it without computation."""
+
+    def __init__(self):
+        self.pairs = {}
+        self.body = None
+        self.etag = None
+
+    def build(self, faces=None):
+        faces = sorted(faces or get_figure_factories())
+        self.pairs = {}
+        for faces1 in faces:
+            for faces2 in faces:
+                self.pairs[(faces1, faces2)] = self._pair(faces1, faces2)
+        table = {
+            'payout_scale_factor': DiceGameLogic.PAYOUT_SCALE_FACTOR,
+            'pairs': [self._serialize(pair) for pair in self.pairs.values()],
+        }
+        self.body = json.dumps(table, separators=(',', ':')).encode()
+        self.etag = '"%s"' % hashlib.sha256(self.body).hexdigest()[:32]
+        return self
+
+    @staticmethod
+    def _pair(faces1, faces2):
+        ways = sum_distribution(faces1, faces2)
+        outcomes = faces1 * faces2
+        multiplier = Fraction(faces1 + faces2, DiceGameLogic.PAYOUT_SCALE_FACTOR)
+        guesses = {}
+        for guess in range(2, faces1 + faces2 + 1):
+            exact = ways[guess]
+            near = ways[guess - 1] + (ways[guess + 1] if guess + 1 < len(ways) else 0)
+            guesses[guess] = {
+                'exact_ways': exact,
+                'near_ways': near,
+                'expected_return': Fraction(exact, outcomes) * (multiplier + 1) + Fraction(near, outcomes) * multiplier,
+            }
+        return {
+            'faces': (faces1, faces2),
+            'outcomes': outcomes,
+            'multiplier': multiplier,
+            'ways': ways,
+            'guesses': guesses,
+        }
+
+    @staticmethod
+    def _serialize(pair):
+        outcomes = pair['outcomes']
+        return {
+            'faces': list(pair['faces']),
+            'outcomes': outcomes,
+            'exact_multiplier': float(pair['multiplier'] + 1),
+            'near_multiplier': float(pair['multiplier']),
+            'distribution': {total: ways for total, ways in enumerate(pair['ways']) if ways},
+            'guesses': [
+                {
+                    'guessed_number': guess,
+                    'exact_ways': odds['exact_ways'],
+                    'near_ways': odds['near_ways'],
+                    'win_probability': round((odds['exact_ways'] + odds['near_ways']) / outcomes, 6),
+                    'expected_return': round(float(odds['expected_return']), 6),
+                    'house_edge': round(float(1 - odds['expected_return']), 6),
+                }
+                for guess, odds in pair['guesses'].items()
+            ],
+        }
+
+
+dice_odds = DiceOdds()
@@ -23,3 +23,69 @@ class StartDiceGameSerializer(serializers.Serializer):
             })
 
         return data
+
+
+class WagerSerializer(serializers.Serializer):
+    guessed_number = serializers.IntegerField(min_value=2)
+    bet = serializers.DecimalField(min_value=Decimal('0.01'), max_digits=10, decimal_places=2)
+
+
+class MultiWagerDiceGameSerializer(serializers.Serializer):
+    """Several (guessed_number, bet) wagers settled against one roll of choice1 and choice2."""
+    MAX_WAGERS = 25
+
+    choice1 = serializers.ChoiceField(choices=StartDiceGameSerializer.VALID_DICE_CHOICES)
+    choice2 = serializers.ChoiceField(choices=StartDiceGameSerializer.VALID_DICE_CHOICES)
+    wagers = WagerSerializer(many=True)
+
+    def validate(self, data):
+        """Validates that every guess is a distinct total the selected dice can roll."""
+        max_possible_sum = int(data['choice1']) + int(data['choice2'])
+        min_possible_sum = 2
+        guesses = [wager['guessed_number'] for wager in data['wagers']]
+
+        if not 1 <= len(guesses) <= self.MAX_WAGERS:
+            raise serializers.ValidationError({
+                'wagers': f"Between 1 and {self.MAX_WAGERS} wagers can be placed on one roll."
+            })
+        if len(set(guesses)) != len(guesses):
+            raise serializers.ValidationError({'wagers': "Each total can only be guessed once per roll."})
+        if not all(min_possible_sum <= guess <= max_possible_sum for guess in guesses):
+            raise serializers.ValidationError({
+                'wagers': f"Guesses must be between {min_possible_sum} and {max_possible_sum} based on selected dice."
+            })
+
+        return data
+
+
+class BatchDiceGameSerializer(serializers.Serializer):
+    """
+    Either `rounds`, a list of rounds with their own parameters, or `count`
+    rounds sharing choice1, choice2, bet and guessed_number.
+    """
+    MAX_ROUNDS = 1000
+
+    rounds = StartDiceGameSerializer(many=True, required=False)
+    count = serializers.IntegerField(min_value=1, max_value=MAX_ROUNDS, required=False)
+    choice1 = serializers.ChoiceField(choices=StartDiceGameSerializer.VALID_DICE_CHOICES, required=False)
+    choice2 = serializers.ChoiceField(choices=StartDiceGameSerializer.VALID_DICE_CHOICES, required=False)
+    bet = serializers.DecimalField(min_value=Decimal('0.01'), max_digits=10, decimal_places=2, required=False)
+    guessed_number = serializers.IntegerField(min_value=2, required=False)
+
+    def validate(self, data):
+        """Expands the request into a list of validated rounds."""
+        if 'rounds' in data:
+            if not 1 <= len(data['rounds']) <= self.MAX_ROUNDS:
+                raise serializers.ValidationError({
+                    'rounds': f"Between 1 and {self.MAX_ROUNDS} rounds can be played at once."
+                })
+            return {'rounds': data['rounds']}
+
+        params = {field: data.get(field) for field in ('choice1', 'choice2', 'bet', 'guessed_number')}
+        if 'count' not in data or None in params.values():
+            raise serializers.ValidationError(
+                "Send either rounds, or count with choice1, choice2, bet and guessed_number."
+            )
+        round_serializer = StartDiceGameSerializer(data=params)
+        round_serializer.is_valid(raise_exception=True)
+        return {'rounds': [round_serializer.validated_data] * data['count']}
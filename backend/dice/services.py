@@ -1,5 +1,11 @@
 from decimal import Decimal
 from django.db import transaction
+from analytics.signals import send_round_settled
+from user.ledger import ledger_reference, line_for, new_round_id
+from user.models import LedgerEntry
+from user.stats import record_rounds
+from user.wallet import apply_delta
+from .batch import play_rounds
 from .dice import get_figure_factories
 from .game_logic import DiceGameLogic
 from .models import DiceGameModel
@@ -8,7 +14,7 @@ from .models import DiceGameModel
 class DiceGameService:
     @staticmethod
     def execute_game_flow(user, data):
-        with transaction.atomic():
+        with transaction.atomic(), ledger_reference('dice'):
             bet = Decimal(str(data['bet']))
 
             if user.profile.balance < bet:
@@ -28,11 +34,115 @@ class DiceGameService:
             if result["payout"] > 0:
                 user.profile.add_balance(Decimal(str(result["payout"])))
 
+            payout = Decimal(str(result['payout']))
+            record_rounds(user.profile.pk, 'dice', bet, payout, payout - bet)
+
+            send_round_settled(
+                DiceGameModel, 'dice', 'dice', bet, Decimal(str(result['payout'])),
+                expected=DiceGameLogic.expected_payout(
+                    (data['choice1'], data['choice2']), bet, data['guessed_number']
+                ),
+                user_id=user.pk,
+            )
+
         return result
 
     @staticmethod
-    def save_game_to_db(user, data, result):
-        DiceGameModel.objects.create(
+    def execute_wagers(user, data):
+        """
+        Roll once for several wagers and settle them together: one balance
+        update with the net result and one history row holding the wager list.
+        """
+        faces = (data['choice1'], data['choice2'])
+        wagers = [(wager['guessed_number'], Decimal(str(wager['bet']))) for wager in data['wagers']]
+        total_bet = sum(bet for _, bet in wagers)
+
+        game_logic = DiceGameLogic(get_figure_factories(), user.profile.balance)
+        result = game_logic.play_wagers(data['choice1'], data['choice2'], wagers)
+        result['wagers'] = [
+            {'guessed_number': guessed_number, 'bet': bet, 'payout': payout}
+            for (guessed_number, bet), payout in zip(wagers, result['payouts'])
+        ]
+
+        with transaction.atomic():
+            new_balance = apply_delta(
+                user.profile.pk, result['payout'] - total_bet, required=total_bet,
+                lines=DiceGameService._ledger_lines([(total_bet, result['payout'])]),
+            )
+
+            DiceGameModel.objects.create(
+                user=user,
+                bet=total_bet,
+                choice1=data['choice1'],
+                choice2=data['choice2'],
+                roll1=result['rolls'][0],
+                roll2=result['rolls'][1],
+                total=result['total'],
+                payout=result['payout'],
+                wagers=[{key: str(value) for key, value in wager.items()} for wager in result['wagers']],
+            )
+            record_rounds(user.profile.pk, 'dice', total_bet, result['payout'], result['payout'] - total_bet)
+            send_round_settled(
+                DiceGameModel, 'dice', 'dice', total_bet, result['payout'],
+                expected=DiceGameLogic.expected_wagers_payout(faces, wagers), user_id=user.pk,
+            )
+
+        user.profile.balance = new_balance
+        return result
+
+    @staticmethod
+    def execute_batch(user, rounds):
+        """
+        Play many rounds and settle them together: the balance is updated once
+        with the net result and the history rows are inserted in one query.
+        """
+        results = play_rounds(rounds)
+        total_bet = sum(Decimal(str(data['bet'])) for data in rounds)
+        total_payout = sum(result['payout'] for result in results)
+
+        with transaction.atomic():
+            new_balance = apply_delta(
+                user.profile.pk, total_payout - total_bet, required=total_bet,
+                lines=DiceGameService._ledger_lines(
+                    [(Decimal(str(data['bet'])), result['payout']) for data, result in zip(rounds, results)]
+                ),
+            )
+
+            DiceGameModel.objects.bulk_create([
+                DiceGameService._history_row(user, data, result) for data, result in zip(rounds, results)
+            ])
+            record_rounds(
+                user.profile.pk, 'dice', total_bet, total_payout,
+                max(result['payout'] - Decimal(str(data['bet'])) for data, result in zip(rounds, results)),
+                rounds=len(rounds),
+            )
+            for data, result in zip(rounds, results):
+                send_round_settled(
+                    DiceGameModel, 'dice', 'dice', Decimal(str(data['bet'])), result['payout'],
+                    expected=result['expected'], user_id=user.pk,
+                )
+
+        user.profile.balance = new_balance
+        return {
+            'rounds': results,
+            'total_bet': total_bet,
+            'total_payout': total_payout,
+        }
+
+    @staticmethod
+    def _ledger_lines(rounds):
+        """Ledger lines for (bet, payout) rounds settled in one balance update."""
+        lines = []
+        for bet, payout in rounds:
+            round_id = new_round_id()
+            lines.append(line_for(-bet, game='dice', round_id=round_id, kind=LedgerEntry.Kind.BET))
+            if payout > 0:
+                lines.append(line_for(payout, game='dice', round_id=round_id, kind=LedgerEntry.Kind.PAYOUT))
+        return lines
+
+    @staticmethod
+    def _history_row(user, data, result):
+        return DiceGameModel(
             user=user,
             bet=Decimal(str(data['bet'])),
             guessed_number=data['guessed_number'],
@@ -44,6 +154,10 @@ class DiceGameService:
             payout=Decimal(str(result['payout'])),
         )
 
+    @staticmethod
+    def save_game_to_db(user, data, result):
+        DiceGameService._history_row(user, data, result).save()
+
     @staticmethod
     def build_response(result, user):
         return {
@@ -53,4 +167,34 @@ class DiceGameService:
             "payout": result["payout"],
             "new_balance": user.profile.balance,
             "message": "You won!" if result["payout"] > 0 else "You lost."
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def build_wagers_response(result, user):
+        return {
+            "roll1": result["rolls"][0],
+            "roll2": result["rolls"][1],
+            "total": result["total"],
+            "payout": result["payout"],
+            "wagers": result["wagers"],
+            "new_balance": user.profile.balance,
+            "message": "You won!" if result["payout"] > 0 else "You lost."
+        }
+
+    @staticmethod
+    def build_batch_response(batch, user):
+        return {
+            "rounds": [
+                {
+                    "roll1": result["rolls"][0],
+                    "roll2": result["rolls"][1],
+                    "total": result["total"],
+                    "payout": result["payout"],
+                }
+                for result in batch["rounds"]
+            ],
+            "total_bet": batch["total_bet"],
+            "total_payout": batch["total_payout"],
+            "net": batch["total_payout"] - batch["total_bet"],
+            "new_balance": user.profile.balance,
+        }
@@ -1,4 +1,7 @@
+import asyncio
+import itertools
 import os
+import random
 import unittest
 from decimal import Decimal
 from unittest import TestCase
@@ -7,10 +10,19 @@ from unittest.mock import patch, MagicMock
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
 from rest_framework import serializers
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase as DjangoTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
 from .game_logic import DiceGameLogic, GameContext
 from .services import DiceGameService
-from .dice import Cube, Octahedron, Dodecahedron
+from .dice import Cube, Octahedron, Dodecahedron, get_figure
+from .engine import DiceEngine
 from .serializers import StartDiceGameSerializer
+from .models import DiceGameModel
+from .odds import dice_odds, sum_distribution
+from .batch import play_rounds
 
 
 class TestDice(unittest.TestCase):
@@ -31,6 +43,48 @@ class TestDice(unittest.TestCase):
         self.assertIn(result, range(1, 13))
 
 
+class TestDiceEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = DiceEngine()
+
+    def test_figures_are_shared(self):
+        self.assertIs(get_figure(6), get_figure('6'))
+        self.assertEqual(get_figure(6), Cube())
+        self.assertEqual(get_figure(100).name, 'd100')
+        with self.assertRaises(ValueError):
+            get_figure(3)
+
+    def test_distribution_matches_every_throw(self):
+        faces = (4, 10, 6)
+        ways = [0] * (sum(faces) + 1)
+        for rolls in itertools.product(*(range(1, f + 1) for f in faces)):
+            ways[sum(rolls)] += 1
+        self.assertEqual(list(self.engine.distribution(faces)), ways)
+
+        self.engine.distribution((6, 10, 4))
+        self.assertEqual(self.engine.cache_info().hits, 1)
+
+    def test_rolls_and_totals_stay_in_range(self):
+        rng = random.Random(7)
+        faces = (20, 4, 100)
+        for rolls in self.engine.roll(faces, count=500, rng=rng):
+            for roll, f in zip(rolls, faces):
+                self.assertIn(roll, range(1, f + 1))
+        many = (6,) * 50
+        for total in self.engine.roll_totals(many, count=500, rng=rng):
+            self.assertIn(total, range(50, 301))
+        self.assertAlmostEqual(sum(self.engine.roll_totals(many, count=5000, rng=rng)) / 5000, 175, delta=2)
+
+    def test_expected_payout_for_many_dice(self):
+        faces = (4, 6, 8)
+        bet = Decimal('3')
+        for guess in range(3, 19):
+            payouts = DiceGameLogic.payout_vector(faces, bet, guess)
+            total = sum(payouts[sum(rolls)] for rolls in itertools.product(*(range(1, f + 1) for f in faces)))
+            self.assertEqual(DiceGameLogic.expected_payout(faces, bet, guess), total / 192)
+
+
 class TestDiceGameLogic(unittest.TestCase):
 
     def setUp(self):
@@ -80,7 +134,10 @@ class TestDiceGameService(unittest.TestCase):
     @patch('dice.services.transaction.atomic')
     @patch('dice.services.get_figure_factories')
     @patch('dice.services.DiceGameService.save_game_to_db')
-    def test_execute_game_flow_win(self, mock_save_game, mock_get_factories, mock_atomic):
+    @patch('dice.services.record_rounds')
+    @patch('dice.services.send_round_settled')
+    def test_execute_game_flow_win(self, mock_send_round_settled, mock_record_rounds, mock_save_game,
+                                    mock_get_factories, mock_atomic):
         user = MagicMock()
         user.profile.balance = Decimal('100.00')
         user.profile.deduct_balance = MagicMock()
@@ -119,11 +176,15 @@ class TestDiceGameService(unittest.TestCase):
             user.profile.deduct_balance.assert_called_once_with(Decimal('10'))
             user.profile.add_balance.assert_called_once_with(Decimal('20'))
             mock_save_game.assert_called_once_with(user, data, result)
+            mock_send_round_settled.assert_called_once()
 
     @patch('dice.services.transaction.atomic')
     @patch('dice.services.get_figure_factories')
     @patch('dice.services.DiceGameService.save_game_to_db')
-    def test_execute_game_flow_loss(self, mock_save_game, mock_get_factories, mock_atomic):
+    @patch('dice.services.record_rounds')
+    @patch('dice.services.send_round_settled')
+    def test_execute_game_flow_loss(self, mock_send_round_settled, mock_record_rounds, mock_save_game,
+                                    mock_get_factories, mock_atomic):
         user = MagicMock()
         user.profile.balance = Decimal('100.00')
         user.profile.deduct_balance = MagicMock()
@@ -159,6 +220,7 @@ class TestDiceGameService(unittest.TestCase):
             user.profile.deduct_balance.assert_called_once_with(Decimal('10'))
             user.profile.add_balance.assert_not_called()
             mock_save_game.assert_called_once_with(user, data, result)
+            mock_send_round_settled.assert_called_once()
 
 
 class TestDiceGameServiceEdgeCases(unittest.TestCase):
@@ -220,6 +282,179 @@ class TestDiceGameServiceEdgeCases(unittest.TestCase):
         self.assertIn('guessed_number', serializer.errors)
 
 
+class TestDiceOdds(unittest.TestCase):
+
+    def test_sum_distribution_by_convolution(self):
+        ways = sum_distribution(6, 6)
+        self.assertEqual(ways[2:], [1, 2, 3, 4, 5, 6, 5, 4, 3, 2, 1])
+        self.assertEqual(sum(sum_distribution(8, 12)), 96)
+
+    def test_expected_return_matches_every_roll(self):
+        for (faces1, faces2), pair in dice_odds.pairs.items():
+            for guess in range(2, faces1 + faces2 + 1):
+                total = Decimal('0')
+                for roll1 in range(1, faces1 + 1):
+                    for roll2 in range(1, faces2 + 1):
+                        ctx = GameContext(MagicMock(faces=faces1), MagicMock(faces=faces2), Decimal('1'),
+                                          roll1 + roll2, guess)
+                        total += DiceGameLogic._calculate_payout(ctx)
+                self.assertAlmostEqual(float(pair['guesses'][guess]['expected_return']),
+                                       float(total / (faces1 * faces2)))
+
+    def test_odds_endpoint_uses_etag(self):
+        from rest_framework.test import APIClient
+        client = APIClient()
+        response = client.get('/api/dice/odds/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['pairs']), 9)
+        self.assertEqual(response['ETag'], dice_odds.etag)
+
+        cached = client.get('/api/dice/odds/', HTTP_IF_NONE_MATCH=dice_odds.etag)
+        self.assertEqual(cached.status_code, 304)
+
+
+class TestDiceBatch(unittest.TestCase):
+
+    def test_payouts_follow_game_rules(self):
+        rounds = [
+            {'choice1': 6, 'choice2': 8, 'bet': Decimal('10'), 'guessed_number': 7},
+            {'choice1': 12, 'choice2': 6, 'bet': Decimal('2.50'), 'guessed_number': 10},
+        ] * 200
+        for data, result in zip(rounds, play_rounds(rounds)):
+            roll1, roll2 = result['rolls']
+            self.assertIn(roll1, range(1, data['choice1'] + 1))
+            self.assertIn(roll2, range(1, data['choice2'] + 1))
+            ctx = GameContext(MagicMock(faces=data['choice1']), MagicMock(faces=data['choice2']), data['bet'],
+                              roll1 + roll2, data['guessed_number'])
+            self.assertEqual(result['payout'], DiceGameLogic._calculate_payout(ctx))
+
+    def test_count_expands_to_rounds(self):
+        from .serializers import BatchDiceGameSerializer
+        serializer = BatchDiceGameSerializer(data={
+            'count': 3, 'choice1': 6, 'choice2': 6, 'bet': '1.00', 'guessed_number': 7
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(len(serializer.validated_data['rounds']), 3)
+
+        serializer = BatchDiceGameSerializer(data={'count': 3, 'choice1': 6})
+        self.assertFalse(serializer.is_valid())
+
+
+class TestDiceBatchSettlement(DjangoTestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='batch@example.com', password='testpass123')
+        self.user.profile.balance = Decimal('100.00')
+        self.user.profile.save()
+
+    def test_batch_settles_net_once(self):
+        rounds = [{'choice1': 6, 'choice2': 6, 'bet': Decimal('1.00'), 'guessed_number': 7}] * 50
+        with CaptureQueriesContext(connection) as queries:
+            batch = DiceGameService.execute_batch(self.user, rounds)
+
+        self.assertEqual(DiceGameModel.objects.filter(user=self.user).count(), 50)
+        profile = type(self.user.profile).objects.get(pk=self.user.profile.pk)
+        self.assertEqual(profile.balance, Decimal('100.00') - Decimal('50.00') + batch['total_payout'])
+        self.assertEqual(len([q for q in queries.captured_queries if 'UPDATE "user_profile"' in q['sql']]), 1)
+
+    def test_batch_rejected_when_total_exceeds_balance(self):
+        rounds = [{'choice1': 6, 'choice2': 6, 'bet': Decimal('60.00'), 'guessed_number': 7}] * 2
+        with self.assertRaises(ValueError):
+            DiceGameService.execute_batch(self.user, rounds)
+        self.assertFalse(DiceGameModel.objects.filter(user=self.user).exists())
+
+
+class TestDiceAsyncView(TransactionTestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='async@example.com', password='testpass123')
+        self.user.profile.balance = Decimal('100.00')
+        self.user.profile.save()
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def test_concurrent_games_settle_through_thread_pool(self):
+        data = {'choice1': 6, 'choice2': 6, 'bet': '1.00', 'guessed_number': 7}
+        responses = await asyncio.gather(*(
+            self.async_client.post('/api/dice/start/', data, content_type='application/json', headers=self.headers)
+            for _ in range(8)
+        ))
+
+        self.assertEqual([response.status_code for response in responses], [200] * 8)
+        self.assertEqual(await DiceGameModel.objects.filter(user=self.user).acount(), 8)
+        payouts = sum(Decimal(str(response.json()['payout'])) for response in responses)
+        profile = await type(self.user.profile).objects.aget(user=self.user)
+        self.assertEqual(profile.balance, Decimal('92.00') + payouts)
+
+
+class TestDiceWagers(unittest.TestCase):
+
+    def setUp(self):
+        fig1 = MagicMock(faces=6)
+        fig2 = MagicMock(faces=8)
+        fig1.roll.return_value = 3
+        fig2.roll.return_value = 4
+        self.factories = {
+            6: MagicMock(create_figure=MagicMock(return_value=fig1)),
+            8: MagicMock(create_figure=MagicMock(return_value=fig2)),
+        }
+
+    def test_wagers_settle_against_one_roll(self):
+        wagers = [(7, Decimal('10')), (8, Decimal('5')), (12, Decimal('1'))]
+        result = DiceGameLogic(self.factories, 100).play_wagers(6, 8, wagers)
+
+        self.assertEqual(result['total'], 7)
+        self.assertEqual(result['payouts'], [Decimal('24.00'), Decimal('7.00'), Decimal('0.00')])
+        self.assertEqual(result['payout'], Decimal('31.00'))
+
+    def test_expected_payout_adds_up_single_wagers(self):
+        wagers = [(5, Decimal('2')), (6, Decimal('3')), (7, Decimal('4'))]
+        expected = sum(DiceGameLogic.expected_payout((6, 8), bet, guess) for guess, bet in wagers)
+        self.assertEqual(DiceGameLogic.expected_wagers_payout((6, 8), wagers), expected)
+
+    def test_duplicate_guesses_rejected(self):
+        from .serializers import MultiWagerDiceGameSerializer
+        serializer = MultiWagerDiceGameSerializer(data={
+            'choice1': 6, 'choice2': 6, 'wagers': [{'guessed_number': 7, 'bet': 1}, {'guessed_number': 7, 'bet': 2}]
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('wagers', serializer.errors)
+
+
+class TestDiceWagersSettlement(DjangoTestCase):
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+        self.user = get_user_model().objects.create_user(email='wagers@example.com', password='testpass123')
+        self.user.profile.balance = Decimal('100.00')
+        self.user.profile.save()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_wagers_settle_in_one_update_and_one_row(self):
+        wagers = [{'guessed_number': guess, 'bet': '2.00'} for guess in range(2, 13)]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/dice/start/', {'choice1': 6, 'choice2': 6, 'wagers': wagers},
+                                        format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(len(response.data['wagers']), 11)
+        self.assertEqual(len([q for q in queries.captured_queries if 'UPDATE "user_profile"' in q['sql']]), 1)
+
+        game = DiceGameModel.objects.get(user=self.user)
+        self.assertIsNone(game.guessed_number)
+        self.assertEqual(game.bet, Decimal('22.00'))
+        self.assertEqual(len(game.wagers), 11)
+        profile = type(self.user.profile).objects.get(pk=self.user.profile.pk)
+        self.assertEqual(profile.balance, Decimal('78.00') + game.payout)
+
+    def test_wagers_rejected_when_total_exceeds_balance(self):
+        wagers = [{'guessed_number': 6, 'bet': '60.00'}, {'guessed_number': 7, 'bet': '60.00'}]
+        response = self.client.post('/api/dice/start/', {'choice1': 6, 'choice2': 6, 'wagers': wagers},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(DiceGameModel.objects.filter(user=self.user).exists())
+
+
 class TestUserProfileBalance(TestCase):
     def test_insufficient_balance_deduction(self):
         user = MagicMock()
@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import DiceGameView
+from .views import DiceBatchView, DiceGameView, DiceOddsView
 
 urlpatterns = [
     path("start/", DiceGameView.as_view(), name="dice_game"),
+    path("batch/", DiceBatchView.as_view(), name="dice_batch"),
+    path("odds/", DiceOddsView.as_view(), name="dice_odds"),
 ]
\ No newline at end of file
@@ -2,23 +2,30 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from drf_spectacular.utils import extend_schema
-from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from .serializers import StartDiceGameSerializer
+from django.http import HttpResponse
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from core.async_views import AsyncViewMixin
+from user.authentication import CachedJWTAuthentication
+from .serializers import BatchDiceGameSerializer, MultiWagerDiceGameSerializer, StartDiceGameSerializer
+from .odds import dice_odds
 from .services import DiceGameService
 
 
-class DiceGameView(APIView):
+class DiceGameView(AsyncViewMixin, APIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
     serializer_class = StartDiceGameSerializer
 
     @extend_schema(
         request=StartDiceGameSerializer,
+        description="Send guessed_number and bet for one wager, or a list of wagers settled against one roll",
         responses={200: dict}
     )
     def post(self, request):
         """Runs the dice game logic and returns the result."""
+        if 'wagers' in request.data:
+            return self._post_wagers(request)
+
         serializer = self.serializer_class(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -31,3 +38,60 @@ class DiceGameView(APIView):
 
         except ValueError as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    def _post_wagers(self, request):
+        serializer = MultiWagerDiceGameSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        try:
+            result = DiceGameService.execute_wagers(user, serializer.validated_data)
+            return Response(DiceGameService.build_wagers_response(result, user))
+
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class DiceBatchView(AsyncViewMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedJWTAuthentication]
+    serializer_class = BatchDiceGameSerializer
+
+    @extend_schema(
+        request=BatchDiceGameSerializer,
+        responses={200: dict}
+    )
+    def post(self, request):
+        """Plays up to 1000 rounds and settles their net result in one transaction."""
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        try:
+            batch = DiceGameService.execute_batch(user, serializer.validated_data['rounds'])
+            return Response(DiceGameService.build_batch_response(batch, user))
+
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class DiceOddsView(APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    @extend_schema(
+        description="Exact win probability and expected return of every dice pair and guess, "
+                    "computed once at startup",
+        responses={200: dict}
+    )
+    def get(self, request):
+        """Serves the pre-rendered odds table, or 304 when the client already has it."""
+        if request.headers.get('If-None-Match') == dice_odds.etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(dice_odds.body, content_type='application/json')
+        response['ETag'] = dice_odds.etag
+        response['Cache-Control'] = 'public, max-age=3600'
+        return response
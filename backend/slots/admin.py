@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Spin, Symbol
+from .models import JackpotShard, Machine, MachineVersion, Spin, Symbol
 
 @admin.register(Spin)
 class SpinAdmin(admin.ModelAdmin):
@@ -11,3 +11,21 @@ class SpinAdmin(admin.ModelAdmin):
 class SymbolAdmin(admin.ModelAdmin):
     list_display = ('name', 'payout_multiplier')
     search_fields = ('name',)
+
+@admin.register(JackpotShard)
+class JackpotShardAdmin(admin.ModelAdmin):
+    list_display = ('pool', 'shard', 'amount')
+    list_filter = ('pool',)
+
+@admin.register(Machine)
+class MachineAdmin(admin.ModelAdmin):
+    list_display = ('slug', 'name', 'num_reels', 'visible_rows', 'is_active', 'version', 'updated_at')
+    list_filter = ('is_active',)
+    search_fields = ('slug', 'name')
+    readonly_fields = ('version', 'updated_at')
+
+@admin.register(MachineVersion)
+class MachineVersionAdmin(admin.ModelAdmin):
+    list_display = ('machine', 'version', 'created_at')
+    list_filter = ('machine',)
+    readonly_fields = ('machine', 'version', 'config', 'created_at')
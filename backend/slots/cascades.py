@@ -0,0 +1,125 @@
+"""
+Cascading (tumbling) reels.
+
+After every win the winning cells are removed, the symbols above them drop
+down and new symbols fill each reel from the top, until the grid stops
+paying. A payline or cluster that no changed cell belongs to looked exactly
+the same in the previous step and did not pay then, so every step after the
+first only re-checks the paylines and clusters touching changed cells.
+"""
+
+MAX_CASCADES = 100
+
+
+def iter_wins(win_data):
+    """Yield [symbol_name, positions] for every win, across all cascade steps."""
+    if not win_data:
+        return
+    if 'steps' in win_data:
+        for step in win_data['steps']:
+            yield from step['wins'].values()
+    else:
+        yield from win_data.values()
+
+
+class CascadeEvaluator:
+    """
+    Plays out the cascade chain of one grid.
+
+    `draw(reel)` returns the symbol that falls into `reel`. Exactly one of
+    `payline_evaluator` and `cluster_evaluator` decides what pays.
+    `incremental=False` re-evaluates the whole grid on every step and only
+    exists for benchmarking.
+    """
+
+    def __init__(self, num_reels, visible_rows, draw, payline_evaluator=None, cluster_evaluator=None,
+                 max_cascades=MAX_CASCADES, incremental=True):
+        if (payline_evaluator is None) == (cluster_evaluator is None):
+            raise ValueError("Exactly one of payline_evaluator and cluster_evaluator is required.")
+        self.num_reels = num_reels
+        self.visible_rows = visible_rows
+        self.draw = draw
+        self.payline_evaluator = payline_evaluator
+        self.cluster_evaluator = cluster_evaluator
+        self.max_cascades = max_cascades
+        self.incremental = incremental
+
+    def _wins(self, cells, masks, changed):
+        """
+        Return ({number: (symbol, positions)}, winning cell mask) for the current grid.
+
+        `changed` is (cell mask, cell list) of the cells the last drop touched,
+        or None to evaluate the whole grid.
+        """
+        winning = 0
+        if self.cluster_evaluator is not None:
+            if changed is None:
+                clusters = self.cluster_evaluator.evaluate(cells)
+            else:
+                clusters = self.cluster_evaluator.clusters_touching(cells, changed[1])
+            for _, members in clusters:
+                for cell in members:
+                    winning |= 1 << cell
+            return dict(enumerate(clusters, start=1)), winning
+
+        lines = None if changed is None else self.payline_evaluator.lines_touching(changed[0])
+        hits = self.payline_evaluator.evaluate(cells, masks, lines)
+        for number, (_, reels) in hits.items():
+            for cell in self.payline_evaluator.line_cells(number, reels):
+                winning |= 1 << cell
+        return hits, winning
+
+    def _drop(self, cells, masks, winning):
+        """
+        Remove the winning cells, drop and refill their reels in place.
+
+        Returns (cell mask, cell list) of every cell that moved or was refilled.
+        """
+        rows = self.visible_rows
+        column_mask = (1 << rows) - 1
+        changed_mask = 0
+        changed = []
+        for reel in range(self.num_reels):
+            base = reel * rows
+            gone = (winning >> base) & column_mask
+            if not gone:
+                continue
+            column = [self.draw(reel) for _ in range(bin(gone).count('1'))]
+            column.extend(cells[base + row] for row in range(rows) if not gone >> row & 1)
+            # Only the removed rows and everything above them move.
+            height = gone.bit_length()
+            for row in range(height):
+                cell = base + row
+                old, new = cells[cell], column[row]
+                if masks is not None and old != new:
+                    bit = 1 << cell
+                    masks[old] ^= bit
+                    masks[new] = masks.get(new, 0) | bit
+                cells[cell] = new
+            changed_mask |= ((1 << height) - 1) << base
+            changed.extend(range(base, base + height))
+        return changed_mask, changed
+
+    def run(self, cells):
+        """
+        Play out the cascade chain starting from `cells` (reel-major).
+
+        Returns ([(grid, hits)] for every paying step, final grid). The list
+        is empty when the starting grid does not pay.
+        """
+        cells = list(cells)
+        masks = None
+        if self.payline_evaluator is not None:
+            cells, masks = self.payline_evaluator.board_from_cells(cells)
+
+        steps = []
+        changed = None
+        while len(steps) < self.max_cascades:
+            hits, winning = self._wins(cells, masks, changed)
+            if not hits:
+                break
+            steps.append((list(cells), hits))
+            changed = self._drop(cells, masks, winning)
+            if not self.incremental:
+                changed = None
+        return steps, cells
@@ -0,0 +1,97 @@
+"""
+Cluster-pays evaluation.
+
+Cells use the same reel-major layout as the payline evaluator: the cell of
+`reel` on `row` is `reel * visible_rows + row`. Neighbor tables are computed
+once per grid size, so evaluating a grid is a single union-find pass over
+the flat cell list.
+"""
+
+
+class ClusterEvaluator:
+    """Finds groups of at least `min_cluster` orthogonally connected identical symbols."""
+
+    def __init__(self, num_reels, visible_rows, min_cluster):
+        if min_cluster < 2:
+            raise ValueError("min_cluster must be at least 2.")
+
+        self.num_reels = num_reels
+        self.visible_rows = visible_rows
+        self.min_cluster = min_cluster
+        self.num_cells = num_reels * visible_rows
+
+        neighbors = []
+        forward = []
+        for cell in range(self.num_cells):
+            reel, row = divmod(cell, visible_rows)
+            below = [cell + 1] if row < visible_rows - 1 else []
+            right = [cell + visible_rows] if reel < num_reels - 1 else []
+            above = [cell - 1] if row > 0 else []
+            left = [cell - visible_rows] if reel > 0 else []
+            neighbors.append(tuple(above + below + left + right))
+            forward.append((cell, tuple(below + right)))
+        # Every edge appears once in `forward` (towards the higher index) and
+        # twice in `neighbors`, which incremental flood fills need.
+        self.neighbors = tuple(neighbors)
+        self._forward = tuple(forward)
+
+    def evaluate(self, cells):
+        """Return [(symbol, [cells])] for every paying cluster, ordered by first cell."""
+        if len(cells) != self.num_cells:
+            raise ValueError(f"Expected a grid of {self.num_cells} cells, got {len(cells)}.")
+
+        parent = list(range(self.num_cells))
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for cell, adjacent in self._forward:
+            symbol = cells[cell]
+            for other in adjacent:
+                if cells[other] == symbol:
+                    root_a, root_b = find(cell), find(other)
+                    if root_a != root_b:
+                        parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        groups = {}
+        for cell in range(self.num_cells):
+            groups.setdefault(find(cell), []).append(cell)
+
+        return [
+            (cells[root], members)
+            for root, members in sorted(groups.items())
+            if len(members) >= self.min_cluster
+        ]
+
+    def clusters_touching(self, cells, changed):
+        """
+        Return [(symbol, [cells])] for paying clusters that include a changed cell, ordered by first cell.
+
+        Clusters that contain no changed cell are exactly as they were before
+        the change, so a flood fill from the changed cells is enough.
+        """
+        neighbors = self.neighbors
+        seen = bytearray(self.num_cells)
+        found = []
+        for start in changed:
+            if seen[start]:
+                continue
+            symbol = cells[start]
+            seen[start] = 1
+            members = [start]
+            stack = [start]
+            while stack:
+                cell = stack.pop()
+                for other in neighbors[cell]:
+                    if not seen[other] and cells[other] == symbol:
+                        seen[other] = 1
+                        members.append(other)
+                        stack.append(other)
+            if len(members) >= self.min_cluster:
+                found.append((symbol, sorted(members)))
+        # Same order as evaluate(): by each cluster's first cell.
+        found.sort(key=lambda cluster: cluster[1][0])
+        return found
@@ -0,0 +1,117 @@
+import random
+from decimal import Decimal, ROUND_DOWN
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .cascades import iter_wins
+from .models import JackpotShard
+
+DEFAULT_POOL = 'classic'
+DEFAULTS = {
+    'ENABLED': True,
+    'CONTRIBUTION_RATE': '0.01',
+    'SHARDS': 16,
+    'CACHE_TTL': 5,
+    'TRIGGER_SYMBOL': 'star',
+}
+
+
+def jackpot_settings():
+    """Return the SLOTS_JACKPOT settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'SLOTS_JACKPOT', {})}
+
+
+class JackpotService:
+    """
+    Progressive jackpot stored as sharded counter rows.
+
+    Every bet contributes to one randomly chosen shard with a single
+    `UPDATE ... SET amount = amount + x`, so spins only contend when they
+    pick the same shard. Reads sum the shards and cache the total briefly.
+    Awarding locks all shards of the pool in shard order and empties them
+    in one transaction, so two winners can never claim the same money.
+    """
+
+    def __init__(self, pool=DEFAULT_POOL, shards=None, contribution_rate=None, enabled=None):
+        config = jackpot_settings()
+        self.pool = pool
+        self.shards = shards if shards is not None else config['SHARDS']
+        self.contribution_rate = Decimal(str(
+            contribution_rate if contribution_rate is not None else config['CONTRIBUTION_RATE']
+        ))
+        self.enabled = enabled if enabled is not None else config['ENABLED']
+        self.cache_ttl = config['CACHE_TTL']
+        self.trigger_symbol = config['TRIGGER_SYMBOL']
+
+    @property
+    def cache_key(self):
+        return f'slots:jackpot:{self.pool}'
+
+    def ensure_shards(self):
+        """Create any missing shard rows for this pool."""
+        JackpotShard.objects.bulk_create(
+            [JackpotShard(pool=self.pool, shard=shard) for shard in range(self.shards)],
+            ignore_conflicts=True,
+        )
+
+    def contribute(self, bet_amount):
+        """Add the configured share of a bet to a random shard and return it."""
+        if not self.enabled:
+            return Decimal('0')
+
+        contribution = Decimal(bet_amount) * self.contribution_rate
+        shard = random.randrange(self.shards)
+        updated = JackpotShard.objects.filter(pool=self.pool, shard=shard).update(
+            amount=F('amount') + contribution
+        )
+        if not updated:
+            self.ensure_shards()
+            JackpotShard.objects.filter(pool=self.pool, shard=shard).update(amount=F('amount') + contribution)
+        return contribution
+
+    def current_amount(self):
+        """Return the displayable pool value, cached for a few seconds."""
+        amount = cache.get(self.cache_key)
+        if amount is None:
+            total = JackpotShard.objects.filter(pool=self.pool).aggregate(total=Sum('amount'))['total']
+            amount = (total or Decimal('0')).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+            cache.set(self.cache_key, amount, self.cache_ttl)
+        return amount
+
+    def is_triggered(self, win_data, size):
+        """
+        A jackpot is won by a win of at least `size` trigger symbols.
+
+        For line machines `size` is the number of reels, i.e. a full-length line.
+        """
+        if not self.enabled or not win_data:
+            return False
+        return any(
+            symbol_name == self.trigger_symbol and len(reels) >= size
+            for symbol_name, reels in iter_wins(win_data)
+        )
+
+    def claim(self):
+        """
+        Atomically empty the pool and return the amount won.
+
+        Sub-cent fractions that cannot be paid out stay in the first shard.
+        """
+        with transaction.atomic():
+            shards = list(
+                JackpotShard.objects.select_for_update().filter(pool=self.pool).order_by('shard')
+            )
+            if not shards:
+                return Decimal('0.00')
+
+            total = sum((shard.amount for shard in shards), Decimal('0'))
+            award = total.quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+            JackpotShard.objects.filter(pool=self.pool).update(amount=0)
+            if total > award:
+                JackpotShard.objects.filter(pk=shards[0].pk).update(amount=total - award)
+
+        cache.delete(self.cache_key)
+        return award
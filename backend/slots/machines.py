@@ -0,0 +1,152 @@
+"""
+Compiled slot machines and the per-process registry that caches them.
+
+Compiling a machine resolves its symbol names, reel strips, paylines and
+paytable into a ready-to-use ReelService once. The registry keeps one
+compiled machine per slug, shared by every request the process serves, and
+only asks the database for the machine's current version every few seconds
+so spins do not load configuration.
+"""
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+
+from .models import Machine, MachineVersion, Symbol
+from .services import ReelService
+
+CLASSIC_MACHINE = 'classic'
+
+CONFIG_FIELDS = (
+    'num_reels', 'visible_rows', 'symbols', 'reel_strips', 'paylines', 'min_run', 'evaluation', 'cascading',
+)
+
+
+def validate_machine_config(machine):
+    """Raise ValueError if a machine's configuration cannot be compiled."""
+    if machine.num_reels < 1 or machine.visible_rows < 1:
+        raise ValueError("A machine needs at least one reel and one row.")
+    if not machine.symbols:
+        raise ValueError("A machine needs at least one symbol.")
+    if len(set(machine.symbols)) != len(machine.symbols):
+        raise ValueError("Symbol names must be unique.")
+    if machine.reel_strips:
+        if len(machine.reel_strips) != machine.num_reels:
+            raise ValueError(f"Expected {machine.num_reels} reel strips, got {len(machine.reel_strips)}.")
+        for reel, strip in enumerate(machine.reel_strips):
+            if not strip:
+                raise ValueError(f"Reel strip {reel} is empty.")
+            unknown = set(strip) - set(machine.symbols)
+            if unknown:
+                raise ValueError(f"Reel strip {reel} uses unknown symbols: {', '.join(sorted(unknown))}.")
+    compile_machine(machine, symbols=[])
+
+
+class CompiledMachine:
+    """An immutable, ready-to-spin snapshot of one machine version."""
+
+    def __init__(self, machine, reel_service):
+        self.id = machine.pk
+        self.slug = machine.slug
+        self.name = machine.name
+        self.version = machine.version
+        self.reel_service = reel_service
+
+
+def compile_machine(machine, symbols=None):
+    """Build the ReelService for a machine configuration."""
+    if symbols is None:
+        symbols = list(Symbol.objects.filter(name__in=machine.symbols))
+    symbol_ids = {name: index for index, name in enumerate(machine.symbols)}
+    reel_strips = None
+    if machine.reel_strips:
+        reel_strips = [[symbol_ids[name] for name in strip] for strip in machine.reel_strips]
+
+    reel_service = ReelService(
+        symbols,
+        paylines=machine.paylines or None,
+        num_reels=machine.num_reels,
+        visible_rows=machine.visible_rows,
+        min_run=machine.min_run,
+        symbol_names=machine.symbols,
+        reel_strips=reel_strips,
+        evaluation=machine.evaluation,
+        cascading=machine.cascading,
+    )
+    return CompiledMachine(machine, reel_service)
+
+
+def machine_config(machine):
+    """Return a machine's configuration and current multipliers as JSON-ready data."""
+    config = {field: getattr(machine, field) for field in CONFIG_FIELDS}
+    config['multipliers'] = {
+        symbol.name: str(symbol.payout_multiplier)
+        for symbol in Symbol.objects.filter(name__in=machine.symbols)
+    }
+    return config
+
+
+def snapshot_machine(machine):
+    """Record the configuration of the machine's current version, once."""
+    MachineVersion.objects.get_or_create(
+        machine=machine, version=machine.version, defaults={'config': machine_config(machine)}
+    )
+
+
+def compile_config(config):
+    """Build the ReelService for a configuration recorded by machine_config()."""
+    machine = Machine(**{field: config[field] for field in CONFIG_FIELDS})
+    symbols = [
+        Symbol(name=name, payout_multiplier=Decimal(multiplier))
+        for name, multiplier in config['multipliers'].items()
+    ]
+    return compile_machine(machine, symbols=symbols).reel_service
+
+
+class MachineRegistry:
+    """Per-process cache of compiled machines keyed by slug."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def check_interval(self):
+        return getattr(settings, 'SLOTS_MACHINE_CHECK_INTERVAL', 5)
+
+    def get(self, slug):
+        """
+        Return the compiled machine for `slug`.
+
+        Raises Machine.DoesNotExist if there is no active machine with that slug.
+        """
+        entry = self._entries.get(slug)
+        now = time.monotonic()
+        if entry is not None and now - entry[1] < self.check_interval:
+            return entry[0]
+
+        version = Machine.objects.filter(slug=slug, is_active=True).values_list('version', flat=True).first()
+        if version is None:
+            self.invalidate(slug)
+            raise Machine.DoesNotExist(f"No active machine '{slug}'.")
+
+        with self._lock:
+            entry = self._entries.get(slug)
+            if entry is None or entry[0].version != version:
+                compiled = compile_machine(Machine.objects.get(slug=slug))
+            else:
+                compiled = entry[0]
+            self._entries[slug] = (compiled, now)
+        return compiled
+
+    def invalidate(self, slug=None):
+        """Drop one compiled machine, or all of them."""
+        with self._lock:
+            if slug is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(slug, None)
+
+
+machine_registry = MachineRegistry()
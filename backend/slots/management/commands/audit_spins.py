@@ -0,0 +1,22 @@
+from core.jobs import RangeJobCommand
+from slots.audit import audit_range
+from slots.models import Spin
+
+
+class Command(RangeJobCommand):
+    help = "Re-evaluate every stored spin with the paytable of its machine version and report payout mismatches."
+    row = 'spin'
+    job = 'audit'
+    action = 'Auditing'
+    chunk_size = 50000
+    counters = ('mismatches',)
+    report_key = 'mismatches'
+
+    def get_queryset(self):
+        return Spin.objects.all()
+
+    def get_range_function(self):
+        return audit_range
+
+    def summary(self, totals):
+        return f"Checked {totals['checked']} spins, {totals['mismatches']} mismatches"
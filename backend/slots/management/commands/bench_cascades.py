@@ -0,0 +1,46 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from slots.cascades import CascadeEvaluator
+from slots.clusters import ClusterEvaluator
+from slots.paylines import STANDARD_PAYLINES, PaylineEvaluator
+
+
+class Command(BaseCommand):
+    help = "Compare incremental and full re-evaluation of cascade chains."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--spins', type=int, default=5000, help='Starting grids played out per variant.')
+        parser.add_argument('--symbols', type=int, default=3,
+                            help='Distinct symbols; fewer symbols give longer chains.')
+
+    def handle(self, *args, **options):
+        variants = (
+            ('5x3, 20 lines', 5, 3, lambda: {'payline_evaluator': PaylineEvaluator(STANDARD_PAYLINES)}),
+            ('7x7 clusters', 7, 7, lambda: {'cluster_evaluator': ClusterEvaluator(7, 7, 5)}),
+            ('9x9 clusters', 9, 9, lambda: {'cluster_evaluator': ClusterEvaluator(9, 9, 5)}),
+        )
+        for label, reels, rows, evaluators in variants:
+            grid_rng = random.Random(7)
+            grids = [
+                [grid_rng.randrange(options['symbols']) for _ in range(reels * rows)]
+                for _ in range(options['spins'])
+            ]
+            for incremental in (False, True):
+                draw_rng = random.Random(11)
+                evaluator = CascadeEvaluator(
+                    reels, rows, lambda reel: draw_rng.randrange(options['symbols']),
+                    incremental=incremental, **evaluators()
+                )
+                started = time.perf_counter()
+                steps = 0
+                for cells in grids:
+                    steps += len(evaluator.run(cells)[0])
+                elapsed = time.perf_counter() - started
+                mode = 'incremental' if incremental else 'full'
+                self.stdout.write(
+                    f"{label}, {mode}: {elapsed / len(grids) * 1e6:.1f} us/spin, "
+                    f"{steps / len(grids):.2f} cascades/spin"
+                )
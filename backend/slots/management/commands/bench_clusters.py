@@ -0,0 +1,33 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from slots.clusters import ClusterEvaluator
+
+
+class Command(BaseCommand):
+    help = "Time cluster-pays evaluation on grids of increasing size."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--spins', type=int, default=20000, help='Random grids evaluated per size.')
+        parser.add_argument('--symbols', type=int, default=5, help='Distinct symbols on the grid.')
+        parser.add_argument('--min-cluster', type=int, default=5, help='Smallest paying cluster.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        for reels, rows in ((5, 3), (7, 7), (9, 9)):
+            evaluator = ClusterEvaluator(reels, rows, options['min_cluster'])
+            grids = [
+                [rng.randrange(options['symbols']) for _ in range(evaluator.num_cells)]
+                for _ in range(options['spins'])
+            ]
+            started = time.perf_counter()
+            paying = 0
+            for cells in grids:
+                paying += bool(evaluator.evaluate(cells))
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{reels}x{rows}: {elapsed / len(grids) * 1e6:.2f} us/spin, "
+                f"{paying / len(grids):.1%} of grids pay"
+            )
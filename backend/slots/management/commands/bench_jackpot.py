@@ -0,0 +1,92 @@
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from slots.jackpot import JackpotService
+from slots.models import JackpotShard, Symbol
+from slots.services import SlotMachineService
+from user.models import Profile
+
+User = get_user_model()
+
+DEFAULT_SYMBOLS = [('star', '3.00'), ('heart', '2.50'), ('cherry', '2.00'), ('gem', '1.50'), ('citrus', '1.00')]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent spin throughput with the jackpot disabled, kept in a "
+        "single row, and sharded. Each spin runs in its own transaction. "
+        "Benchmark users, spins and jackpot pools are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent players.')
+        parser.add_argument('--spins', type=int, default=200, help='Spins per player and variant.')
+        parser.add_argument('--shards', type=int, default=16, help='Shard count for the sharded variant.')
+
+    def handle(self, *args, **options):
+        created_symbols = []
+        if not Symbol.objects.exists():
+            created_symbols = Symbol.objects.bulk_create(
+                Symbol(name=name, payout_multiplier=Decimal(multiplier)) for name, multiplier in DEFAULT_SYMBOLS
+            )
+
+        users = [
+            User.objects.create_user(email=f'bench-{uuid.uuid4().hex}@example.com')
+            for _ in range(options['threads'])
+        ]
+        Profile.objects.filter(user__in=users).update(balance=Decimal('1000000.00'))
+
+        variants = [
+            ('jackpot disabled', {'enabled': False}),
+            ('jackpot, 1 row', {'enabled': True, 'shards': 1}),
+            (f"jackpot, {options['shards']} shards", {'enabled': True, 'shards': options['shards']}),
+        ]
+        try:
+            for label, kwargs in variants:
+                jackpot = JackpotService(pool=f'bench-{uuid.uuid4().hex[:16]}', **kwargs)
+                jackpot.ensure_shards()
+                try:
+                    rate = self._run(users, jackpot, options['spins'])
+                finally:
+                    JackpotShard.objects.filter(pool=jackpot.pool).delete()
+                self.stdout.write(f"{label}: {rate:,.0f} spins/s")
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            Symbol.objects.filter(pk__in=[symbol.pk for symbol in created_symbols]).delete()
+
+    def _run(self, users, jackpot, spins):
+        """Spin concurrently, one thread per user, and return spins per second."""
+        barrier = threading.Barrier(len(users) + 1)
+        errors = []
+
+        def player(user_id):
+            try:
+                user = User.objects.select_related('profile').get(pk=user_id)
+                machine = SlotMachineService(jackpot=jackpot)
+                barrier.wait()
+                for _ in range(spins):
+                    with transaction.atomic():
+                        result = machine.play_spin(user, Decimal('1.00'))
+                    if not result['success']:
+                        errors.append(result['message'])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=player, args=(user.pk,)) for user in users]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if errors:
+            self.stderr.write(f"{len(errors)} spins failed: {errors[0]}")
+        return len(users) * spins / elapsed
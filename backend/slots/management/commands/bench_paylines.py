@@ -0,0 +1,47 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from slots.paylines import HORIZONTAL_PAYLINES, STANDARD_PAYLINES, PaylineEvaluator
+from slots.services import ReelService
+
+
+def row_scan_wins(result, min_symbols=ReelService.MIN_SYMBOLS_FOR_WIN):
+    """The row-by-row evaluation ReelService used before paylines, kept as a baseline."""
+    hits = {}
+    for row_index, row in enumerate(ReelService.flip_horizontal(result)):
+        for sym in set(row):
+            if row.count(sym) > min_symbols:
+                possible_win = [idx for idx, val in enumerate(row) if sym == val]
+                longest = ReelService.longest_seq(possible_win)
+                if len(longest) > min_symbols:
+                    hits[row_index + 1] = [sym, longest]
+    return hits
+
+
+class Command(BaseCommand):
+    help = "Compare the legacy row scan against the bitboard evaluator with 3 and 20 paylines."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--spins', type=int, default=100000, help='Random grids evaluated per variant.')
+        parser.add_argument('--symbols', type=int, default=5, help='Distinct symbols on the grid.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        grids = [
+            {reel: [rng.randrange(options['symbols']) for _ in range(3)] for reel in range(5)}
+            for _ in range(options['spins'])
+        ]
+
+        self._report('row scan, 3 rows', grids, row_scan_wins)
+        for label, paylines in (('bitboard, 3 lines', HORIZONTAL_PAYLINES), ('bitboard, 20 lines', STANDARD_PAYLINES)):
+            evaluator = PaylineEvaluator(paylines, min_run=ReelService.MIN_SYMBOLS_FOR_WIN + 1)
+            self._report(label, grids, lambda grid: evaluator.evaluate(*evaluator.board_from_result(grid)))
+
+    def _report(self, label, grids, evaluate):
+        started = time.perf_counter()
+        for grid in grids:
+            evaluate(grid)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label}: {elapsed / len(grids) * 1e6:.2f} us/spin")
@@ -0,0 +1,109 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.utils import uuid7
+from slots.models import Spin
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    """Raised to discard everything the benchmark wrote."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare spin insert throughput with uuid4 and uuid7 primary keys, and "
+        "history query latency with and without the (user, timestamp) index. "
+        "All rows are written inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help='Spins inserted per key strategy.')
+        parser.add_argument('--users', type=int, default=200, help='Users the spins are spread over.')
+        parser.add_argument('--batch', type=int, default=500, help='Rows per INSERT statement.')
+        parser.add_argument('--queries', type=int, default=200, help='History queries per index variant.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create(
+                    User(email=f'bench-{uuid.uuid4().hex}@example.com') for _ in range(options['users'])
+                )
+
+                for label, id_factory in (('uuid4', uuid.uuid4), ('uuid7', uuid7)):
+                    rate, pk_size = self._insert_into_copy(users, id_factory, options['rows'], options['batch'])
+                    self.stdout.write(
+                        f"{label}: {rate:,.0f} inserts/s, primary key index {pk_size / 1024:,.0f} KiB"
+                    )
+
+                self._insert(users, uuid7, options['rows'], options['batch'])
+                with connection.cursor() as cursor:
+                    cursor.execute(f'ANALYZE {Spin._meta.db_table}')
+
+                with_index = self._history_latency(users, options['queries'])
+                self.stdout.write(self._format_latency('history with index', with_index))
+
+                savepoint = transaction.savepoint()
+                with connection.schema_editor() as schema_editor:
+                    schema_editor.remove_index(Spin, Spin._meta.indexes[0])
+                without_index = self._history_latency(users, options['queries'])
+                self.stdout.write(self._format_latency('history without index', without_index))
+                transaction.savepoint_rollback(savepoint)
+
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _insert(self, users, id_factory, rows, batch):
+        """Insert `rows` spins through the ORM in batches."""
+        for offset in range(0, rows, batch):
+            Spin.objects.bulk_create([
+                Spin(id=id_factory(), user=users[(offset + i) % len(users)], bet_amount=10, payout=0, result={})
+                for i in range(min(batch, rows - offset))
+            ])
+
+    def _insert_into_copy(self, users, id_factory, rows, batch):
+        """
+        Insert `rows` spins into an empty temporary copy of the spin table and
+        return (rows per second, primary key index size in bytes).
+        """
+        table = Spin._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE TEMPORARY TABLE bench_spin (LIKE {table} INCLUDING ALL) ON COMMIT DROP')
+            started = time.perf_counter()
+            for offset in range(0, rows, batch):
+                cursor.executemany(
+                    'INSERT INTO bench_spin (id, user_id, bet_amount, payout, result, timestamp) '
+                    "VALUES (%s, %s, 10, 0, '{}', now())",
+                    [(id_factory(), users[(offset + i) % len(users)].pk) for i in range(min(batch, rows - offset))],
+                )
+            rate = rows / (time.perf_counter() - started)
+            cursor.execute(
+                "SELECT pg_relation_size(indexrelid) FROM pg_index "
+                "WHERE indrelid = 'bench_spin'::regclass AND indisprimary"
+            )
+            pk_size = cursor.fetchone()[0]
+            cursor.execute('DROP TABLE bench_spin')
+        return rate, pk_size
+
+    def _history_latency(self, users, queries):
+        """Run the history view's query for random users and return latencies in ms."""
+        timings = []
+        for i in range(queries):
+            user = users[i % len(users)]
+            started = time.perf_counter()
+            list(Spin.objects.filter(user=user).order_by('-timestamp'))
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    @staticmethod
+    def _format_latency(label, timings):
+        timings = sorted(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        return f"{label}: median {statistics.median(timings):.3f} ms, p95 {p95:.3f} ms"
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:06
+
+import core.utils
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction. Building the
+    # index concurrently keeps the spin table writable while it is populated.
+    atomic = False
+
+    dependencies = [
+        ('slots', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='spin',
+            name='id',
+            field=models.UUIDField(default=core.utils.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        AddIndexConcurrently(
+            model_name='spin',
+            index=models.Index(fields=['user', '-timestamp'], name='slots_spin_user_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slots', '0002_spin_uuid7_user_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spin',
+            name='jackpot_payout',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=12),
+        ),
+        migrations.CreateModel(
+            name='JackpotShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pool', models.CharField(max_length=50)),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('amount', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('pool', 'shard'), name='slots_jackpot_pool_shard_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slots', '0003_jackpot_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Machine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('num_reels', models.PositiveSmallIntegerField(default=5)),
+                ('visible_rows', models.PositiveSmallIntegerField(default=3)),
+                ('symbols', models.JSONField(default=list)),
+                ('reel_strips', models.JSONField(blank=True, default=list)),
+                ('paylines', models.JSONField(blank=True, default=list)),
+                ('min_run', models.PositiveSmallIntegerField(default=3)),
+                ('is_active', models.BooleanField(default=True)),
+                ('version', models.PositiveIntegerField(default=1, editable=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='spin',
+            name='machine_version',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='spin',
+            name='machine',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='spins', to='slots.machine'),
+        ),
+    ]
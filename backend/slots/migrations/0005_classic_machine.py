@@ -0,0 +1,33 @@
+from django.db import migrations
+
+CLASSIC_SYMBOLS = ['star', 'heart', 'cherry', 'gem', 'citrus']
+
+
+def create_classic_machine(apps, schema_editor):
+    Machine = apps.get_model('slots', 'Machine')
+    Machine.objects.get_or_create(
+        slug='classic',
+        defaults={
+            'name': 'Classic',
+            'num_reels': 5,
+            'visible_rows': 3,
+            'symbols': CLASSIC_SYMBOLS,
+            'min_run': 3,
+        },
+    )
+
+
+def delete_classic_machine(apps, schema_editor):
+    Machine = apps.get_model('slots', 'Machine')
+    Machine.objects.filter(slug='classic', spins__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slots', '0004_machines'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_classic_machine, delete_classic_machine),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slots', '0005_classic_machine'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='machine',
+            name='evaluation',
+            field=models.CharField(choices=[('lines', 'Paylines'), ('clusters', 'Cluster pays')], default='lines', max_length=10),
+        ),
+    ]
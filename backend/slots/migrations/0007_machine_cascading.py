@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slots', '0006_machine_evaluation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='machine',
+            name='cascading',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+CONFIG_FIELDS = (
+    'num_reels', 'visible_rows', 'symbols', 'reel_strips', 'paylines', 'min_run', 'evaluation', 'cascading',
+)
+
+
+def snapshot_current_versions(apps, schema_editor):
+    Machine = apps.get_model('slots', 'Machine')
+    MachineVersion = apps.get_model('slots', 'MachineVersion')
+    Symbol = apps.get_model('slots', 'Symbol')
+    for machine in Machine.objects.all():
+        config = {field: getattr(machine, field) for field in CONFIG_FIELDS}
+        config['multipliers'] = {
+            symbol.name: str(symbol.payout_multiplier)
+            for symbol in Symbol.objects.filter(name__in=machine.symbols)
+        }
+        MachineVersion.objects.get_or_create(machine=machine, version=machine.version, defaults={'config': config})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slots', '0007_machine_cascading'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MachineVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('config', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='slots.machine')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('machine', 'version'), name='slots_machine_version_uniq')],
+            },
+        ),
+        migrations.RunPython(snapshot_current_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slots', '0008_machine_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='machineversion',
+            name='simulated_rtp',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.db.models import F
+
+LEGACY_POOL = 'default'
+CLASSIC_POOL = 'classic'
+
+
+def merge_default_pool(apps, schema_editor):
+    """Move the jackpot collected before classic spins had their own pool into the classic pool."""
+    JackpotShard = apps.get_model('slots', 'JackpotShard')
+    for shard in JackpotShard.objects.select_for_update().filter(pool=LEGACY_POOL):
+        updated = JackpotShard.objects.filter(pool=CLASSIC_POOL, shard=shard.shard).update(
+            amount=F('amount') + shard.amount
+        )
+        if not updated:
+            JackpotShard.objects.create(pool=CLASSIC_POOL, shard=shard.shard, amount=shard.amount)
+        shard.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slots', '0009_machineversion_simulated_rtp'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_default_pool, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.conf import settings
-import uuid
+
+from core.utils import uuid7
 
 
 class Symbol(models.Model):
@@ -11,11 +13,122 @@ class Symbol(models.Model):
         return self.name
 
 
+class Machine(models.Model):
+    """
+    A slot machine configuration.
+
+    `symbols` is the ordered list of symbol names shown on the reels; a
+    symbol's position in it is the value stored in spin results. `reel_strips`
+    optionally holds one list of symbol names per reel, and `paylines` one row
+    index per reel for every line (empty means one straight line per row).
+    `evaluation` selects line pays or cluster pays; for cluster machines
+    `min_run` is the smallest paying cluster. On `cascading` machines winning
+    symbols are removed and replaced until the grid stops paying. `version` is bumped on every
+    change so compiled evaluators know when to rebuild.
+    """
+    EVALUATION_CHOICES = [
+        ('lines', 'Paylines'),
+        ('clusters', 'Cluster pays'),
+    ]
+
+    slug = models.SlugField(max_length=50, unique=True)
+    name = models.CharField(max_length=100)
+    num_reels = models.PositiveSmallIntegerField(default=5)
+    visible_rows = models.PositiveSmallIntegerField(default=3)
+    symbols = models.JSONField(default=list)
+    reel_strips = models.JSONField(default=list, blank=True)
+    paylines = models.JSONField(default=list, blank=True)
+    min_run = models.PositiveSmallIntegerField(default=3)
+    evaluation = models.CharField(max_length=10, choices=EVALUATION_CHOICES, default='lines')
+    cascading = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        from .machines import validate_machine_config
+        try:
+            validate_machine_config(self)
+        except ValueError as e:
+            raise ValidationError(str(e))
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        # Bump the stored version rather than this instance's copy of it, so two
+        # saves of the same loaded machine make two versions. The UPDATE holds the
+        # row lock until the save commits, and the version is re-read before the
+        # post_save snapshot records it.
+        with transaction.atomic():
+            Machine.objects.filter(pk=self.pk).update(version=F('version') + 1)
+            self.refresh_from_db(fields=['version'])
+            super().save(*args, **kwargs)
+
+
+class MachineVersion(models.Model):
+    """
+    The configuration and paytable of a machine as of one version.
+
+    Spins store the machine version they were played on, so audits can
+    re-evaluate old spins with the rules in effect at the time.
+    `simulated_rtp` is the version's base-game RTP estimated by simulation,
+    filled in by the simulate_slots_rtp command.
+    """
+    machine = models.ForeignKey(Machine, on_delete=models.CASCADE, related_name='versions')
+    version = models.PositiveIntegerField()
+    config = models.JSONField()
+    simulated_rtp = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['machine', 'version'], name='slots_machine_version_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.machine_id} v{self.version}"
+
+
 class Spin(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='spins')
+    machine = models.ForeignKey(Machine, on_delete=models.PROTECT, null=True, blank=True, db_index=False,
+                                related_name='spins')
+    machine_version = models.PositiveIntegerField(null=True, blank=True)
     bet_amount = models.DecimalField(max_digits=10, decimal_places=2)
     payout = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    jackpot_payout = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
     result = models.JSONField()
     win_data = models.JSONField(null=True, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-timestamp'], name='slots_spin_user_ts_idx'),
+        ]
+
+
+class JackpotShard(models.Model):
+    """
+    One slice of a progressive jackpot pool.
+
+    Contributions increment a random shard so concurrent spins rarely wait on
+    the same row lock; the pool value is the sum of its shards.
+    """
+    pool = models.CharField(max_length=50)
+    shard = models.PositiveSmallIntegerField()
+    amount = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['pool', 'shard'], name='slots_jackpot_pool_shard_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.pool}[{self.shard}] = {self.amount}"
+
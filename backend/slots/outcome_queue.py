@@ -0,0 +1,167 @@
+"""
+Pre-generated spin outcomes.
+
+When SLOTS_OUTCOME_QUEUE['ENABLED'] is set, each worker process runs one
+background thread that keeps a bounded queue of spun and evaluated grids per
+machine version. `play_spin` then only pops an outcome, scales its unit
+payout by the bet and settles, keeping RNG and win evaluation off the
+request path. A queue belongs to exactly one machine version: when the
+machine or its paytable changes the old queue is dropped with everything
+in it, and popping removes an outcome so it is never served twice.
+"""
+import collections
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+
+DEFAULTS = {
+    'ENABLED': False,
+    'DEPTH': 1000,
+    'BATCH': 100,
+    'IDLE_INTERVAL': 0.05,
+}
+
+Outcome = collections.namedtuple('Outcome', ['result', 'win_data', 'unit_payout'])
+
+
+def outcome_queue_settings():
+    """Return the SLOTS_OUTCOME_QUEUE settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'SLOTS_OUTCOME_QUEUE', {})}
+
+
+class OutcomeQueue:
+    """A bounded queue of outcomes for one compiled machine version."""
+
+    def __init__(self, machine, depth):
+        self.machine = machine
+        self.depth = depth
+        self.generated = 0
+        self.served = 0
+        self.misses = 0
+        self._outcomes = collections.deque()
+
+    @property
+    def version(self):
+        return self.machine.version
+
+    def __len__(self):
+        return len(self._outcomes)
+
+    def generate(self):
+        """Spin and evaluate one outcome for a bet of 1."""
+        reel_service = self.machine.reel_service
+        result = reel_service.generate_spin()
+        win_data = reel_service.check_wins(result)
+        unit_payout = reel_service.calculate_payout(win_data, Decimal('1')) if win_data else Decimal('0')
+        return Outcome(result, win_data, unit_payout)
+
+    def refill(self, limit):
+        """Top the queue up by at most `limit` outcomes and return how many were added."""
+        count = min(limit, self.depth - len(self._outcomes))
+        for _ in range(count):
+            self._outcomes.append(self.generate())
+        self.generated += max(count, 0)
+        return max(count, 0)
+
+    def pop(self):
+        """Remove and return the oldest outcome, or None if the queue is empty."""
+        try:
+            outcome = self._outcomes.popleft()
+        except IndexError:
+            self.misses += 1
+            return None
+        self.served += 1
+        return outcome
+
+
+class OutcomeQueueManager:
+    """Owns the per-machine queues of one worker process and their refill thread."""
+
+    RATE_WINDOW = 10
+
+    def __init__(self, config=None, autostart=True):
+        self.config = config or outcome_queue_settings()
+        self.autostart = autostart
+        self._queues = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._refills = collections.deque(maxlen=1000)
+
+    @property
+    def enabled(self):
+        return self.config['ENABLED']
+
+    def queue_for(self, machine):
+        """Return the queue for this machine version, replacing any stale one."""
+        queue = self._queues.get(machine.slug)
+        if queue is None or queue.version != machine.version:
+            with self._lock:
+                queue = self._queues.get(machine.slug)
+                if queue is None or queue.version != machine.version:
+                    queue = OutcomeQueue(machine, self.config['DEPTH'])
+                    self._queues[machine.slug] = queue
+            self._ensure_thread()
+        return queue
+
+    def pop(self, machine):
+        """Return a pre-generated outcome for this machine version, or None on a miss."""
+        queue = self.queue_for(machine)
+        outcome = queue.pop()
+        if len(queue) < queue.depth // 2:
+            self._wake.set()
+        return outcome
+
+    def refill_once(self):
+        """Run one refill pass over all queues and return the number of outcomes added."""
+        added = 0
+        for queue in list(self._queues.values()):
+            added += queue.refill(self.config['BATCH'])
+        if added:
+            self._refills.append((time.monotonic(), added))
+        return added
+
+    def _ensure_thread(self):
+        if not self.autostart or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='slots-outcome-queue', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                added = self.refill_once()
+            except Exception as e:
+                import logging
+                logging.error(f"Error refilling outcome queue: {str(e)}")
+                added = 0
+            if not added:
+                self._wake.wait(self.config['IDLE_INTERVAL'])
+                self._wake.clear()
+
+    def metrics(self):
+        """Return queue depth and refill rate for every machine queue in this worker."""
+        now = time.monotonic()
+        recent = sum(count for at, count in self._refills if now - at <= self.RATE_WINDOW)
+        return {
+            'enabled': self.enabled,
+            'refill_rate': recent / self.RATE_WINDOW,
+            'machines': {
+                slug: {
+                    'version': queue.version,
+                    'depth': len(queue),
+                    'capacity': queue.depth,
+                    'generated': queue.generated,
+                    'served': queue.served,
+                    'misses': queue.misses,
+                }
+                for slug, queue in list(self._queues.items())
+            },
+        }
+
+
+outcome_queues = OutcomeQueueManager()
@@ -0,0 +1,163 @@
+"""
+Payline definitions and a bitboard evaluator for line wins.
+
+A payline is a list with one row index per reel (row 0 is the top row). The
+grid is flattened reel by reel, so the cell of `reel` on `row` is
+`reel * visible_rows + row`, and every symbol's positions on the grid become a
+single integer bitmask. Checking a run on a payline is then one AND and one
+comparison against a precomputed window mask.
+"""
+
+
+
+def horizontal_paylines(num_reels, visible_rows):
+    """Return one straight payline per visible row."""
+    return [[row] * num_reels for row in range(visible_rows)]
+
+
+HORIZONTAL_PAYLINES = horizontal_paylines(5, 3)
+
+STANDARD_PAYLINES = HORIZONTAL_PAYLINES + [
+    [0, 1, 2, 1, 0],
+    [2, 1, 0, 1, 2],
+    [0, 0, 1, 2, 2],
+    [2, 2, 1, 0, 0],
+    [1, 0, 0, 0, 1],
+    [1, 2, 2, 2, 1],
+    [0, 1, 1, 1, 0],
+    [2, 1, 1, 1, 2],
+    [1, 0, 1, 2, 1],
+    [1, 2, 1, 0, 1],
+    [0, 1, 0, 1, 0],
+    [2, 1, 2, 1, 2],
+    [1, 1, 0, 1, 1],
+    [1, 1, 2, 1, 1],
+    [0, 0, 2, 0, 0],
+    [2, 2, 0, 2, 2],
+    [0, 2, 0, 2, 0],
+]
+
+
+class PaylineEvaluator:
+    """
+    Finds the longest run of identical symbols on each payline.
+
+    Everything that depends only on the payline layout is computed once in
+    the constructor: the cell of every position on a line and, for every run
+    long enough to pay, the bitmask of its cells. Runs are stored longest
+    first so the first matching mask is the longest run on the line.
+    """
+
+    def __init__(self, paylines, num_reels=5, visible_rows=3, min_run=3):
+        if not paylines:
+            raise ValueError("At least one payline is required.")
+        if not 1 <= min_run <= num_reels:
+            raise ValueError(f"min_run must be between 1 and {num_reels}.")
+
+        self.paylines = [list(line) for line in paylines]
+        self.num_reels = num_reels
+        self.visible_rows = visible_rows
+        self.min_run = min_run
+        self.num_cells = num_reels * visible_rows
+        self._bits = [1 << cell for cell in range(self.num_cells)]
+        self._lines = [self._compile_line(number, line) for number, line in enumerate(self.paylines, start=1)]
+        self._line_cells = [
+            [reel * visible_rows + row for reel, row in enumerate(line)] for line in self.paylines
+        ]
+        self._line_masks = [sum(self._bits[cell] for cell in cells) for cells in self._line_cells]
+
+    def _compile_line(self, number, line):
+        """Precompute the anchor cells and run masks for a single payline."""
+        if len(line) != self.num_reels:
+            raise ValueError(f"Payline {number} must have exactly {self.num_reels} positions.")
+        if any(not 0 <= row < self.visible_rows for row in line):
+            raise ValueError(f"Payline {number} references a row outside the {self.visible_rows}-row grid.")
+
+        cells = [reel * self.visible_rows + row for reel, row in enumerate(line)]
+
+        runs = []
+        for length in range(self.num_reels, self.min_run - 1, -1):
+            for start in range(self.num_reels - length + 1):
+                reels = list(range(start, start + length))
+                mask = 0
+                for reel in reels:
+                    mask |= 1 << cells[reel]
+                runs.append((mask, reels))
+
+        # Any run of min_run consecutive reels covers exactly one reel whose
+        # index is congruent to min_run - 1, so only symbols found on those
+        # anchor reels can possibly win on this line.
+        anchors = [cells[reel] for reel in range(self.min_run - 1, self.num_reels, self.min_run)]
+        # Most lines do not win, so the shortest paying runs are checked first
+        # to reject them before looking for the longest run.
+        shortest = [mask for mask, reels in runs if len(reels) == self.min_run]
+        return number, anchors, shortest, runs
+
+    def _board(self, cells):
+        masks = {}
+        for bit, symbol in zip(self._bits, cells):
+            masks[symbol] = masks.get(symbol, 0) | bit
+        return cells, masks
+
+    def board_from_cells(self, cells):
+        """Build symbol masks for a flat reel-major list of cells; returns (cells, masks)."""
+        return self._board(list(cells))
+
+    def board_from_result(self, result):
+        """Convert a {reel: [row symbols]} spin result into (cells, symbol masks)."""
+        return self._board([symbol for column in result.values() for symbol in column])
+
+    def board_from_rows(self, rows):
+        """Convert horizontal rows (as produced by flip_horizontal) into (cells, symbol masks)."""
+        return self._board([symbol for column in zip(*rows) for symbol in column])
+
+    def line_cells(self, number, reels):
+        """Return the grid cells a win on payline `number` covers on `reels`."""
+        cells = self._line_cells[number - 1]
+        return [cells[reel] for reel in reels]
+
+    def lines_touching(self, cell_mask):
+        """Return the numbers of the paylines passing through any cell set in `cell_mask`."""
+        return [number for number, mask in enumerate(self._line_masks, start=1) if mask & cell_mask]
+
+    def evaluate(self, cells, masks, lines=None):
+        """
+        Return {line_number: (symbol, [reel indices])} for every winning payline.
+
+        `lines` restricts the check to the given line numbers.
+        """
+        if len(cells) != self.num_cells:
+            raise ValueError(f"Expected a grid of {self.num_cells} cells, got {len(cells)}.")
+
+        if lines is None or len(lines) == len(self._lines):
+            compiled = self._lines
+        else:
+            compiled = [self._lines[number - 1] for number in lines]
+        hits = {}
+        for number, anchors, shortest, runs in compiled:
+            if len(anchors) == 1:
+                symbol = cells[anchors[0]]
+                mask = masks[symbol]
+                for run_mask in shortest:
+                    if mask & run_mask == run_mask:
+                        break
+                else:
+                    continue
+                for run_mask, reels in runs:
+                    if mask & run_mask == run_mask:
+                        hits[number] = (symbol, reels)
+                        break
+                continue
+
+            best = None
+            for anchor in anchors:
+                symbol = cells[anchor]
+                mask = masks[symbol]
+                for run_mask, reels in runs:
+                    if mask & run_mask == run_mask:
+                        if best is None or len(reels) > len(best[1]):
+                            best = (symbol, reels)
+                        break
+            if best is not None:
+                hits[number] = best
+        return hits
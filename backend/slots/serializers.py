@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Spin, Symbol
+from .models import Machine, Spin, Symbol
 from django.contrib.auth import get_user_model
 from decimal import Decimal
 
@@ -11,12 +11,24 @@ class SymbolSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'payout_multiplier']
         read_only_fields = ['id', 'name', 'payout_multiplier']
 
+class MachineSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Machine
+        fields = ['slug', 'name', 'num_reels', 'visible_rows', 'symbols', 'paylines', 'min_run', 'evaluation', 'cascading', 'version']
+        read_only_fields = fields
+
+
 class SpinSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Spin
-        fields = ['id', 'user', 'payout', 'result', 'win_data', 'timestamp', 'bet_amount']
-        read_only_fields = ['id', 'user', 'payout', 'result', 'win_data', 'timestamp']
+        fields = ['id', 'user', 'payout', 'jackpot_payout', 'result', 'win_data', 'timestamp', 'bet_amount']
+        read_only_fields = ['id', 'user', 'payout', 'jackpot_payout', 'result', 'win_data', 'timestamp']
+
+
+class JackpotSerializer(serializers.Serializer):
+    pool = serializers.CharField()
+    amount = serializers.DecimalField(max_digits=14, decimal_places=2)
 
 
 class SpinRequestSerializer(serializers.Serializer):
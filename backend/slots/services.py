@@ -1,30 +1,96 @@
 import random
 from decimal import Decimal
+from django.db import transaction
+from analytics.signals import send_round_settled
+from user.ledger import ledger_reference
+from user.stats import record_rounds
 from .models import Symbol
 from .models import Spin
+from .jackpot import JackpotService
+from .cascades import CascadeEvaluator, iter_wins
+from .clusters import ClusterEvaluator
+from .outcome_queue import outcome_queues as default_outcome_queues
+from .paylines import PaylineEvaluator, horizontal_paylines
 
 
 class ReelService:
+    LINES = 'lines'
+    CLUSTERS = 'clusters'
     MIN_SYMBOLS_FOR_WIN = 2
-
-    def __init__(self, symbols):
+    NUM_REELS = 5
+    VISIBLE_ROWS = 3
+    DEFAULT_SYMBOL_MAP = {
+        0: 'star',  # Star icon
+        1: 'heart',  # Heart icon
+        2: 'cherry',  # Cherry icon
+        3: 'gem',  # Gem icon
+        4: 'citrus',  # Citrus icon
+    }
+
+    def __init__(self, symbols, paylines=None, num_reels=None, visible_rows=None, min_run=None,
+                 symbol_names=None, reel_strips=None, evaluation=LINES, cascading=False):
         self.symbols = symbols
-        self.frontend_symbol_map = {
-            0: 'star',  # Star icon
-            1: 'heart',  # Heart icon
-            2: 'cherry',  # Cherry icon
-            3: 'gem',  # Gem icon
-            4: 'citrus',  # Citrus icon
-        }
+        self.evaluation = evaluation
+        self.num_reels = num_reels or self.NUM_REELS
+        self.visible_rows = visible_rows or self.VISIBLE_ROWS
+        self.min_run = min_run or self.MIN_SYMBOLS_FOR_WIN + 1
+        if symbol_names:
+            self.frontend_symbol_map = dict(enumerate(symbol_names))
+        else:
+            self.frontend_symbol_map = dict(self.DEFAULT_SYMBOL_MAP)
         self.backend_symbol_map = {v: k for k, v in self.frontend_symbol_map.items()}
+        self.multipliers = {symbol.name: symbol.payout_multiplier for symbol in symbols}
+        self.reel_strips = reel_strips
+        self.payline_evaluator = None
+        self.cluster_evaluator = None
+        if evaluation == self.CLUSTERS:
+            self.cluster_evaluator = ClusterEvaluator(self.num_reels, self.visible_rows, self.min_run)
+        else:
+            self.payline_evaluator = PaylineEvaluator(
+                paylines or horizontal_paylines(self.num_reels, self.visible_rows),
+                num_reels=self.num_reels,
+                visible_rows=self.visible_rows,
+                min_run=self.min_run,
+            )
+        self.cascade_evaluator = None
+        if cascading:
+            self._drop_symbols = [
+                self.backend_symbol_map[symbol.name] for symbol in symbols if symbol.name in self.backend_symbol_map
+            ]
+            self.cascade_evaluator = CascadeEvaluator(
+                self.num_reels,
+                self.visible_rows,
+                self._draw_symbol,
+                payline_evaluator=self.payline_evaluator,
+                cluster_evaluator=self.cluster_evaluator,
+            )
 
-    def generate_spin(self, num_reels=5, visible_rows=3):
-        """Generate a random spin result with 5 reels and 3 visible symbols per reel."""
+    def generate_spin(self, num_reels=None, visible_rows=None):
+        """
+        Generate a random spin result with one column of visible symbols per reel.
+
+        Machines with reel strips stop each reel at a random position and show
+        the following symbols, wrapping around the strip. Without strips every
+        reel shows distinct symbols while there are enough of them, and draws
+        with repetition once the grid is taller than the symbol set.
+        """
+        num_reels = num_reels or self.num_reels
+        visible_rows = visible_rows or self.visible_rows
         try:
             result = {}
+            if self.reel_strips:
+                for reel, strip in enumerate(self.reel_strips[:num_reels]):
+                    stop = random.randrange(len(strip))
+                    result[reel] = [strip[(stop + row) % len(strip)] for row in range(visible_rows)]
+                return result
+
+            symbols = list(self.symbols)
             for reel in range(num_reels):
-                shuffled_symbols = random.sample(list(self.symbols), len(self.symbols))
-                result[reel] = [self.backend_symbol_map.get(shuffled_symbols[i].name, i) for i in range(visible_rows)]
+                if visible_rows <= len(symbols):
+                    drawn = random.sample(symbols, visible_rows)
+                else:
+                    drawn = random.choices(symbols, k=visible_rows)
+                result[reel] = [self.backend_symbol_map.get(symbol.name, i) for i, symbol in enumerate(drawn)]
             return result
         except Exception as e:
             import logging
@@ -32,6 +98,12 @@ class ReelService:
             # Return a default result in case of error
             return {reel: [0] * visible_rows for reel in range(num_reels)}
 
+    def _draw_symbol(self, reel):
+        """Draw the symbol that drops into `reel` during a cascade."""
+        if self.reel_strips:
+            return random.choice(self.reel_strips[reel])
+        return random.choice(self._drop_symbols)
+
     def _extract_horizontal_values(self, result):
         """Extract horizontal values from result dictionary."""
         horizontal_values = []
@@ -106,30 +178,81 @@ class ReelService:
             logging.error(f"Error finding longest sequence: {str(e)}")
             return []
 
-    def _find_winning_combinations(self, horizontal):
-        """Find winning combinations in horizontal rows."""
-        hits = {}
+    def _format_hits(self, line_hits):
+        """Convert evaluator hits into win data keyed by payline or cluster number."""
+        return {
+            number: [self.frontend_symbol_map.get(sym, f"symbol_{sym}"), reels]
+            for number, (sym, reels) in line_hits.items()
+        }
 
-        for row_index, row in enumerate(horizontal):
-            for sym in set(row):  # Use set to process each symbol only once
-                if row.count(sym) > self.MIN_SYMBOLS_FOR_WIN:
-                    possible_win = [idx for idx, val in enumerate(row) if sym == val]
-                    longest = self.longest_seq(possible_win)
+    def _find_winning_combinations(self, horizontal):
+        """Find winning combinations on the configured paylines of horizontal rows."""
+        cells, masks = self.payline_evaluator.board_from_rows(horizontal)
+        return self._format_hits(self.payline_evaluator.evaluate(cells, masks))
+
+    @property
+    def jackpot_size(self):
+        """Number of trigger symbols in one win needed to hit the jackpot."""
+        if self.cluster_evaluator is not None:
+            return self.cluster_evaluator.num_cells // 2
+        return self.num_reels
+
+    def _find_clusters(self, result):
+        """Find paying clusters, keyed 1..k, each as [symbol name, flat cell indices]."""
+        cells = [symbol for column in result.values() for symbol in column]
+        clusters = self.cluster_evaluator.evaluate(cells)
+        return {
+            number: [self.frontend_symbol_map.get(sym, f"symbol_{sym}"), members]
+            for number, (sym, members) in enumerate(clusters, start=1)
+        }
 
-                    if len(longest) > self.MIN_SYMBOLS_FOR_WIN:
-                        symbol_name = self.frontend_symbol_map.get(sym, f"symbol_{sym}")
-                        hits[row_index + 1] = [symbol_name, longest]
+    def _grid_to_result(self, cells):
+        """Convert a flat reel-major grid back into a {reel: [row symbols]} result."""
+        rows = self.visible_rows
+        return {reel: cells[reel * rows:(reel + 1) * rows] for reel in range(self.num_reels)}
+
+    def _play_cascades(self, result):
+        """
+        Play out the cascade chain of a spin.
+
+        Returns {"steps": [{"result": grid, "wins": wins}, ...], "final_result": grid},
+        where every step holds the grid its wins were found on, or None when the
+        spin does not pay.
+        """
+        cells = [symbol for column in result.values() for symbol in column]
+        steps, final = self.cascade_evaluator.run(cells)
+        if not steps:
+            return None
+        return {
+            'steps': [
+                {
+                    'result': self._grid_to_result(grid),
+                    'wins': self._format_hits(hits),
+                }
+                for grid, hits in steps
+            ],
+            'final_result': self._grid_to_result(final),
+        }
 
-        return hits
+    def evaluate_grid(self, result):
+        """Return the paying lines or clusters of a single grid, never cascading."""
+        if self.cluster_evaluator is not None:
+            return self._find_clusters(result)
+        cells, masks = self.payline_evaluator.board_from_result(result)
+        return self._format_hits(self.payline_evaluator.evaluate(cells, masks))
 
     def check_wins(self, result):
-        """Check for winning combinations in the spin result."""
-        try:
-            horizontal = self.flip_horizontal(result)
-            if not horizontal:
-                return None
+        """
+        Check for winning paylines, or paying clusters on cluster machines, in the spin result.
 
-            hits = self._find_winning_combinations(horizontal)
+        On cascading machines this plays out the whole cascade chain, drawing
+        the symbols that drop in, and returns every step.
+        """
+        try:
+            if self.cascade_evaluator is not None:
+                hits = self._play_cascades(result)
+            else:
+                hits = self.evaluate_grid(result)
             return hits if hits else None
         except Exception as e:
             import logging
@@ -138,18 +261,12 @@ class ReelService:
 
     def _get_symbol_multiplier(self, symbol_name):
         """Get the payout multiplier for a symbol with error handling."""
-        try:
-            from .models import Symbol
-            symbol = Symbol.objects.get(name=symbol_name)
-            return symbol.payout_multiplier
-        except Symbol.DoesNotExist:
+        multiplier = self.multipliers.get(symbol_name)
+        if multiplier is None:
             import logging
             logging.warning(f"Symbol '{symbol_name}' not found, using default multiplier")
             return Decimal('1.0')
-        except Exception as e:
-            import logging
-            logging.error(f"Error getting symbol multiplier: {str(e)}")
-            return Decimal('1.0')
+        return Decimal(multiplier)
 
     def _calculate_win_payout(self, symbol_name, indices, bet_amount):
         """Calculate payout for a single winning combination."""
@@ -165,7 +282,7 @@ class ReelService:
 
             total_payout = Decimal('0.00')
 
-            for row_number, win_info in win_data.items():
+            for win_info in iter_wins(win_data):
                 sym_name, indices = win_info
                 win_payout = self._calculate_win_payout(sym_name, indices, bet_amount)
                 total_payout += win_payout
@@ -178,10 +295,17 @@ class ReelService:
 
 
 class SlotMachineService:
-    def __init__(self):
+    def __init__(self, machine=None, jackpot=None, outcome_queues=None):
         try:
-            symbols = Symbol.objects.all()
-            self.reel_service = ReelService(symbols)
+            self.machine = machine
+            self.outcome_queues = outcome_queues or default_outcome_queues
+            if machine is not None:
+                self.reel_service = machine.reel_service
+                self.jackpot = jackpot or JackpotService(pool=machine.slug)
+            else:
+                symbols = Symbol.objects.all()
+                self.reel_service = ReelService(symbols)
+                self.jackpot = jackpot or JackpotService()
         except Exception as e:
             import logging
             logging.error(f"Error initializing SlotMachineService: {str(e)}")
@@ -199,11 +323,6 @@ class SlotMachineService:
             # Deduct from user's balance using the profile method
             user.profile.deduct_balance(Decimal(bet_amount))
 
-            # Update total_wager if it exists
-            if hasattr(user, 'total_wager'):
-                user.total_wager += Decimal(bet_amount)
-                user.save()
-
             return True
         except Exception as e:
             import logging
@@ -222,27 +341,68 @@ class SlotMachineService:
             # Add to user's balance using the profile method
             user.profile.add_balance(payout)
 
-            # Update total_won if it exists
-            if hasattr(user, 'total_won'):
-                user.total_won += payout
-                user.save()
-
             return True
         except Exception as e:
             import logging
             logging.error(f"Error updating user balance for win: {str(e)}")
             return False
 
-    def _create_spin_record(self, user, bet_amount, payout, result, win_data):
+    def _contribute_to_jackpot(self, bet_amount):
+        """Feed the progressive jackpot; a failure here must not fail the spin."""
+        try:
+            with transaction.atomic():
+                self.jackpot.contribute(bet_amount)
+        except Exception as e:
+            import logging
+            logging.error(f"Error contributing to jackpot: {str(e)}")
+
+    def _claim_jackpot(self, win_data):
+        """Claim the jackpot if the spin triggered it and return the amount won."""
+        try:
+            if self.jackpot.is_triggered(win_data, self.reel_service.jackpot_size):
+                return self.jackpot.claim()
+        except Exception as e:
+            import logging
+            logging.error(f"Error claiming jackpot: {str(e)}")
+        return Decimal('0.00')
+
+    def _spin_outcome(self, bet_amount):
+        """
+        Return (result, win_data, payout) for a spin.
+
+        With the outcome queue enabled a pre-generated outcome is popped and its
+        unit payout scaled by the bet; otherwise, or when the queue is empty,
+        the reels are spun and evaluated inline.
+        """
+        if self.machine is not None and self.outcome_queues.enabled:
+            outcome = self.outcome_queues.pop(self.machine)
+            if outcome is not None:
+                payout = Decimal(bet_amount) * outcome.unit_payout if outcome.win_data else Decimal('0.00')
+                return outcome.result, outcome.win_data, payout
+
+        result = self.reel_service.generate_spin()
+        win_data = self.reel_service.check_wins(result)
+        payout = self.reel_service.calculate_payout(win_data, bet_amount) if win_data else Decimal('0.00')
+        return result, win_data, payout
+
+    def _create_spin_record(self, user, bet_amount, payout, result, win_data, jackpot_payout=None):
         """Create a spin record with error handling."""
         try:
+            fields = {}
+            if jackpot_payout:
+                fields['jackpot_payout'] = jackpot_payout
+            if self.machine is not None:
+                fields['machine_id'] = self.machine.id
+                fields['machine_version'] = self.machine.version
             spin = Spin.objects.create(
                 user=user,
                 bet_amount=bet_amount,
                 payout=payout,
                 result=result,
-                win_data=win_data
+                win_data=win_data,
+                **fields
             )
+            record_rounds(user.profile.pk, 'slots', Decimal(bet_amount), payout, payout - Decimal(bet_amount))
             return spin
         except Exception as e:
             import logging
@@ -250,7 +410,18 @@ class SlotMachineService:
             return None
 
     def play_spin(self, user, bet_amount):
-        """Process a single spin of the slot machine."""
+        """
+        Process a single spin of the slot machine. The bet, the payout, the spin
+        record and the player's counters commit together, so a spin that fails
+        part way is rolled back as a whole.
+        """
+        with ledger_reference('slots'), transaction.atomic():
+            response = self._play_spin(user, bet_amount)
+            if not response['success']:
+                transaction.set_rollback(True)
+            return response
+
+    def _play_spin(self, user, bet_amount):
         try:
             # Check if user has profile
             if not hasattr(user, 'profile'):
@@ -275,16 +446,16 @@ class SlotMachineService:
                     'message': 'Error processing bet'
                 }
 
-            # Generate spin result
-            result = self.reel_service.generate_spin()
+            self._contribute_to_jackpot(bet_amount)
 
-            # Check for wins
-            win_data = self.reel_service.check_wins(result)
-            payout = Decimal('0.00')
+            # Generate spin result and check for wins
+            result, win_data, payout = self._spin_outcome(bet_amount)
+            jackpot_payout = Decimal('0.00')
 
             # Process payout if there's a win
             if win_data:
-                payout = self.reel_service.calculate_payout(win_data, bet_amount)
+                jackpot_payout = self._claim_jackpot(win_data)
+                payout += jackpot_payout
                 if not self._update_user_balance_for_win(user, payout):
                     return {
                         'success': False,
@@ -292,13 +463,19 @@ class SlotMachineService:
                     }
 
             # Create spin record
-            spin = self._create_spin_record(user, bet_amount, payout, result, win_data)
+            spin = self._create_spin_record(user, bet_amount, payout, result, win_data, jackpot_payout)
             if not spin:
                 return {
                     'success': False,
                     'message': 'Error recording spin'
                 }
 
+            # The progressive jackpot is funded separately, so RTP tracks the base game.
+            send_round_settled(
+                Spin, 'slots', self.machine.slug if self.machine is not None else 'legacy',
+                bet_amount, payout - jackpot_payout, user_id=user.pk, jackpot=jackpot_payout,
+            )
+
             # Prepare response
             response = {
                 'success': True,
@@ -308,6 +485,9 @@ class SlotMachineService:
                 'payout': payout
             }
 
+            if jackpot_payout:
+                response['jackpot_payout'] = jackpot_payout
+
             # Add message if player loses
             if not win_data or payout == Decimal('0.00'):
                 response['message'] = f"you lost ${bet_amount}"
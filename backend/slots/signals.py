@@ -0,0 +1,30 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from slots.machines import machine_registry, snapshot_machine
+from slots.models import Machine, Symbol
+
+
+@receiver(post_save, sender=Machine)
+def snapshot_machine_version(sender, instance, **kwargs):
+    """Keep the rules of every version a spin can be played on."""
+    snapshot_machine(instance)
+
+
+@receiver(post_save, sender=Machine)
+@receiver(post_delete, sender=Machine)
+def invalidate_compiled_machine(sender, instance, **kwargs):
+    """Recompile a machine in this process as soon as it changes."""
+    machine_registry.invalidate(instance.slug)
+
+
+@receiver(post_save, sender=Symbol)
+@receiver(post_delete, sender=Symbol)
+def bump_machine_versions(sender, instance, **kwargs):
+    """A paytable change is a new version of every machine using the symbol."""
+    machines = Machine.objects.filter(symbols__contains=[instance.name])
+    machines.update(version=F('version') + 1)
+    for machine in machines:
+        snapshot_machine(machine)
+    machine_registry.invalidate()
@@ -2,8 +2,26 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from decimal import Decimal
 from unittest.mock import patch, MagicMock
-from .models import Symbol, Spin
+import random
+import time
+import uuid
+from core.utils import uuid7
+from django.core.cache import cache
+from django.core.management import call_command
+import json
+import os
+import tempfile
+from .jackpot import JackpotService
+from rest_framework.test import APIClient
+from .cascades import CascadeEvaluator
+from .clusters import ClusterEvaluator
+from .machines import MachineRegistry, compile_machine, machine_registry
+from .audit import SpinAuditor, audit_range
+from .outcome_queue import Outcome, OutcomeQueueManager
+from .models import JackpotShard, Machine, MachineVersion, Symbol, Spin
+from .paylines import HORIZONTAL_PAYLINES, STANDARD_PAYLINES, PaylineEvaluator, horizontal_paylines
 from .services import ReelService, SlotMachineService
+from user.models import GameStats
 
 User = get_user_model()
 
@@ -208,10 +226,8 @@ class SlotMachineServiceTestCase(TestCase):
             email='test@example.com',
             password='testpass123'
         )
-        # Add balance, total_wager, and total_won attributes to user
+        # Add a balance attribute to user
         self.user.balance = Decimal('100.00')
-        self.user.total_wager = Decimal('0.00')
-        self.user.total_won = Decimal('0.00')
         self.user.save()
 
         # Create test symbols
@@ -277,6 +293,21 @@ class SlotMachineServiceTestCase(TestCase):
         # Check that the returned spin is the mock_spin
         self.assertEqual(spin, mock_spin)
 
+    @patch('slots.services.Spin.objects.create')
+    def test_failed_spin_record_rolls_back_spin(self, mock_spin_create):
+        """Test that a spin whose record cannot be saved refunds the bet and counts no round."""
+        self.user.profile.balance = Decimal('100.00')
+        self.user.profile.save()
+        mock_spin_create.side_effect = Exception('write failed')
+
+        result = self.slot_service.play_spin(self.user, Decimal('10.00'))
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['message'], 'Error recording spin')
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.balance, Decimal('100.00'))
+        self.assertFalse(GameStats.objects.filter(profile=self.user.profile).exists())
+
     def test_longest_seq_empty_input(self):
         """Test that longest_seq handles empty input correctly."""
         longest = self.slot_service.reel_service.longest_seq([])
@@ -287,3 +318,559 @@ class SlotMachineServiceTestCase(TestCase):
         longest = self.slot_service.reel_service.longest_seq([5])
         self.assertEqual(longest, [])
 
+
+class SpinModelTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='spinner@example.com',
+            password='testpass123'
+        )
+
+    def test_uuid7_version_and_variant(self):
+        """Test that uuid7 produces RFC 9562 version 7 UUIDs."""
+        value = uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+
+    def test_uuid7_is_time_ordered(self):
+        """Test that UUIDs generated later sort after earlier ones."""
+        first = uuid7()
+        time.sleep(0.002)
+        second = uuid7()
+        self.assertLess(first, second)
+        self.assertLess(first.bytes, second.bytes)
+
+    def test_spin_primary_key_is_uuid7(self):
+        """Test that new spins get time-ordered primary keys."""
+        spin = Spin.objects.create(user=self.user, bet_amount=Decimal('1.00'), result={})
+        self.assertEqual(spin.id.version, 7)
+
+
+class PaylineEvaluatorTestCase(TestCase):
+    def setUp(self):
+        self.evaluator = PaylineEvaluator(STANDARD_PAYLINES)
+
+    def test_standard_paylines_compile(self):
+        """Test that the standard layout has 20 paylines starting with the three rows."""
+        self.assertEqual(len(STANDARD_PAYLINES), 20)
+        self.assertEqual(STANDARD_PAYLINES[:3], HORIZONTAL_PAYLINES)
+
+    def test_v_shape_win(self):
+        """Test that a V-shaped payline is detected."""
+        result = {
+            0: [0, 1, 2],
+            1: [3, 0, 4],
+            2: [1, 2, 0],
+            3: [3, 0, 4],
+            4: [0, 1, 2],
+        }
+        hits = self.evaluator.evaluate(*self.evaluator.board_from_result(result))
+        self.assertEqual(hits[4], (0, [0, 1, 2, 3, 4]))
+
+    def test_longest_run_is_reported(self):
+        """Test that the longest run on a line wins rather than the first match."""
+        rows = [
+            [1, 1, 1, 1, 2],
+            [2, 3, 4, 0, 1],
+            [3, 4, 0, 1, 2],
+        ]
+        hits = self.evaluator.evaluate(*self.evaluator.board_from_rows(rows))
+        self.assertEqual(hits[1], (1, [0, 1, 2, 3]))
+
+    def test_matches_row_scan_on_horizontal_lines(self):
+        """Test that bitboard evaluation agrees with scanning rows for the longest run."""
+        import random
+        evaluator = PaylineEvaluator(HORIZONTAL_PAYLINES)
+        rng = random.Random(42)
+        for _ in range(500):
+            rows = [[rng.randrange(3) for _ in range(5)] for _ in range(3)]
+            expected = {}
+            for number, row in enumerate(rows, start=1):
+                for sym in set(row):
+                    longest = ReelService.longest_seq([idx for idx, val in enumerate(row) if val == sym])
+                    if len(longest) >= 3:
+                        expected[number] = (sym, longest)
+            self.assertEqual(evaluator.evaluate(*evaluator.board_from_rows(rows)), expected)
+
+    def test_invalid_payline_rejected(self):
+        """Test that paylines outside the grid are rejected."""
+        with self.assertRaises(ValueError):
+            PaylineEvaluator([[0, 1, 3, 1, 0]])
+        with self.assertRaises(ValueError):
+            PaylineEvaluator([[0, 1, 2]])
+
+    def test_reel_service_uses_configured_paylines(self):
+        """Test that ReelService reports diagonal wins when configured with them."""
+        Symbol.objects.create(name='star', payout_multiplier=2.0)
+        reel_service = ReelService(Symbol.objects.all(), paylines=STANDARD_PAYLINES)
+        result = {
+            0: [0, 1, 2],
+            1: [3, 0, 4],
+            2: [1, 2, 0],
+            3: [3, 4, 1],
+            4: [4, 3, 1],
+        }
+        wins = reel_service.check_wins(result)
+        self.assertEqual(wins[4], ['star', [0, 1, 2]])
+
+
+class JackpotServiceTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.jackpot = JackpotService(pool='test', shards=4, contribution_rate='0.01', enabled=True)
+
+    def test_contribute_creates_shards_and_adds_share(self):
+        """Test that contributions create the shard rows and add the configured share."""
+        for _ in range(10):
+            self.jackpot.contribute(Decimal('100.00'))
+
+        self.assertEqual(JackpotShard.objects.filter(pool='test').count(), 4)
+        self.assertEqual(self.jackpot.current_amount(), Decimal('10.00'))
+
+    def test_current_amount_is_cached(self):
+        """Test that the displayed amount is served from cache between refreshes."""
+        self.jackpot.contribute(Decimal('100.00'))
+        self.assertEqual(self.jackpot.current_amount(), Decimal('1.00'))
+
+        self.jackpot.contribute(Decimal('100.00'))
+        self.assertEqual(self.jackpot.current_amount(), Decimal('1.00'))
+
+    def test_claim_empties_all_shards(self):
+        """Test that claiming returns the pool and keeps only sub-cent remainders."""
+        self.jackpot.ensure_shards()
+        JackpotShard.objects.filter(pool='test', shard=0).update(amount=Decimal('12.3456'))
+        JackpotShard.objects.filter(pool='test', shard=3).update(amount=Decimal('7.6500'))
+
+        self.assertEqual(self.jackpot.claim(), Decimal('19.99'))
+        remaining = sum(JackpotShard.objects.filter(pool='test').values_list('amount', flat=True))
+        self.assertEqual(remaining, Decimal('0.0056'))
+        self.assertEqual(self.jackpot.claim(), Decimal('0.00'))
+
+    def test_is_triggered_requires_full_line_of_trigger_symbol(self):
+        """Test that only a full-length line of the trigger symbol wins the jackpot."""
+        self.assertTrue(self.jackpot.is_triggered({1: ['star', [0, 1, 2, 3, 4]]}, 5))
+        self.assertFalse(self.jackpot.is_triggered({1: ['star', [0, 1, 2, 3]]}, 5))
+        self.assertFalse(self.jackpot.is_triggered({1: ['heart', [0, 1, 2, 3, 4]]}, 5))
+        self.assertFalse(self.jackpot.is_triggered(None, 5))
+
+    @patch('slots.services.ReelService.generate_spin')
+    def test_play_spin_awards_jackpot(self, mock_generate_spin):
+        """Test that a triggering spin pays the jackpot on top of the line win."""
+        Symbol.objects.create(name='star', payout_multiplier=2.0)
+        user = User.objects.create_user(email='lucky@example.com', password='testpass123')
+        user.profile.balance = Decimal('100.00')
+        user.profile.save()
+        self.jackpot.ensure_shards()
+        JackpotShard.objects.filter(pool='test', shard=1).update(amount=Decimal('500.00'))
+        mock_generate_spin.return_value = {reel: [0, 1 + reel % 2, 2 - reel % 2] for reel in range(5)}
+
+        result = SlotMachineService(jackpot=self.jackpot).play_spin(user, Decimal('10.00'))
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['jackpot_payout'], Decimal('500.10'))
+        self.assertEqual(result['payout'], Decimal('10.00') * 5 * Decimal('2.0') + Decimal('500.10'))
+        spin = Spin.objects.get(pk=result['spin_id'])
+        self.assertEqual(spin.jackpot_payout, Decimal('500.10'))
+
+
+class MachineTestCase(TestCase):
+    def setUp(self):
+        machine_registry.invalidate()
+        for name, multiplier in [('star', 3.0), ('heart', 2.5), ('cherry', 2.0), ('gem', 1.5), ('citrus', 1.0)]:
+            Symbol.objects.create(name=name, payout_multiplier=multiplier)
+        self.machine = Machine.objects.create(
+            slug='tall',
+            name='Tall',
+            num_reels=5,
+            visible_rows=7,
+            symbols=['star', 'heart', 'cherry'],
+            reel_strips=[['star', 'heart', 'cherry', 'heart']] * 5,
+            paylines=[[0, 1, 2, 3, 4], [6, 6, 6, 6, 6]],
+            min_run=4,
+        )
+        self.user = User.objects.create_user(email='machine@example.com', password='testpass123')
+        self.user.profile.balance = Decimal('100.00')
+        self.user.profile.save()
+
+    def test_classic_machine_is_seeded(self):
+        """Test that the migration creates the classic 5x3 machine."""
+        classic = Machine.objects.get(slug='classic')
+        self.assertEqual(classic.symbols, ['star', 'heart', 'cherry', 'gem', 'citrus'])
+        self.assertEqual((classic.num_reels, classic.visible_rows, classic.min_run), (5, 3, 3))
+
+    def test_generate_spin_with_more_rows_than_symbols(self):
+        """Test that grids taller than the symbol set are generated from the reel strips."""
+        compiled = compile_machine(self.machine)
+        result = compiled.reel_service.generate_spin()
+        self.assertEqual(len(result), 5)
+        for column in result.values():
+            self.assertEqual(len(column), 7)
+            self.assertTrue(all(symbol in (0, 1, 2) for symbol in column))
+
+    def test_compiled_machine_uses_machine_paylines_and_min_run(self):
+        """Test that the compiled evaluator uses the machine's paylines, min run and symbols."""
+        reel_service = compile_machine(self.machine).reel_service
+        result = {reel: [0, 0, 0, 0, 0, 1, 2] for reel in range(5)}
+        result[4] = [0, 1, 1, 1, 2, 2, 2]
+        wins = reel_service.check_wins(result)
+        self.assertEqual(wins, {1: ['star', [0, 1, 2, 3]], 2: ['cherry', [0, 1, 2, 3, 4]]})
+        self.assertEqual(reel_service.calculate_payout(wins, Decimal('1.00')), Decimal('4') * 3 + Decimal('5') * 2)
+
+    def test_invalid_config_rejected(self):
+        """Test that machines referencing unknown symbols or rows fail validation."""
+        from django.core.exceptions import ValidationError
+        self.machine.reel_strips = [['star', 'bell']] * 5
+        with self.assertRaises(ValidationError):
+            self.machine.full_clean()
+        self.machine.reel_strips = []
+        self.machine.paylines = [[7, 0, 0, 0, 0]]
+        with self.assertRaises(ValidationError):
+            self.machine.full_clean()
+
+    def test_registry_shares_compiled_machine_until_version_changes(self):
+        """Test that the registry reuses one compiled machine per version."""
+        registry = MachineRegistry()
+        first = registry.get('tall')
+        self.assertIs(registry.get('tall'), first)
+
+        self.machine.min_run = 3
+        self.machine.save()
+        registry.invalidate('tall')
+        second = registry.get('tall')
+        self.assertIsNot(second, first)
+        self.assertEqual(second.version, first.version + 1)
+
+    def test_saves_of_the_same_loaded_machine_make_two_versions(self):
+        """Test that saving two copies loaded at the same version records both configurations."""
+        first = Machine.objects.get(slug='tall')
+        second = Machine.objects.get(slug='tall')
+        first.min_run = 3
+        first.save()
+        second.min_run = 5
+        second.save()
+
+        self.assertEqual(second.version, first.version + 1)
+        configs = dict(MachineVersion.objects.filter(machine=self.machine).values_list('version', 'config'))
+        self.assertEqual((configs[first.version]['min_run'], configs[second.version]['min_run']), (3, 5))
+
+    def test_symbol_change_bumps_machine_version(self):
+        """Test that editing the paytable bumps the version of machines using the symbol."""
+        version = Machine.objects.get(slug='tall').version
+        Symbol.objects.filter(name='gem').first().save()
+        self.assertEqual(Machine.objects.get(slug='tall').version, version)
+        Symbol.objects.filter(name='star').first().save()
+        self.assertEqual(Machine.objects.get(slug='tall').version, version + 1)
+
+    @patch('slots.jackpot.JackpotService.is_triggered', return_value=False)
+    def test_classic_spin_feeds_legacy_jackpot_endpoint(self, mock_is_triggered):
+        """Test that a classic spin's jackpot contribution shows on /api/slots/jackpot/."""
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(self.user)
+        before = client.get('/api/slots/jackpot/').data['amount']
+        cache.clear()
+
+        res = client.post('/api/slots/spins/spin/', {'bet_amount': '100.00'}, format='json')
+        self.assertTrue(res.data['success'])
+
+        res = client.get('/api/slots/jackpot/')
+        self.assertEqual(res.data['pool'], 'classic')
+        self.assertEqual(Decimal(res.data['amount']) - Decimal(before), Decimal('1.00'))
+
+    def test_default_jackpot_pool_is_merged_into_classic(self):
+        """Test that the migration moves the legacy 'default' pool into the classic pool."""
+        from django.apps import apps
+        from importlib import import_module
+        migration = import_module('slots.migrations.0010_merge_default_jackpot_pool')
+        JackpotShard.objects.create(pool='default', shard=0, amount=Decimal('3.5000'))
+        JackpotShard.objects.create(pool='default', shard=1, amount=Decimal('1.2500'))
+        JackpotShard.objects.create(pool='classic', shard=0, amount=Decimal('2.0000'))
+
+        migration.merge_default_pool(apps, None)
+
+        self.assertFalse(JackpotShard.objects.filter(pool='default').exists())
+        self.assertEqual(dict(JackpotShard.objects.filter(pool='classic').values_list('shard', 'amount')),
+                         {0: Decimal('5.5000'), 1: Decimal('1.2500')})
+
+    def test_spin_endpoint_per_machine(self):
+        """Test that spinning a machine by slug records the machine and version."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        res = client.post('/api/slots/machines/tall/spin/', {'bet_amount': '1.00'}, format='json')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.data['success'])
+        spin = Spin.objects.get(pk=res.data['spin_id'])
+        self.assertEqual(spin.machine_id, self.machine.pk)
+        self.assertEqual(spin.machine_version, self.machine.version)
+
+        res = client.post('/api/slots/machines/missing/spin/', {'bet_amount': '1.00'}, format='json')
+        self.assertEqual(res.status_code, 404)
+
+
+class ClusterEvaluatorTestCase(TestCase):
+    def setUp(self):
+        self.evaluator = ClusterEvaluator(3, 3, 4)
+
+    def test_neighbor_tables_are_orthogonal(self):
+        """Test that neighbor tables only link cells that share an edge."""
+        self.assertEqual(sorted(self.evaluator.neighbors[4]), [1, 3, 5, 7])
+        self.assertEqual(sorted(self.evaluator.neighbors[0]), [1, 3])
+        self.assertEqual(sorted(self.evaluator.neighbors[2]), [1, 5])
+
+    def test_connected_group_pays_and_diagonals_do_not(self):
+        """Test that only orthogonally connected groups of the minimum size pay."""
+        cells = [
+            0, 0, 1,
+            2, 0, 0,
+            0, 1, 1,
+        ]
+        self.assertEqual(self.evaluator.evaluate(cells), [(0, [0, 1, 4, 5])])
+
+    def test_clusters_touching_matches_full_evaluation(self):
+        """Test that a flood fill from changed cells finds the clusters containing them."""
+        rng = random.Random(3)
+        evaluator = ClusterEvaluator(7, 7, 5)
+        for _ in range(50):
+            cells = [rng.randrange(3) for _ in range(evaluator.num_cells)]
+            expected = evaluator.evaluate(cells)
+            changed = set(range(evaluator.num_cells))
+            self.assertEqual(sorted(evaluator.clusters_touching(cells, changed)), sorted(expected))
+
+    def test_cluster_machine_check_wins(self):
+        """Test that a cluster machine reports clusters as symbol names and cell indices and pays by size."""
+        Symbol.objects.create(name='star', payout_multiplier=3.0)
+        Symbol.objects.create(name='heart', payout_multiplier=2.0)
+        machine = Machine.objects.create(
+            slug='clusters', name='Clusters', num_reels=3, visible_rows=3,
+            symbols=['star', 'heart'], min_run=4, evaluation='clusters',
+        )
+        reel_service = compile_machine(machine).reel_service
+        result = {0: [1, 1, 0], 1: [1, 0, 0], 2: [1, 0, 1]}
+        wins = reel_service.check_wins(result)
+        self.assertEqual(wins, {1: ['heart', [0, 1, 3, 6]], 2: ['star', [2, 4, 5, 7]]})
+        self.assertEqual(reel_service.calculate_payout(wins, Decimal('1.00')), Decimal('4') * 2 + Decimal('4') * 3)
+        self.assertIsNone(reel_service.check_wins({0: [0, 1, 0], 1: [1, 0, 1], 2: [0, 1, 0]}))
+
+
+class CascadeTestCase(TestCase):
+    def _evaluator(self, draws, **kwargs):
+        draws = iter(draws)
+        return CascadeEvaluator(
+            3, 3, lambda reel: next(draws),
+            payline_evaluator=PaylineEvaluator(horizontal_paylines(3, 3), num_reels=3, visible_rows=3, min_run=3),
+            **kwargs
+        )
+
+    def test_winning_symbols_drop_and_refill_until_no_win(self):
+        """Test that winning cells are removed, symbols above drop and the chain stops once nothing pays."""
+        cells = [0, 1, 2, 0, 2, 1, 0, 1, 2]
+        steps, final = self._evaluator([3, 3, 3, 4, 5, 6]).run(cells)
+        self.assertEqual([hits for _, hits in steps], [{1: (0, [0, 1, 2])}, {1: (3, [0, 1, 2])}])
+        self.assertEqual(steps[1][0], [3, 1, 2, 3, 2, 1, 3, 1, 2])
+        self.assertEqual(final, [4, 1, 2, 5, 2, 1, 6, 1, 2])
+
+    def test_cascade_chain_is_capped(self):
+        """Test that a chain that would never end stops after max_cascades steps."""
+        steps, _ = self._evaluator(iter(lambda: 3, None), max_cascades=5).run([0, 1, 2, 0, 2, 1, 0, 1, 2])
+        self.assertEqual(len(steps), 5)
+
+    def test_incremental_matches_full_reevaluation(self):
+        """Test that re-checking only changed paylines and clusters finds the same chain as full re-evaluation."""
+        def play(make, cells, seed, incremental):
+            rng = random.Random(seed)
+            return make(lambda reel: rng.randrange(3), incremental).run(cells)
+
+        def lines(draw, incremental):
+            return CascadeEvaluator(5, 3, draw, payline_evaluator=PaylineEvaluator(STANDARD_PAYLINES),
+                                    incremental=incremental)
+
+        def clusters(draw, incremental):
+            return CascadeEvaluator(7, 7, draw, cluster_evaluator=ClusterEvaluator(7, 7, 5), incremental=incremental)
+
+        rng = random.Random(11)
+        for make, size in ((lines, 15), (clusters, 49)):
+            for seed in range(30):
+                cells = [rng.randrange(3) for _ in range(size)]
+                self.assertEqual(play(make, cells, seed, True), play(make, cells, seed, False))
+
+    @patch('slots.services.ReelService._draw_symbol', side_effect=[1, 1, 1, 2, 0, 1])
+    @patch('slots.services.ReelService.generate_spin')
+    def test_cascades_settle_as_one_spin(self, mock_generate_spin, mock_draw_symbol):
+        """Test that a cascading spin pays every step and is recorded as a single spin."""
+        for name, multiplier in [('star', 3.0), ('heart', 2.0), ('cherry', 1.0)]:
+            Symbol.objects.create(name=name, payout_multiplier=multiplier)
+        machine = Machine.objects.create(
+            slug='tumble', name='Tumble', num_reels=3, visible_rows=3,
+            symbols=['star', 'heart', 'cherry'], cascading=True,
+        )
+        user = User.objects.create_user(email='cascade@example.com', password='testpass123')
+        user.profile.balance = Decimal('100.00')
+        user.profile.save()
+        mock_generate_spin.return_value = {0: [0, 1, 2], 1: [0, 2, 1], 2: [0, 2, 1]}
+
+        jackpot = JackpotService(pool='tumble', enabled=False)
+        result = SlotMachineService(machine=compile_machine(machine), jackpot=jackpot).play_spin(user, Decimal('1.00'))
+
+        steps = result['win_data']['steps']
+        self.assertEqual([step['wins'] for step in steps], [{1: ['star', [0, 1, 2]]}, {1: ['heart', [0, 1, 2]]}])
+        self.assertEqual(result['win_data']['final_result'], {0: [2, 1, 2], 1: [0, 2, 1], 2: [1, 2, 1]})
+        self.assertEqual(result['payout'], Decimal('3') * 3 + Decimal('3') * 2)
+        self.assertEqual(Spin.objects.filter(user=user).count(), 1)
+
+
+class OutcomeQueueTestCase(TestCase):
+    def setUp(self):
+        for name, multiplier in [('star', 3.0), ('heart', 2.5), ('cherry', 2.0), ('gem', 1.5), ('citrus', 1.0)]:
+            Symbol.objects.create(name=name, payout_multiplier=multiplier)
+        self.machine = compile_machine(Machine.objects.get(slug='classic'))
+        self.queues = OutcomeQueueManager(
+            config={'ENABLED': True, 'DEPTH': 50, 'BATCH': 20, 'IDLE_INTERVAL': 0.01},
+            autostart=False,
+        )
+
+    def test_refill_is_bounded(self):
+        """Test that refills never exceed the configured depth."""
+        queue = self.queues.queue_for(self.machine)
+        for _ in range(5):
+            self.queues.refill_once()
+        self.assertEqual(len(queue), 50)
+        self.assertEqual(self.queues.metrics()['machines']['classic']['depth'], 50)
+        self.assertGreater(self.queues.metrics()['refill_rate'], 0)
+
+    def test_outcomes_are_never_reused(self):
+        """Test that every popped outcome is a distinct object and empties the queue."""
+        self.queues.queue_for(self.machine)
+        self.queues.refill_once()
+        popped = [self.queues.pop(self.machine) for _ in range(20)]
+        self.assertEqual(len({id(outcome) for outcome in popped}), 20)
+        self.assertIsNone(self.queues.pop(self.machine))
+        self.assertEqual(self.queues.metrics()['machines']['classic']['misses'], 1)
+
+    def test_version_change_discards_queue(self):
+        """Test that outcomes of an old paytable version are never served."""
+        self.queues.queue_for(self.machine)
+        self.queues.refill_once()
+
+        Symbol.objects.filter(name='star').first().save()
+        new_machine = compile_machine(Machine.objects.get(slug='classic'))
+        self.assertIsNone(self.queues.pop(new_machine))
+        self.assertEqual(self.queues.metrics()['machines']['classic']['version'], new_machine.version)
+
+    def test_play_spin_settles_queued_outcome(self):
+        """Test that play_spin scales a queued unit payout by the bet."""
+        user = User.objects.create_user(email='queued@example.com', password='testpass123')
+        user.profile.balance = Decimal('100.00')
+        user.profile.save()
+        queue = self.queues.queue_for(self.machine)
+        win_data = {1: ['star', [0, 1, 2]]}
+        queue._outcomes.append(Outcome({0: [0, 1, 2]}, win_data, Decimal('9.0')))
+
+        service = SlotMachineService(
+            machine=self.machine,
+            jackpot=JackpotService(pool='queued', enabled=False),
+            outcome_queues=self.queues,
+        )
+        result = service.play_spin(user, Decimal('2.00'))
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['payout'], Decimal('18.00'))
+        self.assertEqual(result['win_data'], win_data)
+        self.assertEqual(len(queue), 0)
+
+
+class SpinAuditTestCase(TestCase):
+    def setUp(self):
+        machine_registry.invalidate()
+        self.star = Symbol.objects.create(name='star', payout_multiplier=Decimal('3.00'))
+        Symbol.objects.create(name='heart', payout_multiplier=Decimal('2.00'))
+        Symbol.objects.create(name='cherry', payout_multiplier=Decimal('1.00'))
+        self.machine = Machine.objects.create(
+            slug='audited', name='Audited', num_reels=3, visible_rows=3, symbols=['star', 'heart', 'cherry'],
+        )
+        self.user = User.objects.create_user(email='audit@example.com', password='testpass123')
+        self.user.profile.balance = Decimal('1000.00')
+        self.user.profile.save()
+        self.jackpot = JackpotService(pool='audited', enabled=False)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    @patch('slots.services.ReelService.generate_spin')
+    def _spin(self, grid, mock_generate_spin):
+        mock_generate_spin.return_value = grid
+        machine = compile_machine(Machine.objects.get(pk=self.machine.pk))
+        result = SlotMachineService(machine=machine, jackpot=self.jackpot).play_spin(self.user, Decimal('1.50'))
+        return result['spin_id']
+
+    def _audit(self, **options):
+        paths = {
+            'checkpoint': os.path.join(self.tmpdir.name, 'checkpoint.json'),
+            'report': os.path.join(self.tmpdir.name, 'report.jsonl'),
+        }
+        call_command('audit_spins', workers=1, chunk_size=2, stdout=open(os.devnull, 'w'), **paths, **options)
+        with open(paths['checkpoint']) as f:
+            state = json.load(f)
+        with open(paths['report']) as f:
+            return state, [json.loads(line) for line in f]
+
+    def test_versions_are_snapshotted(self):
+        """Test that saving a machine or changing a symbol records the new version's paytable."""
+        self.assertEqual(MachineVersion.objects.get(machine=self.machine, version=1).config['multipliers']['star'],
+                         '3.00')
+        self.star.payout_multiplier = Decimal('5.00')
+        self.star.save()
+        self.assertEqual(MachineVersion.objects.get(machine=self.machine, version=2).config['multipliers']['star'],
+                         '5.00')
+
+    def test_audit_uses_paytable_in_effect_and_reports_tampering(self):
+        """Test that spins are checked against their own version and altered payouts are reported."""
+        winning = self._spin({0: [0, 1, 2], 1: [0, 2, 1], 2: [0, 1, 2]})
+        self._spin({0: [0, 1, 2], 1: [1, 2, 0], 2: [2, 0, 1]})
+        self.star.payout_multiplier = Decimal('5.00')
+        self.star.save()
+        later = self._spin({0: [0, 1, 2], 1: [0, 2, 1], 2: [0, 1, 2]})
+        self.assertEqual(Spin.objects.get(pk=winning).payout, Decimal('13.50'))
+        self.assertEqual(Spin.objects.get(pk=later).payout, Decimal('22.50'))
+
+        state, report = self._audit()
+        self.assertEqual((state['checked'], state['mismatches']), (3, 0))
+
+        Spin.objects.filter(pk=winning).update(payout=Decimal('99.00'))
+        state, report = self._audit(restart=True)
+        self.assertEqual(state['mismatches'], 1)
+        self.assertEqual(report[0]['spin_id'], str(winning))
+        self.assertEqual((report[0]['problem'], report[0]['expected']), ('payout', '13.50'))
+
+    def test_audit_resumes_from_checkpoint(self):
+        """Test that an interrupted audit only checks the spins after its checkpoint."""
+        spins = sorted(self._spin({0: [0, 1, 2], 1: [1, 2, 0], 2: [2, 0, 1]}) for _ in range(5))
+        checkpoint = os.path.join(self.tmpdir.name, 'checkpoint.json')
+        with open(checkpoint, 'w') as f:
+            json.dump({'after': str(spins[2]), 'checked': 3, 'mismatches': 0}, f)
+        with open(os.path.join(self.tmpdir.name, 'report.jsonl'), 'w'):
+            pass
+
+        with patch('slots.management.commands.audit_spins.audit_range', side_effect=audit_range) as mock_audit:
+            state, _ = self._audit()
+        self.assertEqual(state['checked'], 5)
+        self.assertTrue(state['finished'])
+        self.assertEqual(mock_audit.call_args_list[0].args[0], str(spins[2]))
+
+    def test_cascade_steps_are_verified(self):
+        """Test that cascading spins are re-checked step by step from the stored grids."""
+        self.machine.cascading = True
+        self.machine.save()
+        with patch('slots.services.ReelService._draw_symbol', side_effect=[2, 1, 0]):
+            spin_id = self._spin({0: [0, 1, 2], 1: [0, 2, 1], 2: [0, 1, 2]})
+        spin = Spin.objects.get(pk=spin_id)
+        self.assertEqual(len(spin.win_data['steps']), 1)
+
+        auditor = SpinAuditor()
+        row = Spin.objects.filter(pk=spin_id).values_list(
+            'id', 'machine_id', 'machine_version', 'bet_amount', 'payout', 'jackpot_payout', 'result', 'win_data'
+        ).get()
+        self.assertIsNone(auditor.audit(row))
+
+        spin.win_data['steps'][0]['wins'] = {'1': ['star', [0, 1, 2]], '2': ['heart', [0, 1, 2]]}
+        self.assertEqual(auditor.audit(row[:-1] + (spin.win_data,))['problem'], 'wins')
+
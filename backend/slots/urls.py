@@ -2,13 +2,16 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from .views import (
-    SpinViewSet, SymbolViewSet
+    SpinViewSet, SymbolViewSet, JackpotView, MachineViewSet, OutcomeQueueMetricsView
 )
 
 router = DefaultRouter()
 router.register(r'spins', SpinViewSet, basename='spin')
 router.register(r'symbols', SymbolViewSet, basename='symbol')
+router.register(r'machines', MachineViewSet, basename='machine')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('jackpot/', JackpotView.as_view(), name='jackpot'),
+    path('metrics/outcome-queue/', OutcomeQueueMetricsView.as_view(), name='outcome-queue-metrics'),
 ]
\ No newline at end of file
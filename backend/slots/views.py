@@ -1,20 +1,36 @@
 from rest_framework import viewsets, status, generics
+from rest_framework.exceptions import NotFound
+from rest_framework.views import APIView
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from drf_spectacular.utils import extend_schema
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from .models import Spin, Symbol
-from .serializers import SpinSerializer,SymbolSerializer, SpinRequestSerializer
+from core.async_views import AsyncViewMixin
+from user.authentication import CachedJWTAuthentication
+from .models import Machine, Spin, Symbol
+from .jackpot import JackpotService
+from .machines import CLASSIC_MACHINE, machine_registry
+from .outcome_queue import outcome_queues
+from .serializers import (
+    SpinSerializer, SymbolSerializer, SpinRequestSerializer, JackpotSerializer, MachineSerializer
+)
 from .services import SlotMachineService
 
 
+def get_compiled_machine(slug):
+    """Return the compiled machine for `slug` or raise NotFound."""
+    try:
+        return machine_registry.get(slug)
+    except Machine.DoesNotExist:
+        raise NotFound(f"Slot machine '{slug}' not found.")
 
 
-class SpinViewSet(viewsets.GenericViewSet):
+
+
+class SpinViewSet(AsyncViewMixin, viewsets.GenericViewSet):
     serializer_class = SpinSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     def get_queryset(self):
         return Spin.objects.filter(user=self.request.user)
@@ -31,7 +47,11 @@ class SpinViewSet(viewsets.GenericViewSet):
 
         bet_amount = serializer.validated_data['bet_amount']
         user = request.user
-        slot_machine = SlotMachineService()
+        try:
+            machine = machine_registry.get(CLASSIC_MACHINE)
+        except Machine.DoesNotExist:
+            machine = None
+        slot_machine = SlotMachineService(machine=machine)
         result = slot_machine.play_spin(user, bet_amount)
         return Response(result)
 
@@ -42,6 +62,9 @@ class SpinViewSet(viewsets.GenericViewSet):
     @action(detail=False, methods=['get'])
     def history(self, request):
         spins = Spin.objects.filter(user=request.user).order_by('-timestamp')
+        machine = request.query_params.get('machine')
+        if machine:
+            spins = spins.filter(machine__slug=machine)
         serializer = self.get_serializer(spins, many=True)
         return Response(serializer.data)
 
@@ -50,7 +73,7 @@ class SymbolViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Symbol.objects.all()
     serializer_class = SymbolSerializer
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [CachedJWTAuthentication]
 
     @extend_schema(
         description="Get symbols with frontend mapping",
@@ -66,3 +89,64 @@ class SymbolViewSet(viewsets.ReadOnlyModelViewSet):
             'backend_to_frontend': reel_service.backend_symbol_map,
             'frontend_to_backend': reel_service.frontend_symbol_map
         })
+
+
+class MachineViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Machine.objects.filter(is_active=True).order_by('slug')
+    serializer_class = MachineSerializer
+    lookup_field = 'slug'
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedJWTAuthentication]
+
+    @extend_schema(
+        description="Spin a specific slot machine",
+        request=SpinRequestSerializer,
+        responses={200: dict}
+    )
+    @action(detail=True, methods=['post'])
+    def spin(self, request, slug=None):
+        serializer = SpinRequestSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+
+        machine = get_compiled_machine(slug)
+        slot_machine = SlotMachineService(machine=machine)
+        result = slot_machine.play_spin(request.user, serializer.validated_data['bet_amount'])
+        return Response(result)
+
+    @extend_schema(
+        description="Get the progressive jackpot of a slot machine",
+        responses={200: JackpotSerializer}
+    )
+    @action(detail=True, methods=['get'])
+    def jackpot(self, request, slug=None):
+        machine = get_compiled_machine(slug)
+        jackpot = JackpotService(pool=machine.slug)
+        serializer = JackpotSerializer({'pool': jackpot.pool, 'amount': jackpot.current_amount()})
+        return Response(serializer.data)
+
+
+class JackpotView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CachedJWTAuthentication]
+
+    @extend_schema(
+        description="Get the progressive jackpot of the classic machine",
+        responses={200: JackpotSerializer}
+    )
+    def get(self, request):
+        jackpot = JackpotService(pool=CLASSIC_MACHINE)
+        serializer = JackpotSerializer({'pool': jackpot.pool, 'amount': jackpot.current_amount()})
+        return Response(serializer.data)
+
+
+class OutcomeQueueMetricsView(APIView):
+    permission_classes = [IsAdminUser]
+    authentication_classes = [CachedJWTAuthentication]
+
+    @extend_schema(
+        description="Depth and refill rate of this worker's pre-generated spin outcome queues",
+        responses={200: dict}
+    )
+    def get(self, request):
+        return Response(outcome_queues.metrics())
+
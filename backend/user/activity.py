@@ -0,0 +1,129 @@
+"""
+A user's rounds across every game, newest first.
+
+Each game stores its rounds in its own table: slots spins, blackjack hands
+and dice rolls. activity_page() reads every game's history as a separate
+keyset-paginated stream ordered on (time, pk) over its (user, -time) index
+and merges the streams with heapq.merge. A stream fetches at most one page
+of rows per request, so a page costs the same however long the history is.
+
+The cursor holds each stream's own position and marks streams that have run
+out, which are not queried again.
+
+Dice rolls made before dice recorded a time have none. They are older than
+every timed round, so a stream serves them last, newest (highest pk) first.
+"""
+import heapq
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from core.pagination import decode_cursor, encode_cursor
+
+GAMES = ('slots', 'blackjack', 'dice')
+
+# Cursor marker of a stream with no rows left.
+DONE = 'done'
+
+
+def activity_sources():
+    """game -> (queryset, timestamp field, bet field, function returning a row's payout)."""
+    from blackjack.models import GameHistory
+    from dice.models import DiceGameModel
+    from slots.models import Spin
+
+    return {
+        'slots': (Spin.objects.all(), 'timestamp', 'bet_amount', lambda row: row['payout']),
+        # A blackjack hand stores the change to the balance; the payout is the stake plus that change.
+        'blackjack': (GameHistory.objects.all(), 'created_at', 'bet_amount',
+                      lambda row: row['bet_amount'] + row['balance_change']),
+        'dice': (DiceGameModel.objects.all(), 'created_at', 'bet', lambda row: row['payout']),
+    }
+
+
+def _stream(game, user_id, position, limit):
+    """
+    Return up to limit + 1 of a user's rounds in `game` older than `position`,
+    newest first. A position with no timestamp is among the untimed rounds.
+    """
+    queryset, time_field, bet_field, payout = activity_sources()[game]
+    queryset = queryset.filter(user_id=user_id)
+    fields = {'pk', time_field, bet_field, 'payout' if game != 'blackjack' else 'balance_change'}
+    timestamp, pk = position if position is not None else (None, None)
+
+    rows = []
+    if position is None or timestamp is not None:
+        timed = queryset.filter(**{f'{time_field}__isnull': False}).order_by(f'-{time_field}', '-pk')
+        if position is not None:
+            timed = timed.filter(
+                Q(**{f'{time_field}__lt': timestamp}) | Q(**{time_field: timestamp, 'pk__lt': pk}),
+                **{f'{time_field}__lte': timestamp},
+            )
+        rows = list(timed.values(*fields)[:limit + 1])
+    if len(rows) <= limit and queryset.model._meta.get_field(time_field).null:
+        untimed = queryset.filter(**{f'{time_field}__isnull': True}).order_by('-pk')
+        if timestamp is None and pk is not None:
+            untimed = untimed.filter(pk__lt=pk)
+        rows += untimed.values(*fields)[:limit + 1 - len(rows)]
+    return [
+        {'game': game, 'id': row['pk'], 'played_at': row[time_field], 'bet': row[bet_field],
+         'payout': payout(row)}
+        for row in rows
+    ]
+
+
+def _positions(cursor):
+    """Return {game: (timestamp or None, pk) or DONE} from a cursor; games it does not mention start from the newest."""
+    positions = {}
+    for entry in decode_cursor(cursor):
+        try:
+            game, *position = entry
+            if game not in GAMES:
+                raise ValueError(game)
+            if position == [DONE]:
+                positions[game] = DONE
+            else:
+                timestamp, pk = position
+                positions[game] = (None if timestamp is None else datetime.fromisoformat(timestamp), pk)
+        except (ValueError, TypeError):
+            raise ValidationError({'cursor': "Invalid cursor."})
+    return positions
+
+
+def activity_page(user_id, games=GAMES, cursor=None, limit=20):
+    """
+    Return (rounds, next cursor) for the next `limit` rounds of `games`,
+    newest first. The next cursor is None once every stream has run out.
+    """
+    positions = _positions(cursor) if cursor else {}
+    streams = {
+        game: _stream(game, user_id, positions.get(game), limit)
+        for game in games if positions.get(game) != DONE
+    }
+    # Untimed rounds sort after every timed one; their keys compare equal, so
+    # None is never compared with a datetime.
+    page = list(islice(
+        heapq.merge(*streams.values(), key=lambda item: (item['played_at'] is not None, item['played_at'],
+                                                         item['game']), reverse=True),
+        limit,
+    ))
+
+    consumed = Counter(item['game'] for item in page)
+    last = {item['game']: item for item in page}
+    for game, rows in streams.items():
+        # limit + 1 rows were asked for, so a stream that returned no more than limit has no more.
+        if consumed[game] == len(rows) and len(rows) <= limit:
+            positions[game] = DONE
+        elif consumed[game]:
+            positions[game] = (last[game]['played_at'], last[game]['id'])
+
+    states = {game: positions.get(game) for game in games}
+    if all(state == DONE for state in states.values()):
+        return page, None
+    return page, encode_cursor(*[
+        [game, DONE] if state == DONE else [game, state[0] and state[0].isoformat(), str(state[1])]
+        for game, state in states.items() if state is not None
+    ])
@@ -0,0 +1,124 @@
+"""
+JWT authentication without a users-table query per request.
+
+simplejwt's JWTAuthentication loads the User row for every request, and the
+games then load the profile as well. CachedJWTAuthentication keeps the few
+columns the API needs (the user's flags and profile id) in a per-process
+cache for TTL seconds and builds the user from them. The user's other
+fields are deferred and load on first access. The profile is attached with
+its balance from the balance cache, so an authenticated game request
+usually reaches neither table before the game itself runs.
+
+Saving or deleting a user drops its entry in this process; other workers
+pick up a deactivation or password change within TTL seconds.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import router
+from django.db.models import F
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from user.balance_cache import balance_cache
+from user.models import Profile, User
+
+DEFAULTS = {
+    'TTL': 30,
+    'MAX_ENTRIES': 10000,
+}
+
+USER_FIELDS = ('id', 'email', 'is_active', 'is_staff', 'is_superuser')
+
+
+def identity_cache_settings():
+    """Return the AUTH_IDENTITY_CACHE settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'AUTH_IDENTITY_CACHE', {})}
+
+
+class IdentityCache:
+    """Per-process cache of {USER_FIELDS..., 'profile_id'} dicts keyed by the token's user id."""
+
+    def __init__(self, config=None):
+        self.config = config or identity_cache_settings()
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return the identity of a user, or None if there is no such user."""
+        now = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        identity = (
+            User.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values(*USER_FIELDS, profile_id=F('profile__id')).first()
+        )
+        if identity is not None:
+            with self._lock:
+                self._entries.pop(user_id, None)
+                if len(self._entries) >= self.config['MAX_ENTRIES']:
+                    # Entries are kept in insertion order, so the first one is the oldest.
+                    self._entries.pop(next(iter(self._entries)))
+                self._entries[user_id] = (identity, now + self.config['TTL'])
+        return identity
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache()
+
+
+def build_user(identity):
+    """
+    Return a User instance holding the cached identity, with its profile
+    attached and the profile's balance taken from the balance cache.
+    """
+    user = _from_values(User, identity)
+    if identity['profile_id'] is not None:
+        user.profile = _from_values(Profile, {
+            'id': identity['profile_id'], 'user_id': user.pk, 'balance': balance_cache.get(user.pk),
+        })
+    return user
+
+
+def _from_values(model, values):
+    """An instance of `model` loaded with `values` by attname; its other fields are deferred."""
+    field_names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(router.db_for_read(model), field_names, [values[name] for name in field_names])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the token's user from identity_cache."""
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Revocation compares the token with the password hash, which is not cached.
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        identity = identity_cache.get(user_id)
+        if identity is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if not identity['is_active']:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return build_user(identity)
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document CachedJWTAuthentication as the same bearer scheme as JWTAuthentication."""
+    target_class = 'user.authentication.CachedJWTAuthentication'
@@ -0,0 +1,102 @@
+"""
+Two-level cache of wallet balances, keyed by user id.
+
+L1 is a small in-process dict whose entries live for L1_TTL seconds; L2 is
+the configured Django cache. Reads fall through
+L1, then L2, then the database, filling the levels above on the way back.
+The wallet writes every new balance through to both levels once its
+transaction commits, so a read only reaches the database on a cold miss;
+saving a Profile any other way invalidates its entry. If two changes commit
+in the opposite order to their updates the older balance can stay cached
+until the next change or L2_TTL.
+
+A balance is written through only in the worker whose transaction committed
+it. With a cache backend shared by every worker, such as Redis or memcached,
+L2 is then current everywhere and another worker's L1 may serve a balance up
+to L1_TTL seconds old. The default LocMemCache lives inside each process, so
+it is no more shared than L1; its entries are kept for L1_TTL seconds as
+well, and another worker sees a change within L1_TTL either way. The cached
+value is for display only, since the wallet's conditional UPDATE is what
+decides whether a bet is covered.
+"""
+import threading
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+DEFAULTS = {
+    'L1_TTL': 2,
+    'L1_MAX_ENTRIES': 10000,
+    'L2_TTL': 300,
+}
+
+
+def balance_cache_settings():
+    """
+    Return the WALLET_BALANCE_CACHE settings merged over the defaults, with
+    L2_TTL capped at L1_TTL when the Django cache is local to the process.
+    """
+    config = {**DEFAULTS, **getattr(settings, 'WALLET_BALANCE_CACHE', {})}
+    if isinstance(caches['default'], LocMemCache):
+        config['L2_TTL'] = min(config['L2_TTL'], config['L1_TTL'])
+    return config
+
+
+class BalanceCache:
+    def __init__(self, config=None):
+        self.config = config or balance_cache_settings()
+        self._local = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(user_id):
+        return f"wallet:balance:{user_id}"
+
+    def get(self, user_id):
+        """Return the user's balance from L1, L2 or, on a miss, the database."""
+        now = time.monotonic()
+        entry = self._local.get(user_id)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+        balance = cache.get(self.key(user_id))
+        if balance is None:
+            from user.models import Profile
+            balance = Profile.objects.values_list('balance', flat=True).get(user_id=user_id)
+            cache.set(self.key(user_id), balance, self.config['L2_TTL'])
+        self._remember(user_id, balance, now)
+        return balance
+
+    def set(self, user_id, balance):
+        """Write a balance through to both levels."""
+        balance = Decimal(balance)
+        cache.set(self.key(user_id), balance, self.config['L2_TTL'])
+        self._remember(user_id, balance, time.monotonic())
+
+    def set_on_commit(self, user_id, balance):
+        """Write a balance through once the current transaction commits, so rolled-back changes never show."""
+        transaction.on_commit(lambda: self.set(user_id, balance))
+
+    def invalidate(self, user_id):
+        cache.delete(self.key(user_id))
+        with self._lock:
+            self._local.pop(user_id, None)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def _remember(self, user_id, balance, now):
+        with self._lock:
+            self._local.pop(user_id, None)
+            if len(self._local) >= self.config['L1_MAX_ENTRIES']:
+                # Entries are kept in insertion order, so the first one is the oldest.
+                self._local.pop(next(iter(self._local)))
+            self._local[user_id] = (balance, now + self.config['L1_TTL'])
+
+
+balance_cache = BalanceCache()
@@ -0,0 +1,21 @@
+from core.jobs import RangeJobCommand
+from user.models import Profile
+from user.stats import backfill_range
+
+
+class Command(RangeJobCommand):
+    help = "Recompute every profile's per-game counters from its blackjack, slots and dice history."
+    row = 'profile'
+    job = 'backfill'
+    action = 'Backfilling'
+    chunk_size = 1000
+    counters = ('written',)
+
+    def get_queryset(self):
+        return Profile.objects.all()
+
+    def get_range_function(self):
+        return backfill_range
+
+    def summary(self, totals):
+        return f"Checked {totals['checked']} profiles, wrote {totals['written']} stats rows"
@@ -0,0 +1,82 @@
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from user.models import Profile
+
+User = get_user_model()
+
+
+def legacy_add_balance(profile, amount):
+    """The previous implementation: change the in-memory copy and save every column."""
+    profile.balance += amount
+    profile.save()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare wallet updates that save the whole profile row with atomic conditional "
+        "updates: concurrent threads play on one shared wallet, and lost updates are "
+        "counted against the expected balance. The benchmark user is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent players on the wallet.')
+        parser.add_argument('--rounds', type=int, default=250, help='Rounds per player and variant.')
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(email=f'bench-{uuid.uuid4().hex}@example.com')
+        variants = [
+            ('read-modify-write save()', self._legacy_round),
+            ('atomic conditional UPDATE', self._atomic_round),
+        ]
+        try:
+            for label, play_round in variants:
+                Profile.objects.filter(user=user).update(balance=Decimal('100000.00'))
+                elapsed = self._run(user.pk, play_round, options['threads'], options['rounds'])
+                operations = options['threads'] * options['rounds'] * 2
+                expected = Decimal('100000.00') + Decimal('0.50') * options['threads'] * options['rounds']
+                lost = expected - Profile.objects.get(user=user).balance
+                self.stdout.write(
+                    f"{label}: {operations / elapsed:,.0f} balance updates/s, "
+                    f"{lost:.2f} coins lost to overwritten updates"
+                )
+        finally:
+            user.delete()
+
+    @staticmethod
+    def _legacy_round(profile):
+        legacy_add_balance(profile, Decimal('-1.00'))
+        legacy_add_balance(profile, Decimal('1.50'))
+
+    @staticmethod
+    def _atomic_round(profile):
+        profile.deduct_balance(Decimal('1.00'))
+        profile.add_balance(Decimal('1.50'))
+
+    def _run(self, user_id, play_round, threads, rounds):
+        """Play concurrently, one thread per player on the same wallet, and return the elapsed seconds."""
+        barrier = threading.Barrier(threads + 1)
+
+        def player():
+            try:
+                profile = Profile.objects.get(user_id=user_id)
+                barrier.wait()
+                for _ in range(rounds):
+                    play_round(profile)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=player) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        return time.perf_counter() - started
@@ -0,0 +1,47 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from user.onboarding import import_users, read_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users in bulk from a CSV file with a header row or an NDJSON file. Records have an email and "
+        "optionally a password, username and opening balance; existing emails are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for standard input.")
+        parser.add_argument('--format', choices=['csv', 'ndjson'],
+                            help='Input format; by default taken from the file extension.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Users per bulk insert.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Password hashing processes; 1 hashes in this process.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv') else 'ndjson' if path != '-' else None)
+        if fmt is None:
+            raise CommandError("Pass --format when reading standard input.")
+
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            stats = import_users(
+                read_records(stream, fmt), batch_size=options['batch_size'], workers=options['workers'],
+                progress=self._progress,
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for error in stats.errors:
+            self.stderr.write(error)
+        self.stdout.write(
+            f"Read {stats.read} records: created {stats.created} users, skipped {stats.skipped} existing or "
+            f"repeated emails, {stats.invalid} invalid ({stats.rate:.0f} users/s)."
+        )
+
+    def _progress(self, stats):
+        self.stdout.write(f"{stats.created} users created, {stats.read} records read ({stats.rate:.0f} users/s)")
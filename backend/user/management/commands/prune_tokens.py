@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.token_blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding refresh tokens and their blacklist entries in small chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Outstanding tokens per key range.')
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='Seconds to sleep between chunks, to leave room for other writers.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        deleted = prune_expired_tokens(chunk_size=options['chunk_size'], pause=options['pause'])
+        self.stdout.write(f"Deleted {deleted} expired tokens in {time.perf_counter() - started:.1f}s.")
@@ -0,0 +1,25 @@
+from core.jobs import RangeJobCommand
+from user.models import Profile
+from user.reconcile import reconcile_range
+
+
+class Command(RangeJobCommand):
+    help = (
+        "Check every profile's balance against its transactions, game history and ledger adjustments "
+        "and report the profiles that do not add up."
+    )
+    row = 'profile'
+    job = 'reconciliation'
+    action = 'Reconciling'
+    chunk_size = 5000
+    counters = ('discrepancies',)
+    report_key = 'discrepancies'
+
+    def get_queryset(self):
+        return Profile.objects.all()
+
+    def get_range_function(self):
+        return reconcile_range
+
+    def summary(self, totals):
+        return f"Checked {totals['checked']} profiles, {totals['discrepancies']} discrepancies"
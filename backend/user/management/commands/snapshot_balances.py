@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.ledger import SNAPSHOT_LAG, take_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshot the balance of every profile with ledger entries since its last snapshot. "
+        f"Run it periodically; snapshots are taken {int(SNAPSHOT_LAG.total_seconds() // 60)} minutes behind now."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Profiles per key range.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = take_snapshots(chunk_size=options['chunk_size'])
+        self.stdout.write(f"Wrote {written} balance snapshots in {time.perf_counter() - started:.1f}s.")
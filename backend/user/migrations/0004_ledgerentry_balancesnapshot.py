@@ -0,0 +1,54 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def snapshot_opening_balances(apps, schema_editor):
+    """Balances from before the ledger existed become each profile's first snapshot."""
+    Profile = apps.get_model('user', 'Profile')
+    BalanceSnapshot = apps.get_model('user', 'BalanceSnapshot')
+    now = django.utils.timezone.now()
+    BalanceSnapshot.objects.bulk_create(
+        BalanceSnapshot(profile_id=pk, balance=balance, as_of=now)
+        for pk, balance in Profile.objects.exclude(balance=0).values_list('pk', 'balance').iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_remove_user_coin_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('as_of', models.DateTimeField()),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='user.profile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('profile', 'as_of'), name='unique_balance_snapshot')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('kind', models.CharField(choices=[('DEPOSIT', 'Deposit'), ('WITHDRAWAL', 'Withdrawal'), ('BET', 'Bet'), ('PAYOUT', 'Payout'), ('ADJUSTMENT', 'Adjustment')], max_length=20)),
+                ('game', models.CharField(blank=True, max_length=20)),
+                ('round_id', models.CharField(blank=True, max_length=32)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='user.profile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['profile', 'created_at'], name='user_ledger_profile_34f150_idx')],
+            },
+        ),
+        migrations.RunPython(snapshot_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-19 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0004_ledgerentry_balancesnapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['profile', '-date', '-id'], include=('amount', 'transaction_type'), name='user_transaction_history_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.15 on 2026-10-19 17:20
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0005_transaction_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game', models.CharField(max_length=20)),
+                ('rounds', models.BigIntegerField(default=0)),
+                ('wagered', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16)),
+                ('won', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=16)),
+                ('biggest_win', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('last_played', models.DateTimeField()),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='game_stats', to='user.profile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('profile', 'game'), name='unique_game_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_gamestats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gamestats',
+            name='last_played',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
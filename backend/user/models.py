@@ -2,10 +2,12 @@
 Database model for User API.
 """
 import logging
+from decimal import Decimal
 
 from django.contrib.auth.base_user import (AbstractBaseUser, BaseUserManager)
 from django.contrib.auth.models import PermissionsMixin
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 from core import settings
 from user.utils import generate_random_username
@@ -70,10 +72,114 @@ class Transaction(models.Model):
         choices=TransactionType.choices
     )
 
+    class Meta:
+        indexes = [
+            # Covers the newest-first history pages: key order plus the listed columns.
+            models.Index(
+                fields=['profile', '-date', '-id'],
+                include=['amount', 'transaction_type'],
+                name='user_transaction_history_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.profile.user.email} - {self.transaction_type} of {self.amount} on {self.date}"
 
 
+class LedgerEntry(models.Model):
+    """
+    Append-only record of one change to a profile's balance, written in the
+    same statement as the balance update itself (see user.wallet).
+    """
+
+    class Kind(models.TextChoices):
+        DEPOSIT = 'DEPOSIT', 'Deposit'
+        WITHDRAWAL = 'WITHDRAWAL', 'Withdrawal'
+        BET = 'BET', 'Bet'
+        PAYOUT = 'PAYOUT', 'Payout'
+        ADJUSTMENT = 'ADJUSTMENT', 'Adjustment'
+
+    profile = models.ForeignKey(
+        'Profile',
+        on_delete=models.CASCADE,
+        related_name='ledger_entries'
+    )
+    amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2
+    )
+    kind = models.CharField(
+        max_length=20,
+        choices=Kind.choices
+    )
+    game = models.CharField(max_length=20, blank=True)
+    round_id = models.CharField(max_length=32, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['profile', 'created_at'])]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Ledger entries are append-only.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.kind} of {self.amount} for profile {self.profile_id} at {self.created_at}"
+
+
+class BalanceSnapshot(models.Model):
+    """A profile's balance as of a point in time, summed from its ledger entries."""
+
+    profile = models.ForeignKey(
+        'Profile',
+        on_delete=models.CASCADE,
+        related_name='balance_snapshots'
+    )
+    balance = models.DecimalField(
+        max_digits=12,
+        decimal_places=2
+    )
+    as_of = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'as_of'], name='unique_balance_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"Balance of profile {self.profile_id} as of {self.as_of}: {self.balance}"
+
+
+class GameStats(models.Model):
+    """
+    A profile's running totals for one game, updated with every round it
+    settles: rounds played, amount wagered, amount paid out, the biggest net
+    win of a single round and when it last played.
+    """
+
+    profile = models.ForeignKey(
+        'Profile',
+        on_delete=models.CASCADE,
+        related_name='game_stats'
+    )
+    game = models.CharField(max_length=20)
+    rounds = models.BigIntegerField(default=0)
+    wagered = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal('0.00'))
+    won = models.DecimalField(max_digits=16, decimal_places=2, default=Decimal('0.00'))
+    biggest_win = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
+    # Null when the only rounds backfilled into it have no recorded time.
+    last_played = models.DateTimeField(null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'game'], name='unique_game_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.game} stats of profile {self.profile_id}: {self.rounds} rounds"
+
+
 class Profile(models.Model):
     """User's profile"""
     user = models.OneToOneField(
@@ -85,7 +191,7 @@ class Profile(models.Model):
     balance = models.DecimalField(
         max_digits=10,
         decimal_places=2,
-        default=0.00
+        default=Decimal('0.00')
     )
 
     def __str__(self):
@@ -93,30 +199,36 @@ class Profile(models.Model):
 
     def add_balance(self, amount):
         """Add some amount to user's balance."""
-        self.balance += amount
-        self.save()
+        from user.wallet import apply_delta
+        self.balance = apply_delta(self.pk, amount)
 
     def deduct_balance(self, amount):
-        """Deduct some amount from user's balance."""
-        self.balance -= amount
-        self.save()
+        """
+        Deduct some amount from user's balance.
+        Raises InsufficientFunds if the stored balance does not cover it.
+        """
+        from user.wallet import apply_delta
+        self.balance = apply_delta(self.pk, -Decimal(str(amount)))
 
     def process_transaction(self, amount, transaction_type):
         """
         Update balance and record a transaction.
         Raises a ValidationError if a withdrawal would lead to a negative balance.
         """
-        if transaction_type == Transaction.TransactionType.WITHDRAWAL:
-            if self.balance < amount:
-                from rest_framework.exceptions import ValidationError
-                raise ValidationError("Insufficient funds for withdrawal.")
-
-            self.deduct_balance(amount)
-        elif transaction_type == Transaction.TransactionType.DEPOSIT:
-            self.add_balance(amount)
-
-        self.transactions.create(
-            amount=amount,
-            transaction_type=transaction_type
-        )
+        from user.ledger import ledger_reference
+        with transaction.atomic(), ledger_reference(kind=transaction_type):
+            if transaction_type == Transaction.TransactionType.WITHDRAWAL:
+                from user.wallet import InsufficientFunds
+                try:
+                    self.deduct_balance(amount)
+                except InsufficientFunds:
+                    from rest_framework.exceptions import ValidationError
+                    raise ValidationError("Insufficient funds for withdrawal.")
+            elif transaction_type == Transaction.TransactionType.DEPOSIT:
+                self.add_balance(amount)
+
+            self.transactions.create(
+                amount=amount,
+                transaction_type=transaction_type
+            )
         return self.balance
@@ -0,0 +1,167 @@
+"""
+Bulk user import.
+
+create_user() saves one user, and its post_save signal saves the profile,
+so every user is two INSERTs and a password hash on the request thread.
+import_users() streams records instead: passwords are hashed in a pool of
+processes while the previous batch is written, and each batch is one
+transaction of bulk INSERTs of users, profiles and the ledger entries of
+their opening balances. bulk_create() sends no post_save signals, so the
+profiles are created here rather than by create_user_profile.
+
+Emails that already exist or repeat within the input are skipped.
+"""
+import csv
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+import django
+from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from user.models import LedgerEntry, Profile, User
+from user.utils import generate_random_username
+
+HASH_CHUNK_SIZE = 200
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    created: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    errors: list = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.created / elapsed if elapsed else 0
+
+
+def read_records(stream, fmt):
+    """Yield dicts from a CSV (with a header row) or NDJSON text stream."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def clean_record(record):
+    """Return (email, password, username, balance) for a record, or raise ValueError."""
+    email = BaseUserManager.normalize_email((record.get('email') or '').strip())
+    if '@' not in email:
+        raise ValueError(f"Invalid email: {email!r}")
+    try:
+        balance = Decimal(str(record.get('balance') or '0')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(f"Invalid balance for {email}: {record.get('balance')!r}")
+    if balance < 0:
+        raise ValueError(f"Negative balance for {email}")
+    return email, record.get('password') or None, record.get('username') or None, balance
+
+
+def hash_passwords(passwords):
+    """Hash a list of passwords; None gets an unusable password. Runs in pool processes."""
+    return [make_password(password) for password in passwords]
+
+
+def _hash_in_chunks(pool, passwords):
+    """Start hashing a batch's passwords; returns a callable that waits for the hashes."""
+    chunks = [passwords[i:i + HASH_CHUNK_SIZE] for i in range(0, len(passwords), HASH_CHUNK_SIZE)]
+    if pool is None:
+        hashes = hash_passwords(passwords)
+        return lambda: hashes
+    futures = [pool.submit(hash_passwords, chunk) for chunk in chunks]
+    return lambda: [hashed for future in futures for hashed in future.result()]
+
+
+def _write_batch(rows, hashes, stats):
+    """Insert one batch of cleaned rows whose emails are new, with their profiles and opening balances."""
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(email=email, password=hashed) for (email, *_), hashed in zip(rows, hashes)
+        ])
+        profiles = Profile.objects.bulk_create([
+            Profile(user_id=user.pk, username=username or generate_random_username(), balance=balance)
+            for user, (_, _, username, balance) in zip(users, rows)
+        ])
+        LedgerEntry.objects.bulk_create([
+            LedgerEntry(profile_id=profile.pk, amount=profile.balance, kind=LedgerEntry.Kind.ADJUSTMENT)
+            for profile in profiles if profile.balance
+        ])
+    stats.created += len(users)
+
+
+def _clean_batch(records, seen, stats):
+    """Clean a batch of records, dropping invalid ones and emails seen before or already registered."""
+    rows = []
+    for record in records:
+        stats.read += 1
+        try:
+            row = clean_record(record)
+        except ValueError as e:
+            stats.invalid += 1
+            if len(stats.errors) < MAX_REPORTED_ERRORS:
+                stats.errors.append(str(e))
+            continue
+        if row[0] in seen:
+            stats.skipped += 1
+            continue
+        seen.add(row[0])
+        rows.append(row)
+
+    existing = set(User.objects.filter(email__in=[row[0] for row in rows]).values_list('email', flat=True))
+    stats.skipped += len(existing)
+    return [row for row in rows if row[0] not in existing]
+
+
+def _batches(records, size):
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+def import_users(records, batch_size=5000, workers=1, progress=None):
+    """
+    Create users from an iterable of records with email, optional password,
+    username and balance. Passwords are hashed in `workers` processes (1
+    hashes in this process) and `progress(stats)` is called after every
+    batch written. Returns the ImportStats.
+    """
+    stats = ImportStats()
+    seen = set()
+    pool = None
+    if workers > 1:
+        # Spawned children set Django up themselves instead of inheriting this process's connections.
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=django.setup)
+    try:
+        pending = None
+        for batch in _batches(records, batch_size):
+            rows = _clean_batch(batch, seen, stats)
+            # Start hashing this batch before writing the previous one, so the two overlap.
+            hashing = (rows, _hash_in_chunks(pool, [row[1] for row in rows])) if rows else None
+            if pending is not None:
+                _write_batch(pending[0], pending[1](), stats)
+                if progress:
+                    progress(stats)
+            pending = hashing
+        if pending is not None:
+            _write_batch(pending[0], pending[1](), stats)
+            if progress:
+                progress(stats)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return stats
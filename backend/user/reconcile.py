@@ -0,0 +1,84 @@
+"""
+Wallet reconciliation: every profile's balance should equal the sum of what
+its records say happened to it.
+
+The expected balance of a profile is its deposits minus its withdrawals,
+plus the net result of its blackjack hands (GameHistory), slot spins (Spin)
+and dice games (DiceGameModel), plus the ADJUSTMENT entries in the ledger,
+which are balance changes no game or transaction recorded.
+
+Profiles are checked in primary-key ranges. Each range is one query that
+sums every source per profile in correlated, grouped subqueries, so rows
+never reach Python and the balance and the sums come from one snapshot of
+the database. A blackjack hand still being played has taken its bet without
+writing its GameHistory row yet, and is reported as a shortfall of that bet.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from blackjack.models import GameHistory
+from core.jobs import in_range
+from dice.models import DiceGameModel
+from slots.models import Spin
+from user.models import LedgerEntry, Profile, Transaction
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+SOURCES = ('transactions', 'blackjack', 'slots', 'dice', 'adjustments')
+
+
+def _total(queryset, owner, amount):
+    """
+    A subquery summing `amount` over the rows of `queryset` whose `owner`
+    ('profile' or 'user') is the outer profile's, or 0 if there are none.
+    """
+    outer = 'pk' if owner == 'profile' else 'user_id'
+    total = (
+        queryset.filter(**{owner: OuterRef(outer)})
+        .order_by().values(owner).annotate(total=Sum(amount, output_field=MONEY)).values('total')
+    )
+    return Coalesce(Subquery(total, output_field=MONEY), Value(Decimal('0.00')), output_field=MONEY)
+
+
+def source_totals():
+    """Annotations with each profile's net amount per source, named net_<source> after SOURCES."""
+    signed_amount = Case(
+        When(transaction_type=Transaction.TransactionType.WITHDRAWAL, then=-F('amount')),
+        default=F('amount'),
+        output_field=MONEY,
+    )
+    return {
+        'net_transactions': _total(Transaction.objects.all(), 'profile', signed_amount),
+        'net_blackjack': _total(GameHistory.objects.all(), 'user', F('balance_change')),
+        'net_slots': _total(Spin.objects.all(), 'user', F('payout') - F('bet_amount')),
+        'net_dice': _total(DiceGameModel.objects.all(), 'user', F('payout') - F('bet')),
+        'net_adjustments': _total(
+            LedgerEntry.objects.filter(kind=LedgerEntry.Kind.ADJUSTMENT), 'profile', F('amount')
+        ),
+    }
+
+
+def reconcile_range(lower, upper):
+    """Reconcile the profiles in one primary-key range; runs inside a worker process."""
+    rows = (
+        in_range(Profile.objects.all(), lower, upper)
+        .annotate(**source_totals())
+        .values_list('pk', 'user_id', 'balance', *(f'net_{source}' for source in SOURCES))
+    )
+    checked = 0
+    discrepancies = []
+    for pk, user_id, balance, *totals in rows:
+        checked += 1
+        expected = sum(totals, Decimal('0.00'))
+        if balance != expected:
+            discrepancies.append({
+                'profile_id': pk,
+                'user_id': user_id,
+                'balance': str(balance),
+                'expected': str(expected),
+                'difference': str(balance - expected),
+                **{source: str(total) for source, total in zip(SOURCES, totals)},
+            })
+    return {'checked': checked, 'discrepancies': discrepancies}
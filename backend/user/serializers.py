@@ -5,7 +5,8 @@ Serializers for the user API View.
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from user.models import Profile, Transaction
+from user.activity import GAMES
+from user.models import GameStats, Profile, Transaction
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -54,3 +55,45 @@ class TransactionSerializer(serializers.ModelSerializer):
         model = Transaction
         fields = ['amount', 'transaction_type', 'date']
         read_only_fields = ['date']
+
+
+class TransactionFilterSerializer(serializers.Serializer):
+    """Optional filters for the transaction history."""
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    type = serializers.ChoiceField(choices=Transaction.TransactionType.choices, required=False)
+
+
+class BalanceSerializer(serializers.Serializer):
+    """Serializer for the authenticated user's balance."""
+    balance = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+
+
+class ActivityFilterSerializer(serializers.Serializer):
+    """Page and game filters for the activity feed."""
+    game = serializers.ListField(child=serializers.ChoiceField(choices=GAMES), required=False)
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class ActivitySerializer(serializers.Serializer):
+    """Serializer for one round in the activity feed."""
+    game = serializers.CharField()
+    id = serializers.CharField()
+    played_at = serializers.DateTimeField(allow_null=True)
+    bet = serializers.DecimalField(max_digits=10, decimal_places=2)
+    payout = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class ActivityPageSerializer(serializers.Serializer):
+    """Serializer for a page of the activity feed."""
+    results = ActivitySerializer(many=True)
+    next = serializers.CharField(allow_null=True)
+
+
+class GameStatsSerializer(serializers.ModelSerializer):
+    """Serializer for a user's counters in one game."""
+
+    class Meta:
+        model = GameStats
+        fields = ['game', 'rounds', 'wagered', 'won', 'biggest_win', 'last_played']
@@ -1,8 +1,12 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from user.authentication import identity_cache
+from user.balance_cache import balance_cache
 from user.models import Profile
+from user.token_blacklist import BlacklistedToken, blacklist_filter
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -10,3 +14,26 @@ def create_user_profile(sender, instance, created, **kwargs):
     """Create a user profile when a new user is created."""
     if created:
         Profile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_cached_balance(sender, instance, **kwargs):
+    """Drop the cached balance of a saved profile once the save commits."""
+    user_id = instance.user_id
+    transaction.on_commit(lambda: balance_cache.invalidate(user_id))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_identity(sender, instance, **kwargs):
+    """Drop a saved or deleted user's cached identity now and again once the change commits."""
+    user_id = instance.pk
+    identity_cache.invalidate(user_id)
+    transaction.on_commit(lambda: identity_cache.invalidate(user_id))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_blacklist_filter(sender, instance, created, **kwargs):
+    """Add a newly blacklisted token to this worker's blacklist filter."""
+    if created:
+        blacklist_filter.add(instance.token.jti)
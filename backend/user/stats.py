@@ -0,0 +1,103 @@
+"""
+Per-game gameplay counters of every profile.
+
+Each game adds its settled rounds to the profile's GameStats row with F()
+expressions, in the transaction that writes the rounds' history, so the
+counters move exactly when the history does and concurrent rounds never
+overwrite each other. Profile stats are then one read of at most one row
+per game instead of aggregates over the history tables.
+
+backfill_range() recomputes the rows of a range of profiles from their
+history, for rounds played before the counters existed. It locks the
+profiles first; settling a round locks its profile too, whether it pays
+out through the wallet or, like a lost blackjack hand, only reads the
+balance, so a round cannot commit between the aggregate being read and
+written.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core.jobs import in_range
+
+MONEY = DecimalField(max_digits=16, decimal_places=2)
+
+
+def history_sources():
+    """game -> (queryset, timestamp field, bet field, payout expression) of every game's round history."""
+    from blackjack.models import GameHistory
+    from dice.models import DiceGameModel
+    from slots.models import Spin
+
+    return {
+        'slots': (Spin.objects.all(), 'timestamp', 'bet_amount', F('payout')),
+        # A blackjack hand stores the change to the balance; the payout is the stake plus that change.
+        'blackjack': (GameHistory.objects.all(), 'created_at', 'bet_amount',
+                      ExpressionWrapper(F('bet_amount') + F('balance_change'), output_field=MONEY)),
+        'dice': (DiceGameModel.objects.all(), 'created_at', 'bet', F('payout')),
+    }
+
+
+def record_rounds(profile_id, game, wagered, won, biggest_win, rounds=1):
+    """
+    Add settled rounds to a profile's counters for `game`: `wagered` and
+    `won` are their totals and `biggest_win` the largest net win of one of
+    them. Call it inside the transaction that records the rounds.
+    """
+    from user.models import GameStats
+
+    now = timezone.now()
+    biggest_win = max(Decimal(biggest_win), Decimal('0.00'))
+    changes = {
+        'rounds': F('rounds') + rounds,
+        'wagered': F('wagered') + wagered,
+        'won': F('won') + won,
+        'biggest_win': Greatest('biggest_win', Value(biggest_win, output_field=MONEY)),
+        'last_played': now,
+    }
+    stats = GameStats.objects.filter(profile_id=profile_id, game=game)
+    if stats.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            GameStats.objects.create(profile_id=profile_id, game=game, rounds=rounds, wagered=wagered, won=won,
+                                     biggest_win=biggest_win, last_played=now)
+    except IntegrityError:
+        # Another first round of this profile in this game created the row first.
+        stats.update(**changes)
+
+
+def backfill_range(lower, upper):
+    """Rewrite the GameStats rows of the profiles in (lower, upper] from their history."""
+    from user.models import GameStats, Profile
+
+    with transaction.atomic():
+        profiles = dict(
+            in_range(Profile.objects.select_for_update(), lower, upper).values_list('user_id', 'pk')
+        )
+        rows = []
+        for game, (queryset, time_field, bet_field, payout) in history_sources().items():
+            totals = (
+                queryset.filter(user_id__in=profiles).order_by().values('user')
+                .annotate(
+                    rounds=Count('pk'),
+                    wagered=Sum(bet_field, output_field=MONEY),
+                    won=Sum(payout, output_field=MONEY),
+                    biggest_win=Max(ExpressionWrapper(payout - F(bet_field), output_field=MONEY)),
+                    last_played=Max(time_field),
+                )
+            )
+            rows.extend(
+                GameStats(profile_id=profiles[row['user']], game=game, rounds=row['rounds'],
+                          wagered=row['wagered'], won=row['won'],
+                          biggest_win=max(row['biggest_win'], Decimal('0.00')), last_played=row['last_played'])
+                for row in totals
+            )
+        GameStats.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['profile', 'game'],
+            update_fields=['rounds', 'wagered', 'won', 'biggest_win', 'last_played'],
+        )
+    return {'checked': len(profiles), 'written': len(rows)}
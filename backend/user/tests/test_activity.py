@@ -0,0 +1,118 @@
+"""
+Tests for the cross-game activity feed.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from blackjack.models import GameHistory
+from dice.models import DiceGameModel
+from slots.models import Spin
+
+ACTIVITY_URL = reverse('user:activity')
+
+
+def create_rounds(user, start):
+    """Helper function to create interleaved slots, blackjack and dice rounds, one minute apart."""
+    for i in range(9):
+        played_at = start - timedelta(minutes=i)
+        game = ('slots', 'blackjack', 'dice')[i % 3]
+        if game == 'slots':
+            row = Spin.objects.create(user=user, bet_amount=Decimal('1.00'), payout=Decimal('2.00'), result={})
+            Spin.objects.filter(pk=row.pk).update(timestamp=played_at)
+        elif game == 'blackjack':
+            row = GameHistory.objects.create(user=user, bet_amount=Decimal('5.00'), outcome=GameHistory.OUTCOME_WIN,
+                                             player_score=20, dealer_score=18, player_hand='[]', dealer_hand='[]',
+                                             balance_change=5, balance_before=100, balance_after=110)
+            GameHistory.objects.filter(pk=row.pk).update(created_at=played_at)
+        else:
+            row = DiceGameModel.objects.create(user=user, bet=Decimal('2.00'), choice1='1', choice2='2', roll1=1,
+                                               roll2=2, total=3, payout=Decimal('0.00'))
+            DiceGameModel.objects.filter(pk=row.pk).update(created_at=played_at)
+
+
+class ActivityFeedTests(TestCase):
+    """Test the activity feed endpoint."""
+
+    def setUp(self):
+        """Set up test dependencies."""
+        self.user = get_user_model().objects.create_user('activity@example.com', 'testpassword123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.start = timezone.now()
+        create_rounds(self.user, self.start)
+        other = get_user_model().objects.create_user('other@example.com', 'testpassword123')
+        create_rounds(other, self.start)
+
+    def test_pages_merge_games_newest_first(self):
+        """Test that paging through the feed returns every round once, newest first across games."""
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 4, **({'cursor': cursor} if cursor else {})}
+            res = self.client.get(ACTIVITY_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            seen.extend(res.data['results'])
+            cursor = res.data['next']
+            if cursor is None:
+                break
+
+        self.assertEqual([item['game'] for item in seen], ['slots', 'blackjack', 'dice'] * 3)
+        times = [item['played_at'] for item in seen]
+        self.assertEqual(times, sorted(times, reverse=True))
+        self.assertEqual(seen[1]['payout'], '10.00')
+
+    def test_game_filter(self):
+        """Test that only the requested games are listed."""
+        res = self.client.get(ACTIVITY_URL, {'game': ['dice', 'slots']})
+
+        self.assertEqual({item['game'] for item in res.data['results']}, {'dice', 'slots'})
+        self.assertEqual(len(res.data['results']), 6)
+        self.assertIsNone(res.data['next'])
+
+    def test_exhausted_games_are_not_queried_again(self):
+        """Test that a page after a game ran out only queries the games with rounds left."""
+        DiceGameModel.objects.filter(user=self.user).update(created_at=self.start + timedelta(hours=1))
+        res = self.client.get(ACTIVITY_URL, {'limit': 3})
+        self.assertEqual([item['game'] for item in res.data['results']], ['dice'] * 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(ACTIVITY_URL, {'limit': 3, 'cursor': res.data['next']})
+        self.assertFalse([query for query in queries if DiceGameModel._meta.db_table in query['sql']])
+
+    def test_untimed_dice_rounds_come_last(self):
+        """Test that dice rounds without a recorded time are listed after every timed round, newest first."""
+        legacy = [
+            DiceGameModel.objects.create(user=self.user, bet=Decimal('1.00'), choice1='1', choice2='2', roll1=1,
+                                         roll2=2, total=3, payout=Decimal('0.00')).pk
+            for _ in range(3)
+        ]
+        DiceGameModel.objects.filter(pk__in=legacy).update(created_at=None)
+
+        seen = []
+        cursor = None
+        while True:
+            res = self.client.get(ACTIVITY_URL, {'limit': 2, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            seen.extend(res.data['results'])
+            cursor = res.data['next']
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 12)
+        self.assertTrue(all(item['played_at'] is not None for item in seen[:9]))
+        self.assertEqual([(item['played_at'], int(item['id'])) for item in seen[9:]],
+                         [(None, pk) for pk in reversed(legacy)])
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        res = self.client.get(ACTIVITY_URL, {'cursor': 'not-a-cursor'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
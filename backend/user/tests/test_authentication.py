@@ -0,0 +1,72 @@
+"""
+Tests for JWT authentication from the cached user identity.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import identity_cache
+from user.balance_cache import balance_cache
+
+DICE_URL = '/api/dice/start/'
+DICE_DATA = {'choice1': 6, 'choice2': 6, 'bet': '1.00', 'guessed_number': 7}
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Test authenticating game requests without loading the user row."""
+
+    def setUp(self):
+        """Set up test dependencies."""
+        cache.clear()
+        balance_cache.clear_local()
+        identity_cache.clear()
+        self.user = get_user_model().objects.create_user('auth@example.com', 'testpassword123')
+        self.user.profile.add_balance(Decimal('50.00'))
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def test_cached_request_skips_users_table(self):
+        """Test that a repeated game request reads neither the user nor the profile table."""
+        self.client.post(DICE_URL, DICE_DATA, format='json')
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(DICE_URL, DICE_DATA, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user_table = get_user_model()._meta.db_table
+        reads = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertFalse([sql for sql in reads if f'FROM "{user_table}"' in sql])
+        self.assertFalse([sql for sql in reads if 'FROM "user_profile"' in sql])
+
+    def test_deactivated_user_is_rejected(self):
+        """Test that deactivating a user drops its cached identity."""
+        self.client.post(DICE_URL, DICE_DATA, format='json')
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.post(DICE_URL, DICE_DATA, format='json')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        """Test that a token for a user that no longer exists is rejected."""
+        self.user.delete()
+        res = self.client.post(DICE_URL, DICE_DATA, format='json')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_request_user_loads_other_fields_on_access(self):
+        """Test that the built user has its profile attached and loads deferred fields when read."""
+        res = self.client.get('/api/user/balance/')
+        self.assertEqual(res.data, {'balance': '50.00'})
+
+        user = res.wsgi_request.user
+        self.assertEqual(user.email, 'auth@example.com')
+        self.assertEqual(user.profile.balance, Decimal('50.00'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(user.profile.username, self.user.profile.username)
+        self.assertEqual(len(queries), 1)
@@ -0,0 +1,112 @@
+"""
+Tests for the wallet balance cache and the balance endpoint.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.balance_cache import BalanceCache, balance_cache, balance_cache_settings
+from user.models import Profile
+
+BALANCE_URL = reverse('user:balance')
+
+
+def create_profile(email='cache@example.com', balance='0.00'):
+    """Helper function to create a user and return its profile with a balance."""
+    user = get_user_model().objects.create_user(email, 'testpassword123')
+    Profile.objects.filter(user=user).update(balance=Decimal(balance))
+    return Profile.objects.get(user=user)
+
+
+class BalanceCacheTests(TestCase):
+    """Test reads, write-through and invalidation of cached balances."""
+
+    def setUp(self):
+        cache.clear()
+        balance_cache.clear_local()
+        self.profile = create_profile(balance='25.00')
+
+    def test_miss_reads_database_once(self):
+        """Test that a miss reads the database and later reads are served from the cache."""
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(balance_cache.get(self.profile.user_id), Decimal('25.00'))
+            self.assertEqual(balance_cache.get(self.profile.user_id), Decimal('25.00'))
+        self.assertEqual(len(queries), 1)
+
+    def test_shared_level_serves_other_workers(self):
+        """Test that a worker with a cold L1 is served from the shared cache."""
+        balance_cache.get(self.profile.user_id)
+        other_worker = BalanceCache()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(other_worker.get(self.profile.user_id), Decimal('25.00'))
+        self.assertEqual(len(queries), 0)
+
+    def test_wallet_change_writes_through_on_commit(self):
+        """Test that a wallet change updates the cached balance once it commits."""
+        balance_cache.get(self.profile.user_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.add_balance(Decimal('5.00'))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(balance_cache.get(self.profile.user_id), Decimal('30.00'))
+        self.assertEqual(len(queries), 0)
+
+    def test_rolled_back_change_is_not_cached(self):
+        """Test that a change whose transaction has not committed leaves the cache alone."""
+        balance_cache.get(self.profile.user_id)
+        with self.captureOnCommitCallbacks(execute=False):
+            self.profile.add_balance(Decimal('5.00'))
+        self.assertEqual(balance_cache.get(self.profile.user_id), Decimal('25.00'))
+
+    def test_profile_save_invalidates(self):
+        """Test that saving a profile drops its cached balance."""
+        balance_cache.get(self.profile.user_id)
+        self.profile.balance = Decimal('7.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save()
+        self.assertEqual(balance_cache.get(self.profile.user_id), Decimal('7.00'))
+
+    def test_l1_evicts_oldest_entry(self):
+        """Test that a full L1 drops its oldest entry."""
+        small = BalanceCache({'L1_TTL': 60, 'L1_MAX_ENTRIES': 2, 'L2_TTL': 60})
+        small.set(1, '1.00')
+        small.set(2, '2.00')
+        small.set(3, '3.00')
+        self.assertEqual(list(small._local), [2, 3])
+
+
+    def test_process_local_cache_keeps_l2_entries_for_l1_ttl(self):
+        """Test that L2 entries outlive L1 ones only when the Django cache is shared between workers."""
+        self.assertEqual(balance_cache_settings()['L2_TTL'], balance_cache_settings()['L1_TTL'])
+        with self.settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            self.assertEqual(balance_cache_settings()['L2_TTL'], 300)
+
+
+class BalanceEndpointTests(TestCase):
+    """Test the balance endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        balance_cache.clear_local()
+        self.client = APIClient()
+
+    def test_balance_requires_authentication(self):
+        """Test that the balance endpoint rejects anonymous requests."""
+        res = self.client.get(BALANCE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_balance_returns_current_balance(self):
+        """Test that the balance endpoint returns the user's balance."""
+        profile = create_profile(balance='12.50')
+        self.client.force_authenticate(profile.user)
+        res = self.client.get(BALANCE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'balance': '12.50'})
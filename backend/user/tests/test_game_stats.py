@@ -0,0 +1,96 @@
+"""
+Tests for per-game gameplay counters.
+"""
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dice.models import DiceGameModel
+from dice.services import DiceGameService
+from user.models import GameStats
+from user.stats import record_rounds
+from user.tests.test_activity import create_rounds
+
+STATS_URL = reverse('user:stats')
+
+
+class GameStatsTests(TestCase):
+    """Test keeping and backfilling per-game counters."""
+
+    def setUp(self):
+        """Set up test dependencies."""
+        self.user = get_user_model().objects.create_user('stats@example.com', 'testpassword123')
+        self.user.profile.balance = Decimal('100.00')
+        self.user.profile.save()
+
+    def test_settled_rounds_update_counters(self):
+        """Test that settling a batch of dice rounds adds them to the user's dice counters."""
+        rounds = [{'choice1': 6, 'choice2': 6, 'bet': Decimal('1.00'), 'guessed_number': 7}] * 20
+        batch = DiceGameService.execute_batch(self.user, rounds)
+
+        stats = GameStats.objects.get(profile=self.user.profile, game='dice')
+        self.assertEqual((stats.rounds, stats.wagered, stats.won), (20, Decimal('20.00'), batch['total_payout']))
+        biggest = max(result['payout'] for result in batch['rounds']) - Decimal('1.00')
+        self.assertEqual(stats.biggest_win, max(biggest, Decimal('0.00')))
+
+    def test_counters_accumulate(self):
+        """Test that later rounds add to the counters and keep the biggest win."""
+        profile_id = self.user.profile.pk
+        record_rounds(profile_id, 'slots', Decimal('5.00'), Decimal('50.00'), Decimal('45.00'))
+        record_rounds(profile_id, 'slots', Decimal('5.00'), Decimal('0.00'), Decimal('-5.00'))
+
+        stats = GameStats.objects.get(profile_id=profile_id, game='slots')
+        self.assertEqual((stats.rounds, stats.wagered, stats.won, stats.biggest_win),
+                         (2, Decimal('10.00'), Decimal('50.00'), Decimal('45.00')))
+
+    def test_backfill_recomputes_counters_from_history(self):
+        """Test that the backfill command rewrites counters from the history tables."""
+        start = timezone.now()
+        create_rounds(self.user, start)
+        record_rounds(self.user.profile.pk, 'dice', Decimal('999.00'), Decimal('0.00'), Decimal('0.00'))
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        call_command('backfill_game_stats', '--workers', '1', '--checkpoint', os.path.join(directory, 'checkpoint.json'),
+                     stdout=StringIO())
+
+        stats = {row.game: row for row in GameStats.objects.filter(profile=self.user.profile)}
+        self.assertEqual((stats['dice'].rounds, stats['dice'].wagered), (3, Decimal('6.00')))
+        self.assertEqual((stats['blackjack'].won, stats['blackjack'].biggest_win), (Decimal('30.00'), Decimal('5.00')))
+        self.assertEqual(stats['slots'].last_played, start)
+        self.assertEqual(DiceGameModel.objects.filter(user=self.user).count(), 3)
+
+    def test_backfill_of_untimed_rounds(self):
+        """Test that dice rounds without a recorded time are counted with no last played time."""
+        DiceGameModel.objects.create(user=self.user, bet=Decimal('2.00'), choice1='1', choice2='2', roll1=1,
+                                     roll2=2, total=3, payout=Decimal('0.00'))
+        DiceGameModel.objects.update(created_at=None)
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        call_command('backfill_game_stats', '--workers', '1', '--checkpoint', os.path.join(directory, 'checkpoint.json'),
+                     stdout=StringIO())
+
+        stats = GameStats.objects.get(profile=self.user.profile, game='dice')
+        self.assertEqual((stats.rounds, stats.last_played), (1, None))
+
+    def test_stats_endpoint(self):
+        """Test that the endpoint lists the authenticated user's counters."""
+        record_rounds(self.user.profile.pk, 'blackjack', Decimal('10.00'), Decimal('20.00'), Decimal('10.00'))
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([(row['game'], row['rounds']) for row in res.data], [('blackjack', 1)])
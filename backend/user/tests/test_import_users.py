@@ -0,0 +1,89 @@
+"""
+Tests for bulk user import.
+"""
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from user.models import LedgerEntry, Profile, User
+from user.onboarding import import_users, read_records
+from user.reconcile import reconcile_range
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ImportUsersTests(TestCase):
+    """Test importing users from records."""
+
+    def test_users_get_profiles_and_passwords(self):
+        """Test that imported users have one profile each and can log in with their password."""
+        records = [{'email': f'Player{i}@Example.com', 'password': f'secret{i}'} for i in range(7)]
+        stats = import_users(records, batch_size=3)
+
+        self.assertEqual(stats.created, 7)
+        self.assertEqual(Profile.objects.filter(user__email__startswith='Player').count(), 7)
+        user = User.objects.get(email='Player3@example.com')
+        self.assertTrue(user.check_password('secret3'))
+        self.assertTrue(user.profile.username.startswith('user_'))
+
+    def test_existing_and_repeated_emails_are_skipped(self):
+        """Test that emails already registered or repeated in the input are not imported again."""
+        User.objects.create_user('taken@example.com', 'testpassword123')
+        records = [{'email': 'taken@example.com'}, {'email': 'new@example.com'}, {'email': 'new@example.com'},
+                   {'email': 'not-an-email'}]
+        stats = import_users(records, batch_size=2)
+
+        self.assertEqual((stats.created, stats.skipped, stats.invalid), (1, 2, 1))
+        self.assertFalse(User.objects.get(email='new@example.com').has_usable_password())
+
+    def test_opening_balance_is_recorded_in_ledger(self):
+        """Test that an opening balance is written with a ledger adjustment, so the wallet reconciles."""
+        import_users([{'email': 'rich@example.com', 'username': 'rich', 'balance': '250.50'}])
+
+        profile = Profile.objects.get(user__email='rich@example.com')
+        self.assertEqual((profile.username, profile.balance), ('rich', Decimal('250.50')))
+        entry = LedgerEntry.objects.get(profile=profile)
+        self.assertEqual((entry.amount, entry.kind), (Decimal('250.50'), LedgerEntry.Kind.ADJUSTMENT))
+        self.assertEqual(reconcile_range(profile.pk - 1, profile.pk)['discrepancies'], [])
+
+    def test_command_reads_csv_and_ndjson(self):
+        """Test that the command imports CSV and NDJSON files."""
+        directory = tempfile.mkdtemp()
+        csv_path = os.path.join(directory, 'users.csv')
+        with open(csv_path, 'w') as f:
+            f.write('email,password,balance\ncsv@example.com,pw,10\n')
+        ndjson_path = os.path.join(directory, 'users.ndjson')
+        with open(ndjson_path, 'w') as f:
+            f.write(json.dumps({'email': 'ndjson@example.com', 'password': 'pw'}) + '\n\n')
+
+        for path in (csv_path, ndjson_path):
+            call_command('import_users', path, '--workers', '1', stdout=StringIO())
+            os.remove(path)
+        os.rmdir(directory)
+
+        self.assertEqual(Profile.objects.get(user__email='csv@example.com').balance, Decimal('10.00'))
+        self.assertTrue(User.objects.get(email='ndjson@example.com').check_password('pw'))
+
+    def test_read_records_parses_ndjson(self):
+        """Test that blank NDJSON lines are ignored."""
+        records = list(read_records(StringIO('{"email": "a@example.com"}\n\n{"email": "b@example.com"}\n'),
+                                    'ndjson'))
+        self.assertEqual([record['email'] for record in records], ['a@example.com', 'b@example.com'])
+
+
+class ImportUsersPoolTests(TestCase):
+    """Test hashing passwords in worker processes."""
+
+    def test_passwords_hashed_in_pool(self):
+        """Test that passwords hashed in spawned workers verify in this process."""
+        stats = import_users([{'email': f'pool{i}@example.com', 'password': 'pooled'} for i in range(3)],
+                             batch_size=2, workers=2)
+
+        self.assertEqual(stats.created, 3)
+        self.assertTrue(User.objects.get(email='pool2@example.com').check_password('pooled'))
@@ -0,0 +1,116 @@
+"""
+Tests for the wallet ledger and balance snapshots.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from dice.services import DiceGameService
+from user.ledger import balance_at, ledger_reference, take_snapshots
+from user.models import BalanceSnapshot, LedgerEntry, Profile, Transaction
+
+
+def create_profile(email='ledger@example.com'):
+    """Helper function to create a user and return its profile."""
+    return get_user_model().objects.create_user(email, 'testpassword123').profile
+
+
+class LedgerTests(TestCase):
+    """Test that balance changes are recorded in the ledger."""
+
+    def setUp(self):
+        """Set up test dependencies."""
+        self.profile = create_profile()
+        self.profile.process_transaction(Decimal('100.00'), Transaction.TransactionType.DEPOSIT)
+
+    def test_entry_written_in_same_statement(self):
+        """Test that a balance change and its ledger entry are a single query."""
+        with CaptureQueriesContext(connection) as queries:
+            with ledger_reference('slots', 'round-1'):
+                self.profile.deduct_balance(Decimal('5.00'))
+
+        self.assertEqual(len(queries), 1)
+        entry = self.profile.ledger_entries.latest('id')
+        self.assertEqual(
+            (entry.amount, entry.kind, entry.game, entry.round_id),
+            (Decimal('-5.00'), LedgerEntry.Kind.BET, 'slots', 'round-1'),
+        )
+
+    def test_refused_change_writes_no_entry(self):
+        """Test that a deduction the balance cannot cover leaves no ledger entry."""
+        with self.assertRaises(ValueError):
+            self.profile.deduct_balance(Decimal('500.00'))
+        self.assertEqual(self.profile.ledger_entries.count(), 1)
+
+    def test_deposit_is_recorded_with_its_kind(self):
+        """Test that deposits through process_transaction are DEPOSIT entries."""
+        entry = self.profile.ledger_entries.get()
+        self.assertEqual((entry.kind, entry.amount), (LedgerEntry.Kind.DEPOSIT, Decimal('100.00')))
+
+    def test_batch_entries_share_one_statement(self):
+        """Test that a dice batch writes every round's entries with one balance update."""
+        rounds = [{'choice1': 6, 'choice2': 6, 'bet': Decimal('1.00'), 'guessed_number': 7}] * 20
+        with CaptureQueriesContext(connection) as queries:
+            batch = DiceGameService.execute_batch(self.profile.user, rounds)
+
+        self.assertEqual(len([q for q in queries.captured_queries if 'user_ledgerentry' in q['sql']]), 1)
+        dice_entries = self.profile.ledger_entries.filter(game='dice')
+        self.assertEqual(dice_entries.filter(kind=LedgerEntry.Kind.BET).count(), 20)
+        self.assertEqual(sum(entry.amount for entry in dice_entries), batch['total_payout'] - Decimal('20.00'))
+
+    def test_entries_are_append_only(self):
+        """Test that a saved ledger entry cannot be changed."""
+        entry = self.profile.ledger_entries.get()
+        entry.amount = Decimal('1000.00')
+        with self.assertRaises(ValueError):
+            entry.save()
+
+
+class BalanceSnapshotTests(TestCase):
+    """Test historical balances from snapshots and ledger entries."""
+
+    def setUp(self):
+        """Set up a profile with entries at known times."""
+        self.profile = create_profile()
+        self.start = timezone.now() - timedelta(hours=10)
+        for hours, amount in [(0, '100.00'), (1, '-30.00'), (5, '12.50'), (8, '-2.50')]:
+            LedgerEntry.objects.create(profile=self.profile, amount=Decimal(amount),
+                                       kind=LedgerEntry.Kind.ADJUSTMENT,
+                                       created_at=self.start + timedelta(hours=hours))
+
+    def test_balance_at_without_snapshots(self):
+        """Test that the balance at a time sums the entries up to it."""
+        self.assertEqual(balance_at(self.profile.pk, self.start + timedelta(hours=6)), Decimal('82.50'))
+        self.assertEqual(balance_at(self.profile.pk, self.start - timedelta(hours=1)), Decimal('0.00'))
+
+    def test_snapshots_shorten_the_scan(self):
+        """Test that snapshots hold the summed balance and later reads start from them."""
+        self.assertEqual(take_snapshots(as_of=self.start + timedelta(hours=2)), 1)
+        self.assertEqual(take_snapshots(as_of=self.start + timedelta(hours=6)), 1)
+        self.assertEqual(take_snapshots(as_of=self.start + timedelta(hours=7)), 0)
+
+        snapshot = BalanceSnapshot.objects.filter(profile=self.profile).latest('as_of')
+        self.assertEqual(snapshot.balance, Decimal('82.50'))
+
+        with CaptureQueriesContext(connection) as queries:
+            balance = balance_at(self.profile.pk, self.start + timedelta(hours=9))
+        self.assertEqual(balance, Decimal('80.00'))
+        self.assertEqual(len(queries), 2)
+        self.assertIn('created_at', queries[1]['sql'])
+
+    def test_snapshots_match_stored_balance(self):
+        """Test that a snapshot after wallet changes equals the profile balance."""
+        other = create_profile('other@example.com')
+        other.add_balance(Decimal('40.00'))
+        other.deduct_balance(Decimal('15.00'))
+
+        take_snapshots(as_of=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(
+            BalanceSnapshot.objects.get(profile=other).balance,
+            Profile.objects.get(pk=other.pk).balance,
+        )
@@ -0,0 +1,111 @@
+"""
+Tests for wallet reconciliation.
+"""
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from blackjack.models import GameHistory
+from dice.models import DiceGameModel
+from slots.models import Spin
+from user.ledger import ledger_reference
+from user.models import Profile, Transaction
+from user.reconcile import reconcile_range
+
+
+def create_profile(email):
+    """Helper function to create a user with a deposit, a spin, a dice game and a blackjack hand."""
+    user = get_user_model().objects.create_user(email, 'testpassword123')
+    user.profile.process_transaction(Decimal('100.00'), Transaction.TransactionType.DEPOSIT)
+    user.profile.process_transaction(Decimal('20.00'), Transaction.TransactionType.WITHDRAWAL)
+
+    Spin.objects.create(user=user, bet_amount=Decimal('2.00'), payout=Decimal('5.50'), result={})
+    DiceGameModel.objects.create(user=user, bet=Decimal('10.00'), guessed_number=7, choice1='6', choice2='6',
+                                 roll1=1, roll2=2, total=3, payout=Decimal('0.00'))
+    GameHistory.objects.create(user=user, bet_amount=Decimal('4.00'), outcome=GameHistory.OUTCOME_WIN,
+                               player_score=20, dealer_score=18, player_hand='', dealer_hand='',
+                               balance_change=4, balance_before=0, balance_after=0)
+    # The games above only wrote their history; settle their net results the way they would.
+    for game, net in (('slots', Decimal('3.50')), ('dice', Decimal('-10.00')), ('blackjack', Decimal('4.00'))):
+        with ledger_reference(game):
+            user.profile.add_balance(net)
+    return Profile.objects.get(user=user)
+
+
+class ReconcileTests(TestCase):
+    """Test that balances are checked against the records behind them."""
+
+    def setUp(self):
+        """Set up test dependencies."""
+        self.profiles = [create_profile(f'reconcile{i}@example.com') for i in range(3)]
+        self.lower = self.profiles[0].pk - 1
+        self.upper = self.profiles[-1].pk
+
+    def test_balances_that_add_up_pass(self):
+        """Test that balances matching their records report no discrepancies."""
+        result = reconcile_range(self.lower, self.upper)
+        self.assertEqual(result, {'checked': 3, 'discrepancies': []})
+
+    def test_range_is_one_query(self):
+        """Test that a range is reconciled in a single aggregate query."""
+        with CaptureQueriesContext(connection) as queries:
+            reconcile_range(self.lower, self.upper)
+        self.assertEqual(len(queries), 1)
+
+    def test_unrecorded_change_is_reported(self):
+        """Test that a balance change no record explains is reported with the difference."""
+        tampered = self.profiles[1]
+        Profile.objects.filter(pk=tampered.pk).update(balance=tampered.balance + Decimal('12.00'))
+
+        discrepancies = reconcile_range(self.lower, self.upper)['discrepancies']
+        self.assertEqual(len(discrepancies), 1)
+        self.assertEqual(discrepancies[0]['profile_id'], tampered.pk)
+        self.assertEqual(discrepancies[0]['difference'], '12.00')
+        self.assertEqual(discrepancies[0]['slots'], '3.50')
+
+
+class ReconcileCommandTests(TestCase):
+    """Test the reconcile_wallets command."""
+
+    def setUp(self):
+        """Set up test dependencies."""
+        self.profiles = [create_profile(f'command{i}@example.com') for i in range(3)]
+        Profile.objects.filter(pk=self.profiles[2].pk).update(balance=Decimal('0.00'))
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.checkpoint = os.path.join(directory, 'checkpoint.json')
+        self.report = os.path.join(directory, 'report.jsonl')
+
+    def run_command(self, *args):
+        call_command('reconcile_wallets', '--workers', '1', '--chunk-size', '2', '--checkpoint', self.checkpoint,
+                     '--report', self.report, *args, stdout=open(os.devnull, 'w'))
+        with open(self.checkpoint) as f:
+            return json.load(f)
+
+    def test_command_writes_report_and_checkpoint(self):
+        """Test that the command reports discrepancies and records that it finished."""
+        state = self.run_command()
+
+        self.assertTrue(state['finished'])
+        self.assertEqual(state['after'], self.profiles[2].pk)
+        with open(self.report) as f:
+            reported = [json.loads(line) for line in f]
+        self.assertEqual([row['profile_id'] for row in reported], [self.profiles[2].pk])
+
+    def test_command_resumes_from_checkpoint(self):
+        """Test that an interrupted run only reconciles the profiles after its checkpoint."""
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'after': self.profiles[1].pk, 'checked': 2, 'discrepancies': 0}, f)
+        open(self.report, 'w').close()
+
+        state = self.run_command()
+        self.assertEqual(state['checked'], 3)
+        self.assertEqual(state['discrepancies'], 1)
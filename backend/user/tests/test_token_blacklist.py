@@ -0,0 +1,109 @@
+"""
+Tests for the Bloom-filtered token blacklist and token pruning.
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.bloom import BloomFilter
+from user.token_blacklist import blacklist_filter, prune_expired_tokens
+
+REFRESH_URL = reverse('user:token_refresh')
+LOGOUT_URL = reverse('user:logout')
+
+
+class BloomFilterTests(SimpleTestCase):
+    """Test the Bloom filter itself."""
+
+    def test_added_items_are_always_found(self):
+        """Test that the filter never misses an item that was added."""
+        bloom = BloomFilter(1000, 0.01)
+        items = [f'jti-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+
+    def test_false_positive_rate_is_near_target(self):
+        """Test that absent items are misreported at about the configured rate."""
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class BlacklistFilterTests(TestCase):
+    """Test refresh-token blacklist checks."""
+
+    def setUp(self):
+        """Set up test dependencies."""
+        self.user = get_user_model().objects.create_user('tokens@example.com', 'testpassword123')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        blacklist_filter.rebuild()
+
+    def test_valid_refresh_skips_blacklist_table(self):
+        """Test that refreshing a token that is not blacklisted does not query the blacklist."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(REFRESH_URL, {'refresh': str(self.refresh)})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        blacklist_table = BlacklistedToken._meta.db_table
+        self.assertFalse([query for query in queries if blacklist_table in query['sql']])
+
+    def test_logged_out_token_cannot_refresh(self):
+        """Test that a token blacklisted by logging out is refused."""
+        self.client.force_authenticate(self.user)
+        self.client.post(LOGOUT_URL, {'refresh_token': str(self.refresh)})
+
+        res = self.client.post(REFRESH_URL, {'refresh': str(self.refresh)})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_blacklisted_elsewhere_is_seen_after_sync(self):
+        """Test that rows written without this worker's signal are picked up by a sync."""
+        outstanding = OutstandingToken.objects.get(jti=self.refresh['jti'])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=outstanding)])
+        blacklist_filter.sync()
+
+        res = self.client.post(REFRESH_URL, {'refresh': str(self.refresh)})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PruneTokensTests(TestCase):
+    """Test pruning of expired tokens."""
+
+    def setUp(self):
+        """Set up test dependencies."""
+        self.user = get_user_model().objects.create_user('prune@example.com', 'testpassword123')
+        now = timezone.now()
+        self.tokens = [
+            OutstandingToken.objects.create(user=self.user, jti=f'jti-{i}', token='',
+                                            expires_at=now + timedelta(days=1 if i % 2 else -1))
+            for i in range(10)
+        ]
+        for token in self.tokens[:4]:
+            BlacklistedToken.objects.create(token=token)
+
+    def test_expired_tokens_are_deleted_in_chunks(self):
+        """Test that only expired tokens and their blacklist entries are deleted."""
+        self.assertEqual(prune_expired_tokens(chunk_size=3), 5)
+
+        remaining = set(OutstandingToken.objects.values_list('jti', flat=True))
+        self.assertEqual(remaining, {f'jti-{i}' for i in range(1, 10, 2)})
+        self.assertEqual(set(BlacklistedToken.objects.values_list('token__jti', flat=True)), {'jti-1', 'jti-3'})
+
+    def test_command_reports_deleted_tokens(self):
+        """Test that the command runs the pruning."""
+        call_command('prune_tokens', '--chunk-size', '4', stdout=StringIO())
+        self.assertEqual(OutstandingToken.objects.count(), 5)
@@ -0,0 +1,76 @@
+"""
+Tests for the paginated transaction history API.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.models import Transaction
+
+TRANSACTION_URL = reverse('user:transaction')
+
+
+class TransactionHistoryAPITests(TestCase):
+    """Test cursor pagination and filters of the transaction history."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='history@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        now = timezone.now()
+        for i in range(25):
+            transaction = Transaction.objects.create(
+                profile=self.user.profile,
+                amount=Decimal(i + 1),
+                transaction_type=Transaction.TransactionType.DEPOSIT if i % 2 else Transaction.TransactionType.WITHDRAWAL,
+            )
+            # Pairs of rows share a timestamp so the id breaks ties between pages.
+            Transaction.objects.filter(pk=transaction.pk).update(date=now - timedelta(minutes=i // 2))
+
+    def _pages(self, params):
+        amounts = []
+        cursor = None
+        while True:
+            res = self.client.get(TRANSACTION_URL, {**params, **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            amounts.extend(Decimal(row['amount']) for row in res.data['results'])
+            cursor = res.data['next']
+            if not cursor:
+                return amounts
+
+    def test_pages_walk_history_newest_first(self):
+        """Test that following cursors returns every transaction once, newest first."""
+        amounts = self._pages({'limit': 4})
+        expected = [Decimal(t.amount) for t in Transaction.objects.order_by('-date', '-id')]
+        self.assertEqual(amounts, expected)
+        self.assertEqual(len(set(amounts)), 25)
+
+    def test_page_is_one_query(self):
+        """Test that a page is a single transaction query however deep the cursor is."""
+        first = self.client.get(TRANSACTION_URL, {'limit': 10})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(TRANSACTION_URL, {'limit': 10, 'cursor': first.data['next']})
+        self.assertEqual(len([q for q in queries.captured_queries if 'user_transaction' in q['sql']]), 1)
+
+    def test_type_and_date_filters(self):
+        """Test that type and date-range filters narrow the history."""
+        deposits = self._pages({'type': 'DEPOSIT'})
+        self.assertEqual(len(deposits), 12)
+
+        since = (timezone.now() - timedelta(minutes=2, seconds=30)).isoformat()
+        recent = self._pages({'since': since})
+        self.assertEqual(len(recent), 6)
+
+    def test_invalid_cursor_rejected(self):
+        """Test that a malformed cursor is a bad request."""
+        res = self.client.get(TRANSACTION_URL, {'cursor': 'not-a-cursor'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
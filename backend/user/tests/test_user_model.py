@@ -75,7 +75,7 @@ class TransactionModelTests(TestCase):
     def test_deposit_transaction(self):
         """Test creating a deposit transaction."""
         initial_balance = self.profile.balance
-        deposit_amount = 100.00
+        deposit_amount = Decimal('100.00')
 
         new_balance = self.profile.process_transaction(
             amount=deposit_amount,
@@ -95,14 +95,14 @@ class TransactionModelTests(TestCase):
 
     def test_withdrawal_transaction(self):
         """Test creating a withdrawal transaction."""
-        deposit_amount = 200.00
+        deposit_amount = Decimal('200.00')
         self.profile.process_transaction(
             amount=deposit_amount,
             transaction_type=Transaction.TransactionType.DEPOSIT
         )
 
         initial_balance = self.profile.balance
-        withdrawal_amount = 50.00
+        withdrawal_amount = Decimal('50.00')
 
         new_balance = self.profile.process_transaction(
             amount=withdrawal_amount,
@@ -0,0 +1,114 @@
+"""
+Tests for atomic wallet balance updates.
+"""
+import threading
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from user.models import Profile
+from user.wallet import InsufficientFunds, apply_delta
+
+
+def create_profile(email='wallet@example.com', balance='0.00'):
+    """Helper function to create a user and return its profile with a balance."""
+    user = get_user_model().objects.create_user(email, 'testpassword123')
+    Profile.objects.filter(user=user).update(balance=Decimal(balance))
+    return Profile.objects.get(user=user)
+
+
+class WalletTests(TestCase):
+    """Test single wallet operations."""
+
+    def test_balance_change_is_one_update(self):
+        """Test that adding to a balance is a single UPDATE returning the new balance."""
+        profile = create_profile(balance='10.00')
+        with CaptureQueriesContext(connection) as queries:
+            profile.add_balance(Decimal('2.50'))
+
+        self.assertEqual(len(queries), 1)
+        self.assertIn('RETURNING', queries[0]['sql'])
+        self.assertEqual(profile.balance, Decimal('12.50'))
+
+    def test_deduction_below_zero_is_refused(self):
+        """Test that a deduction larger than the stored balance raises and writes nothing."""
+        profile = create_profile(balance='5.00')
+        with self.assertRaises(InsufficientFunds):
+            profile.deduct_balance(Decimal('5.01'))
+
+        self.assertEqual(Profile.objects.get(pk=profile.pk).balance, Decimal('5.00'))
+
+    def test_required_balance_is_checked_before_net_change(self):
+        """Test that a net win still needs the balance to cover the stake."""
+        profile = create_profile(balance='5.00')
+        with self.assertRaises(InsufficientFunds):
+            apply_delta(profile.pk, Decimal('3.00'), required=Decimal('6.00'))
+        self.assertEqual(apply_delta(profile.pk, Decimal('3.00'), required=Decimal('5.00')), Decimal('8.00'))
+
+    def test_stale_copy_does_not_overwrite(self):
+        """Test that two in-memory copies of a profile both keep their changes."""
+        first = create_profile(balance='100.00')
+        second = Profile.objects.get(pk=first.pk)
+
+        first.deduct_balance(Decimal('30.00'))
+        second.add_balance(Decimal('10.00'))
+
+        self.assertEqual(second.balance, Decimal('80.00'))
+        self.assertEqual(Profile.objects.get(pk=first.pk).balance, Decimal('80.00'))
+
+
+class WalletConcurrencyTests(TransactionTestCase):
+    """Test wallet operations from concurrent connections."""
+
+    def _run_threads(self, count, target):
+        barrier = threading.Barrier(count)
+        errors = []
+
+        def worker(index):
+            try:
+                barrier.wait()
+                target(index)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_no_lost_updates(self):
+        """Test that concurrent wins and stakes on one wallet all reach the stored balance."""
+        profile_id = create_profile(balance='1000.00').pk
+
+        def play(index):
+            profile = Profile.objects.get(pk=profile_id)
+            for _ in range(50):
+                profile.deduct_balance(Decimal('1.00'))
+                profile.add_balance(Decimal('1.50'))
+
+        self.assertEqual(self._run_threads(8, play), [])
+        self.assertEqual(Profile.objects.get(pk=profile_id).balance, Decimal('1200.00'))
+
+    def test_concurrent_deductions_never_overdraw(self):
+        """Test that racing deductions stop exactly when the balance runs out."""
+        profile_id = create_profile(balance='100.00').pk
+        refused = []
+
+        def spend(index):
+            profile = Profile.objects.get(pk=profile_id)
+            for _ in range(25):
+                try:
+                    profile.deduct_balance(Decimal('1.00'))
+                except InsufficientFunds:
+                    refused.append(index)
+
+        self.assertEqual(self._run_threads(8, spend), [])
+        self.assertEqual(Profile.objects.get(pk=profile_id).balance, Decimal('0.00'))
+        self.assertEqual(len(refused), 8 * 25 - 100)
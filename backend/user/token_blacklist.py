@@ -0,0 +1,165 @@
+"""
+Refresh-token blacklist checks behind a Bloom filter, and blacklist pruning.
+
+simplejwt checks every refresh token against BlacklistedToken with a join
+on OutstandingToken. Here each worker keeps a Bloom filter of the jtis of
+unexpired blacklisted tokens, and the database is only asked about the rare
+token the filter reports as possibly blacklisted. Refreshing a valid token
+then costs no blacklist query, however large the tables grow.
+
+The filter picks up tokens blacklisted elsewhere from the rows added since
+its last sync, re-reading the last SYNC_OVERLAP ids in case a transaction
+with a lower id committed late. It syncs every SYNC_INTERVAL seconds, and
+sooner when the blacklist version in the shared Django cache moves, which
+every blacklisting bumps when it commits. With a cache shared by all workers a logout is seen
+everywhere on the next check; with a per-process cache it can take up to
+SYNC_INTERVAL. The filter is rebuilt from scratch every REBUILD_INTERVAL,
+which drops expired tokens, and whenever it fills up.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from drf_spectacular.contrib.rest_framework_simplejwt import TokenRefreshSerializerExtension
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.bloom import BloomFilter
+from core.jobs import in_range, keyset_ranges
+
+DEFAULTS = {
+    'ERROR_RATE': 0.001,
+    'MIN_CAPACITY': 10000,
+    'SYNC_INTERVAL': 5,
+    'SYNC_OVERLAP': 1000,
+    'REBUILD_INTERVAL': 3600,
+}
+
+VERSION_KEY = 'token_blacklist:version'
+
+
+def blacklist_filter_settings():
+    """Return the TOKEN_BLACKLIST_FILTER settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'TOKEN_BLACKLIST_FILTER', {})}
+
+
+class BlacklistFilter:
+    def __init__(self, config=None):
+        self.config = config or blacklist_filter_settings()
+        self._filter = None
+        self._last_id = 0
+        self._version = None
+        self._synced_at = 0
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def is_blacklisted(self, jti):
+        """Return whether a jti is blacklisted, asking the database only on a possible hit."""
+        self._refresh()
+        if jti not in self._filter:
+            return False
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def add(self, jti):
+        """Add a jti blacklisted in this process and tell other workers to sync."""
+        if self._filter is not None:
+            self._filter.add(jti)
+        transaction.on_commit(self._bump_version)
+
+    @staticmethod
+    def _bump_version():
+        cache.add(VERSION_KEY, 0, None)
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            # The key was evicted between add() and incr(); workers still sync on their interval.
+            pass
+
+    def rebuild(self):
+        """Build a new filter from the unexpired blacklisted tokens."""
+        with self._lock:
+            last_id = BlacklistedToken.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+            tokens = BlacklistedToken.objects.filter(pk__lte=last_id, token__expires_at__gt=timezone.now())
+            bloom = BloomFilter(max(self.config['MIN_CAPACITY'], tokens.count() * 2), self.config['ERROR_RATE'])
+            for jti in tokens.values_list('token__jti', flat=True).iterator(chunk_size=5000):
+                bloom.add(jti)
+            self._filter = bloom
+            self._last_id = last_id
+            self._version = cache.get(VERSION_KEY)
+            self._built_at = self._synced_at = time.monotonic()
+
+    def sync(self):
+        """Add the tokens blacklisted since the last sync or rebuild."""
+        with self._lock:
+            version = cache.get(VERSION_KEY)
+            rows = (
+                BlacklistedToken.objects.filter(pk__gt=self._last_id - self.config['SYNC_OVERLAP'])
+                .order_by('pk').values_list('pk', 'token__jti')
+            )
+            for pk, jti in rows.iterator(chunk_size=5000):
+                if jti not in self._filter:
+                    self._filter.add(jti)
+                self._last_id = max(self._last_id, pk)
+            self._version = version
+            self._synced_at = time.monotonic()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._filter is None or self._filter.is_full or now >= self._built_at + self.config['REBUILD_INTERVAL']:
+            self.rebuild()
+        elif now >= self._synced_at + self.config['SYNC_INTERVAL'] or cache.get(VERSION_KEY) != self._version:
+            self.sync()
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """A RefreshToken whose blacklist check goes through blacklist_filter."""
+
+    def check_blacklist(self):
+        if blacklist_filter.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError("Token is blacklisted")
+
+
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FilteredRefreshToken
+
+
+class FilteredTokenRefreshSerializerExtension(TokenRefreshSerializerExtension):
+    """Document the refresh endpoint exactly as with simplejwt's serializer."""
+    target_class = 'user.token_blacklist.FilteredTokenRefreshSerializer'
+
+    def get_name(self, auto_schema, direction):
+        return 'TokenRefresh'
+
+
+def prune_expired_tokens(chunk_size=1000, pause=0.0):
+    """
+    Delete expired outstanding tokens and their blacklist entries. The table
+    is walked in primary-key ranges of `chunk_size` rows and each range is
+    deleted in its own short statements, so no lock is held for long.
+    Returns the number of outstanding tokens deleted.
+    """
+    deleted = 0
+    now = timezone.now()
+    for lower, upper in keyset_ranges(OutstandingToken.objects.all(), chunk_size):
+        expired = list(
+            in_range(OutstandingToken.objects.all(), lower, upper)
+            .filter(expires_at__lte=now).values_list('pk', flat=True)
+        )
+        if expired:
+            BlacklistedToken.objects.filter(token_id__in=expired).delete()
+            deleted += OutstandingToken.objects.filter(pk__in=expired).delete()[1].get(
+                OutstandingToken._meta.label, 0
+            )
+        if pause:
+            time.sleep(pause)
+    return deleted
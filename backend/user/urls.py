@@ -4,7 +4,9 @@ URL mappings for the user app.
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from user.views import CreateUserView, ManageUserView, LogoutView, TransactionView
+from user.views import (
+    CreateUserView, ManageUserView, LogoutView, TransactionView, BalanceView, ActivityView, GameStatsView,
+)
 
 app_name = 'user'
 
@@ -15,4 +17,7 @@ urlpatterns = [
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('transaction/', TransactionView.as_view(), name='transaction'),
+    path('balance/', BalanceView.as_view(), name='balance'),
+    path('activity/', ActivityView.as_view(), name='activity'),
+    path('stats/', GameStatsView.as_view(), name='stats'),
 ]
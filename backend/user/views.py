@@ -6,10 +6,19 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from user.serializers import UserSerializer, TransactionSerializer, ProfileSerializer
+from core.pagination import KeysetPagination
+from user.activity import GAMES, activity_page
+from user.authentication import CachedJWTAuthentication
+from user.balance_cache import balance_cache
+from user.models import GameStats, Transaction
+from user.token_blacklist import FilteredRefreshToken
+from user.serializers import (
+    UserSerializer, TransactionSerializer, TransactionFilterSerializer, ProfileSerializer, BalanceSerializer,
+    ActivityFilterSerializer, ActivityPageSerializer, GameStatsSerializer,
+)
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -36,7 +45,7 @@ class LogoutView(GenericAPIView):
     def post(self, request, *args, **kwargs):
         try:
             refresh_token = request.data["refresh_token"]
-            token = RefreshToken(refresh_token)
+            token = FilteredRefreshToken(refresh_token)
             token.blacklist()
 
             response_msg = {"message": "Logout successful."}
@@ -48,17 +57,33 @@ class LogoutView(GenericAPIView):
 
 class TransactionView(generics.ListCreateAPIView):
     """
-    Process a deposit or withdrawal, and list all transactions.
+    Process a deposit or withdrawal, and list transactions newest first.
+
+    The list is cursor-paginated: pass `limit` (up to 100) and the `next`
+    cursor of the previous page, and optionally `since`, `until` and `type`.
     """
     serializer_class = TransactionSerializer
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """
-        Returns a queryset of all transactions related to the authenticated user's profile.
+        Returns the authenticated user's transactions matching the filters,
+        as plain rows of the columns the history index covers.
         """
-        return self.request.user.profile.transactions.all().order_by('-date')
+        filters = TransactionFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        params = filters.validated_data
+
+        queryset = Transaction.objects.filter(profile_id=self.request.user.profile.pk)
+        if 'since' in params:
+            queryset = queryset.filter(date__gte=params['since'])
+        if 'until' in params:
+            queryset = queryset.filter(date__lt=params['until'])
+        if 'type' in params:
+            queryset = queryset.filter(transaction_type=params['type'])
+        return queryset.values('id', 'date', 'amount', 'transaction_type')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -80,3 +105,47 @@ class TransactionView(generics.ListCreateAPIView):
             return Response(response_data, status=status.HTTP_200_OK)
         except ValidationError as e:
             return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+
+
+class BalanceView(GenericAPIView):
+    """Return the authenticated user's balance from the balance cache."""
+    serializer_class = BalanceSerializer
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer({'balance': balance_cache.get(request.user.pk)})
+        return Response(serializer.data)
+
+
+class ActivityView(GenericAPIView):
+    """
+    List the authenticated user's rounds across games, newest first.
+
+    Pass `limit` (up to 100), the `next` cursor of the previous page and
+    optionally one or more `game` parameters to show only those games.
+    """
+    serializer_class = ActivityPageSerializer
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(parameters=[ActivityFilterSerializer])
+    def get(self, request, *args, **kwargs):
+        filters = ActivityFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        params = filters.validated_data
+
+        games = [game for game in GAMES if game in params.get('game', GAMES)]
+        results, next_cursor = activity_page(request.user.pk, games, params.get('cursor'), params['limit'])
+        return Response(self.get_serializer({'results': results, 'next': next_cursor}).data)
+
+
+class GameStatsView(generics.ListAPIView):
+    """List the authenticated user's counters per game."""
+    serializer_class = GameStatsSerializer
+    authentication_classes = [CachedJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        return GameStats.objects.filter(profile_id=self.request.user.profile.pk).order_by('game')
@@ -0,0 +1,120 @@
+"""
+Atomic wallet balance updates.
+
+A balance change is a single conditional UPDATE that adds the amount inside
+the database and only matches while the balance covers what the caller
+needs. Concurrent rounds therefore never overwrite each other's result, no
+row lock is held between reading and writing the balance, and only the
+balance column is written.
+
+Every change is recorded in the append-only ledger (see user.ledger). On
+PostgreSQL the update, the ledger inserts and the new balance are one
+statement: the inserts are a data-modifying CTE that reads the updated row,
+so they only happen when the update matched and cost no extra round trip,
+however many entries a change carries. Other backends run the same
+conditional update with F() and bulk_create the entries.
+
+The new balance is written through to the balance cache (see
+user.balance_cache) once the surrounding transaction commits.
+"""
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from user.balance_cache import balance_cache
+from user.ledger import line_for
+
+
+class InsufficientFunds(ValueError):
+    """Raised when a wallet does not hold enough coins for a change."""
+
+    def __init__(self, message='Not enough coins!'):
+        super().__init__(message)
+
+
+def apply_delta(profile_id, amount, required=None, lines=None):
+    """
+    Add `amount` (negative to deduct) to a profile's balance and return the new
+    balance. The update only happens while the balance is at least `required`,
+    which defaults to what `amount` takes out; otherwise InsufficientFunds is
+    raised and nothing is written.
+
+    `lines` are the LedgerLines recorded for the change and must add up to
+    `amount`; by default it is one line tagged from the current ledger
+    reference.
+    """
+    from user.models import Profile
+
+    amount = Decimal(str(amount))
+    if required is None:
+        required = max(-amount, Decimal('0'))
+    required = Decimal(str(required))
+    if lines is None:
+        lines = [line_for(amount)]
+    elif sum(line.amount for line in lines) != amount:
+        raise ValueError("Ledger lines must add up to the balance change.")
+
+    connection = connections[router.db_for_write(Profile)]
+    if connection.vendor == 'postgresql':
+        row = _update_returning(connection, profile_id, amount, required, lines)
+    else:
+        row = _update_then_insert(profile_id, amount, required, lines)
+
+    if row is None:
+        raise InsufficientFunds()
+    user_id, new_balance = row
+    balance_cache.set_on_commit(user_id, new_balance)
+    return new_balance
+
+
+def _update_returning(connection, profile_id, amount, required, lines):
+    from user.models import LedgerEntry, Profile
+
+    quote = connection.ops.quote_name
+    profile_table = quote(Profile._meta.db_table)
+    balance = quote(Profile._meta.get_field('balance').column)
+    pk_column = quote(Profile._meta.pk.column)
+    user_column = quote(Profile._meta.get_field('user').column)
+    ledger_table = quote(LedgerEntry._meta.db_table)
+    ledger_columns = ', '.join(
+        quote(LedgerEntry._meta.get_field(name).column)
+        for name in ('profile', 'amount', 'kind', 'game', 'round_id', 'created_at')
+    )
+    values = ', '.join(['(%s::numeric, %s::varchar, %s::varchar, %s::varchar)'] * len(lines))
+    params = [amount, profile_id, required, timezone.now()]
+    for line in lines:
+        params.extend([line.amount, line.kind, line.game, line.round_id])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"WITH updated AS ("
+            f"UPDATE {profile_table} SET {balance} = {balance} + %s "
+            f"WHERE {pk_column} = %s AND {balance} >= %s RETURNING {pk_column} AS id, {user_column} AS user_id, {balance} AS balance"
+            f"), entries AS ("
+            f"INSERT INTO {ledger_table} ({ledger_columns}) "
+            f"SELECT updated.id, line.amount, line.kind, line.game, line.round_id, %s "
+            f"FROM updated CROSS JOIN (VALUES {values}) AS line (amount, kind, game, round_id)"
+            f") SELECT user_id, balance FROM updated",
+            params,
+        )
+        return cursor.fetchone()
+
+
+def _update_then_insert(profile_id, amount, required, lines):
+    from user.models import LedgerEntry, Profile
+
+    with transaction.atomic():
+        updated = Profile.objects.filter(pk=profile_id, balance__gte=required).update(
+            balance=F('balance') + amount
+        )
+        if not updated:
+            return None
+        now = timezone.now()
+        LedgerEntry.objects.bulk_create([
+            LedgerEntry(profile_id=profile_id, amount=line.amount, kind=line.kind, game=line.game,
+                        round_id=line.round_id, created_at=now)
+            for line in lines
+        ])
+        return Profile.objects.values_list('user_id', 'balance').get(pk=profile_id)
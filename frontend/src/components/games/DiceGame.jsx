@@ -5,7 +5,7 @@ import diceVariants from "../animations/DiceSpinningAnimation.jsx";
 import { toast, ToastContainer } from "react-toastify";
 import { useAuth } from "../../context/AuthContext";
 import { useNavigate } from "react-router-dom";
-import {fetchBalance} from "./GameApi.jsx";
+import {fetchBalance, fetchDiceOdds} from "./GameApi.jsx";
 
 export default function DiceGame() {
     const [bet, setBet] = useState(10);
@@ -19,6 +19,7 @@ export default function DiceGame() {
     const [gameInitialized, setGameInitialized] = useState(false);
     const [rolling, setRolling] = useState(false);
     const [gameResult, setGameResult] = useState(null);
+    const [odds, setOdds] = useState(null);
 
     const { isAuthenticated, loading } = useAuth();
     const navigate = useNavigate();
@@ -47,8 +48,18 @@ export default function DiceGame() {
         }
     }, [loading, isAuthenticated]);
 
+    useEffect(() => {
+        fetchDiceOdds()
+            .then(setOdds)
+            .catch(() => setOdds(null));
+    }, []);
+
     const totalSides = diceSides[diceType1] + diceSides[diceType2];
 
+    const guessOdds = odds?.pairs
+        ?.find((pair) => pair.faces[0] === diceSides[diceType1] && pair.faces[1] === diceSides[diceType2])
+        ?.guesses.find((guess) => guess.guessed_number === selectedNumber);
+
     const DICE_SHAPES = {
         d6:  "10,10 90,10 90,90 10,90",
         d8:  "50,10 90,50 50,90 10,50",
@@ -178,6 +189,13 @@ export default function DiceGame() {
                                 );
                             })}
                         </select>
+                        {guessOdds && (
+                            <span className="text-sm text-gray-400 mt-1">
+                                Win chance: {(guessOdds.win_probability * 100).toFixed(1)}%
+                                {" · "}
+                                Expected return: {(guessOdds.expected_return * 100).toFixed(1)}%
+                            </span>
+                        )}
                     </div>
 
                     <div className="flex-1">
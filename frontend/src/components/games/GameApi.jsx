@@ -4,7 +4,7 @@ export const fetchBalance = async (setBalance, user) => {
             setBalance(parseFloat(user.balance));
         } else {
             const response = await fetch(
-                `${import.meta.env.VITE_API_URL}/user/profile/`,
+                `${import.meta.env.VITE_API_URL}/user/balance/`,
                 {
                     method: "GET",
                     headers: {
@@ -22,3 +22,9 @@ export const fetchBalance = async (setBalance, user) => {
         throw new Error("Failed to fetch balance: " + error.message);
     }
 };
+
+export const fetchDiceOdds = async () => {
+    const response = await fetch(`${import.meta.env.VITE_API_URL}/dice/odds/`);
+    if (!response.ok) throw new Error("Failed to fetch dice odds");
+    return response.json();
+};
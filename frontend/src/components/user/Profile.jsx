@@ -8,12 +8,22 @@ import EditProfileModal from "./profileUtils/EditProfileModal.jsx";
 import { useAuth } from "../../context/AuthContext.jsx";
 
 const apiUrl = import.meta.env.VITE_API_URL;
+const TRANSACTIONS_PAGE_SIZE = 20;
+
+const fetchTransactionPage = async (cursor = null) => {
+    const res = await axios.get(`${apiUrl}/user/transaction/`, {
+        headers: { Authorization: `Bearer ${localStorage.getItem("access_token")}` },
+        params: cursor ? { limit: TRANSACTIONS_PAGE_SIZE, cursor } : { limit: TRANSACTIONS_PAGE_SIZE }
+    });
+    return res.data;
+};
 
 export default function Profile() {
     const navigate = useNavigate();
     const { logout } = useAuth();
     const [user, setUser] = useState(null);
     const [transactions, setTransactions] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [showTxnModal, setShowTxnModal] = useState(false);
     const [showEditModal, setShowEditModal] = useState(false);
 
@@ -25,10 +35,9 @@ export default function Profile() {
                 });
                 setUser(profileRes.data);
 
-                const txnRes = await axios.get(`${apiUrl}/user/transaction/`, {
-                    headers: { Authorization: `Bearer ${localStorage.getItem("access_token")}` }
-                });
-                setTransactions(txnRes.data);
+                const page = await fetchTransactionPage();
+                setTransactions(page.results);
+                setNextCursor(page.next);
             } catch (err) {
                 console.error(err);
             }
@@ -51,9 +60,19 @@ export default function Profile() {
         localStorage.removeItem("refresh_token");
     };
 
+    const loadMoreTransactions = async () => {
+        try {
+            const page = await fetchTransactionPage(nextCursor);
+            setTransactions((current) => [...current, ...page.results]);
+            setNextCursor(page.next);
+        } catch (err) {
+            console.error(err);
+        }
+    };
+
     const handleTransaction = async (amount, txnType) => {
         try {
-            await axios.post(`${apiUrl}/user/transaction/`, {
+            const txnRes = await axios.post(`${apiUrl}/user/transaction/`, {
                 amount: parseFloat(amount),
                 transaction_type: txnType
             }, {
@@ -63,15 +82,11 @@ export default function Profile() {
                 }
             });
 
-            const txnRes = await axios.get(`${apiUrl}/user/transaction/`, {
-                headers: { Authorization: `Bearer ${localStorage.getItem("access_token")}` }
-            });
-            setTransactions(txnRes.data);
+            setUser((current) => ({ ...current, balance: txnRes.data.new_balance }));
 
-            const profileRes = await axios.get(`${apiUrl}/user/profile/`, {
-                headers: { Authorization: `Bearer ${localStorage.getItem("access_token")}` }
-            });
-            setUser(profileRes.data);
+            const page = await fetchTransactionPage();
+            setTransactions(page.results);
+            setNextCursor(page.next);
 
             setShowTxnModal(false);
         } catch (err) {
@@ -109,7 +124,11 @@ export default function Profile() {
                     onNewTransaction={() => setShowTxnModal(true)} 
                     onLogout={handleLogout} 
                 />
-                <TransactionTable transactions={transactions} />
+                <TransactionTable
+                    transactions={transactions}
+                    hasMore={Boolean(nextCursor)}
+                    onLoadMore={loadMoreTransactions}
+                />
             </div>
 
             <TransactionModal 
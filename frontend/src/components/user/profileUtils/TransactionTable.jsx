@@ -3,7 +3,7 @@ import { Wallet } from "lucide-react";
 import DisplayDate from "../DateApi.jsx";
 import PropTypes from "prop-types";
 
-export default function TransactionTable({ transactions }) {
+export default function TransactionTable({ transactions, hasMore = false, onLoadMore }) {
     return (
         <div className="mt-6">
             <div className="flex items-center mb-4">
@@ -54,6 +54,14 @@ export default function TransactionTable({ transactions }) {
                             ))}
                             </tbody>
                         </table>
+                        {hasMore && (
+                            <button
+                                onClick={onLoadMore}
+                                className="w-full py-2 text-yellow-400 bg-gray-800 hover:bg-gray-700 border border-gray-700 border-t-0"
+                            >
+                                Load more
+                            </button>
+                        )}
                     </div>
                 </div>
             )}
@@ -69,4 +77,6 @@ TransactionTable.propTypes = {
             amount: PropTypes.number.isRequired,
         })
     ).isRequired,
+    hasMore: PropTypes.bool,
+    onLoadMore: PropTypes.func,
 }
\ No newline at end of file
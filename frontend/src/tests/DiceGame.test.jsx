@@ -29,7 +29,8 @@ vi.mock('react-router-dom', async () => {
 import { useNavigate } from 'react-router-dom';
 
 vi.mock('../components/games/GameApi.jsx', () => ({
-    fetchBalance: vi.fn()
+    fetchBalance: vi.fn(),
+    fetchDiceOdds: vi.fn(() => Promise.resolve(null))
 }));
 import { fetchBalance } from '../components/games/GameApi.jsx';
 
@@ -51,7 +51,7 @@ describe('Profile component', () => {
                 return Promise.resolve({ data: mockUser });
             }
             if (url.endsWith('/user/transaction/')) {
-                return Promise.resolve({ data: mockTxns });
+                return Promise.resolve({ data: { results: mockTxns, next: null } });
             }
             return Promise.reject(new Error('unexpected GET ' + url));
         });